@@ -0,0 +1,92 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from voronoi.ArrayDisjointSetUnion import ArrayDisjointSetUnion
+from voronoi.ArrayFortuneAlgorithm import ArrayFortuneAlgorithm
+from voronoi.DisjointSetUnion import DisjointSetUnion
+from voronoi.Vector2 import Vector2
+
+GRAPHS = ('random', 'pixels', 'voronoi')
+
+
+# (elements, (m, 2) edges) of about count elements
+def generate(graph: str, count: int, rng: np.random.Generator):
+    if graph == 'random':
+        # Sparse random graph around the giant component threshold, many components of all sizes
+        return count, rng.integers(0, count, size=(count // 2 + count // 4, 2))
+    if graph == 'pixels':
+        # 4-connected regions of the foreground pixels of a random image near the percolation threshold
+        side = int(np.sqrt(count))
+        foreground = rng.random((side, side)) < 0.6
+        indices = np.arange(side * side).reshape(side, side)
+        right = foreground[:, :-1] & foreground[:, 1:]
+        down = foreground[:-1, :] & foreground[1:, :]
+        edges = np.concatenate((np.column_stack((indices[:, :-1][right], indices[:, 1:][right])),
+                                np.column_stack((indices[:-1, :][down], indices[1:, :][down]))))
+        return side * side, edges
+    if graph == 'voronoi':
+        # Neighbour graph of the cells, sites kept when they are closer than a threshold to one of their neighbours
+        points = rng.random((count, 2))
+        algorithm = ArrayFortuneAlgorithm([Vector2(x, y) for x, y in points.tolist()])
+        algorithm.construct()
+        edges = algorithm.get_delaunay_edges()
+        lengths = np.hypot(*(points[edges[:, 0]] - points[edges[:, 1]]).T)
+        return count, edges[lengths < 0.8 / np.sqrt(count)]
+    raise ValueError(graph)
+
+
+def run_lists(count: int, edges: np.ndarray) -> np.ndarray:
+    dsu = DisjointSetUnion(count)
+    for x, y in edges.tolist():
+        dsu.union(x, y)
+    return np.array([dsu.get(x) for x in range(count)], dtype=np.int64)
+
+
+def run_arrays(count: int, edges: np.ndarray) -> np.ndarray:
+    dsu = ArrayDisjointSetUnion(count)
+    dsu.union_many(edges)
+    return dsu.components()
+
+
+def same_partition(first: np.ndarray, second: np.ndarray) -> bool:
+    pairs = np.unique(np.column_stack((first, second)), axis=0)
+    return len(pairs) == len(np.unique(first)) == len(np.unique(second))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DisjointSetUnion against ArrayDisjointSetUnion: connected '
+                                                 'components of a graph, all edges then the label of every element')
+    parser.add_argument('sizes', nargs='*', type=int, default=[10000, 100000, 1000000])
+    parser.add_argument('--graphs', nargs='+', choices=GRAPHS, default=list(GRAPHS))
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'graph':>8} {'elements':>10} {'edges':>10} {'components':>11} {'lists, s':>10} {'arrays, s':>10} "
+          f"{'speedup':>8} {'same':>6}")
+    for count in args.sizes:
+        for graph in args.graphs:
+            elements, edges = generate(graph, count, np.random.default_rng(args.seed))
+            times = dict()
+            labels = dict()
+            for name, run in (('lists', run_lists), ('arrays', run_arrays)):
+                best = float('inf')
+                for _ in range(args.repeats):
+                    start = time.perf_counter()
+                    labels[name] = run(elements, edges)
+                    best = min(best, time.perf_counter() - start)
+                times[name] = best
+            components = len(np.unique(labels['arrays']))
+            print(f"{graph:>8} {elements:>10} {len(edges):>10} {components:>11} {times['lists']:>10.4f} "
+                  f"{times['arrays']:>10.4f} {times['lists'] / times['arrays']:>7.1f}x "
+                  f"{str(same_partition(labels['lists'], labels['arrays'])):>6}")
+
+
+if __name__ == '__main__':
+    main()
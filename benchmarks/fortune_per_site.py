@@ -0,0 +1,44 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from voronoi.Vector2 import Vector2
+from voronoi.FortuneAlgorithm import FortuneAlgorithm
+
+
+def generate_points(count, seed):
+    random.seed(seed)
+    return [Vector2(random.random() * 0.9 + 0.05, random.random() * 0.9 + 0.05) for _ in range(count)]
+
+
+def measure(count, repeats, seed, use_legacy_queue):
+    points = generate_points(count, seed)
+    best = float('inf')
+    for _ in range(repeats):
+        algorithm = FortuneAlgorithm(points, use_legacy_queue=use_legacy_queue)
+        start = time.perf_counter()
+        algorithm.construct()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time FortuneAlgorithm.construct() per site')
+    parser.add_argument('sizes', nargs='*', type=int, default=[1000, 10000, 50000])
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'sites':>10} {'queue':>10} {'construct, s':>14} {'per site, us':>14}")
+    for count in args.sizes:
+        for queue, use_legacy_queue in (('legacy', True), ('scheduler', False)):
+            elapsed = measure(count, args.repeats, args.seed, use_legacy_queue)
+            print(f"{count:>10} {queue:>10} {elapsed:>14.4f} {elapsed / count * 1e6:>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
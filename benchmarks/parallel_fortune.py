@@ -0,0 +1,82 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from voronoi.Box import Box
+from voronoi.FortuneAlgorithm import FortuneAlgorithm
+from voronoi.ParallelFortuneAlgorithm import ParallelFortuneAlgorithm
+from voronoi.Vector2 import Vector2
+
+
+def construct_serial(points, box):
+    algorithm = FortuneAlgorithm(points)
+    algorithm.construct()
+    margin = 0.1 * max(box.right - box.left, box.top - box.bottom)
+    algorithm.bound(Box(box.left - margin, box.bottom - margin, box.right + margin, box.top + margin))
+    diagram = algorithm.get_diagram()
+    diagram.intersect(box)
+    return diagram
+
+
+def get_cells(diagram):
+    cells = list()
+    for site in diagram.get_sites():
+        half_edges = diagram._get_face_half_edges(site.face) or []
+        origins = [(e.origin.point.x, e.origin.point.y) for e in half_edges]
+        twins = sorted(e.twin.incident_face.site.index for e in half_edges if e.twin is not None)
+        cells.append((origins, twins))
+    return cells
+
+
+# Same cells (vertices up to tolerance, same neighbours) and consistent twins
+def same_diagrams(diagram, expected, tolerance=1e-9):
+    for half_edge in diagram.get_half_edges():
+        if half_edge.twin is not None and (half_edge.twin.twin is not half_edge
+                                           or half_edge.twin.origin is not half_edge.destination):
+            return False
+    for (origins, twins), (expected_origins, expected_twins) in zip(get_cells(diagram), get_cells(expected)):
+        if twins != expected_twins or len(origins) != len(expected_origins):
+            return False
+        for x, y in origins:
+            if not any(abs(x - expected_x) <= tolerance and abs(y - expected_y) <= tolerance
+                       for expected_x, expected_y in expected_origins):
+                return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scaling of ParallelFortuneAlgorithm with the number of workers')
+    parser.add_argument('sites', nargs='*', type=int, default=[10000, 100000])
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='largest number of workers')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    box = Box(0.0, 0.0, 1.0, 1.0)
+    print(f"{'sites':>10} {'workers':>8} {'time, s':>10} {'speedup':>8} {'correct':>8}")
+    for count in args.sites:
+        random.seed(args.seed)
+        points = [Vector2(random.random(), random.random()) for _ in range(count)]
+
+        start = time.perf_counter()
+        expected = construct_serial(points, box)
+        serial_time = time.perf_counter() - start
+        print(f"{count:>10} {'serial':>8} {serial_time:>10.3f} {1.0:>8.2f} {'-':>8}")
+
+        workers = 1
+        while workers <= args.workers:
+            start = time.perf_counter()
+            algorithm = ParallelFortuneAlgorithm(points, box, workers)
+            algorithm.construct()
+            parallel_time = time.perf_counter() - start
+            correct = same_diagrams(algorithm.get_diagram(), expected)
+            print(f"{count:>10} {workers:>8} {parallel_time:>10.3f} {serial_time / parallel_time:>8.2f} "
+                  f"{str(correct):>8}")
+            workers = workers * 2 if workers * 2 <= args.workers or workers == args.workers else args.workers
+
+
+if __name__ == '__main__':
+    main()
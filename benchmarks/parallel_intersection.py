@@ -0,0 +1,55 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from geometry.ParallelIntersection import ENGINES, ParallelIntersection
+from segment_intersection import generate
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scaling of ParallelIntersection with the number of workers, and '
+                                                 'the time of every strip to show the load balance')
+    parser.add_argument('sizes', nargs='*', type=int, default=[100000, 1000000])
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='largest number of workers')
+    parser.add_argument('--strips', type=int, default=None, help='strips per run, the number of workers by default')
+    parser.add_argument('--engine', choices=sorted(ENGINES), default='grid')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    for count in args.sizes:
+        segments = generate(count, 1.0 / np.sqrt(count), np.random.default_rng(args.seed))
+        start = time.perf_counter()
+        expected, _ = ENGINES[args.engine](segments)
+        serial_time = time.perf_counter() - start
+        print(f'{count} segments, {len(expected)} pairs, serial {args.engine}: {serial_time:.3f} s')
+        print(f"{'workers':>8} {'strips':>7} {'time, s':>9} {'speedup':>8} {'same':>6} "
+              f"{'slowest strip, s':>17} {'mean strip, s':>14} {'copies':>7}")
+
+        workers = 1
+        while workers <= args.workers:
+            algorithm = ParallelIntersection(segments, workers, args.strips, args.engine)
+            start = time.perf_counter()
+            pairs, _ = algorithm.find()
+            parallel_time = time.perf_counter() - start
+            results = algorithm.get_strip_results()
+            seconds = [result.seconds for result in results]
+            # Segments in more than one strip make the strips cost more than the whole
+            copies = sum(result.segment_count for result in results) / count
+            print(f"{workers:>8} {len(results):>7} {parallel_time:>9.3f} {serial_time / parallel_time:>8.2f} "
+                  f"{str(np.array_equal(pairs, expected)):>6} {max(seconds):>17.3f} {np.mean(seconds):>14.3f} "
+                  f"{copies:>7.3f}")
+            workers = workers * 2 if workers * 2 <= args.workers or workers == args.workers else args.workers
+
+        print(f"{'strip':>8} {'low y':>10} {'high y':>10} {'segments':>9} {'found':>8} {'owned':>8} {'time, s':>9}")
+        for result in results:
+            print(f"{result.strip:>8} {result.low:>10.4f} {result.high:>10.4f} {result.segment_count:>9} "
+                  f"{result.found_count:>8} {len(result.pairs):>8} {result.seconds:>9.3f}")
+
+
+if __name__ == '__main__':
+    main()
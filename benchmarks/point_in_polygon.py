@@ -0,0 +1,54 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from geometry.PointInPolygon import BOUNDARY, INSIDE, classify_points
+from segment_engines import load_notebook
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Batch point-in-polygon against is_point_inside_ray_method() of '
+                                                 'lab4.2 on polygons of generate_polygon()')
+    parser.add_argument('vertices', nargs='*', type=int, default=[100, 1000, 10000])
+    parser.add_argument('--points', type=int, default=1000000)
+    parser.add_argument('--check', type=int, default=1000,
+                        help='points verified against the notebook, a third of them vertices and edge points')
+    parser.add_argument('--max-memory', type=int, default=1 << 28)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    notebook = load_notebook('lab4.2')
+    print(f"{'vertices':>9} {'points':>9} {'batch, s':>9} {'points/s':>11} {'inside':>7} {'boundary':>9} "
+          f"{'loop, s/pt':>11} {'speedup':>8} {'same':>6}")
+    for count in args.vertices:
+        np.random.seed(args.seed)
+        polygon = notebook['generate_polygon'](count)
+        rng = np.random.default_rng(args.seed)
+        points = rng.uniform(-12.0, 12.0, (args.points, 2))
+
+        start = time.perf_counter()
+        result = classify_points(polygon, points, args.max_memory)
+        batch_time = time.perf_counter() - start
+
+        # Points on the boundary and next to it as well as random ones
+        on_edges = rng.integers(0, count, args.check // 3)
+        weights = rng.uniform(0.0, 1.0, (len(on_edges), 1))
+        sample = np.concatenate((points[:args.check - 2 * len(on_edges)], polygon[on_edges],
+                                 polygon[on_edges] * weights + polygon[(on_edges + 1) % count] * (1.0 - weights)))
+        start = time.perf_counter()
+        expected = np.array([notebook['is_point_inside_ray_method'](polygon, point) for point in sample])
+        loop_time = (time.perf_counter() - start) / len(sample)
+        same = np.array_equal(classify_points(polygon, sample, args.max_memory) == INSIDE, expected)
+
+        print(f"{count:>9} {args.points:>9} {batch_time:>9.3f} {args.points / batch_time:>11.0f} "
+              f"{np.count_nonzero(result == INSIDE):>7} {np.count_nonzero(result == BOUNDARY):>9} "
+              f"{loop_time:>11.2e} {loop_time * args.points / batch_time:>8.0f} {str(same):>6}")
+
+
+if __name__ == '__main__':
+    main()
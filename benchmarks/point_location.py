@@ -0,0 +1,69 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from voronoi.Box import Box
+from voronoi.FortuneAlgorithm import FortuneAlgorithm
+from voronoi.PointLocator import PointLocator
+from voronoi.Vector2 import Vector2
+
+
+# Whether every site of result is at the distance of the nearest site of its query
+def is_nearest(sites: np.ndarray, queries: np.ndarray, result: np.ndarray) -> bool:
+    expected = np.argmin(((queries[:, None, :] - sites[None, :, :]) ** 2).sum(axis=2), axis=1)
+    distances = ((sites[result] - queries) ** 2).sum(axis=1)
+    return bool(np.allclose(distances, ((sites[expected] - queries) ** 2).sum(axis=1)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build time and query throughput of PointLocator')
+    parser.add_argument('sites', nargs='*', type=int, default=[1000, 10000, 100000])
+    parser.add_argument('--queries', type=int, default=1000000)
+    parser.add_argument('--check', type=int, default=2000, help='queries verified against a brute-force scan')
+    parser.add_argument('--clip', nargs=4, type=float, default=[0.3, 0.3, 0.6, 0.6],
+                        metavar=('LEFT', 'BOTTOM', 'RIGHT', 'TOP'),
+                        help='box of the clipped diagram whose queries in the box are checked as well')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'sites':>10} {'build, s':>10} {'queries':>10} {'query, s':>10} {'queries/s':>12} {'checked':>8} "
+          f"{'clipped':>8}")
+    for count in args.sites:
+        random.seed(args.seed)
+        points = [Vector2(random.random(), random.random()) for _ in range(count)]
+        algorithm = FortuneAlgorithm(points)
+        algorithm.construct()
+        algorithm.bound(Box(-0.05, -0.05, 1.05, 1.05))
+
+        start = time.perf_counter()
+        locator = PointLocator(algorithm.get_diagram())
+        build_time = time.perf_counter() - start
+
+        queries = rng.uniform(-0.1, 1.1, size=(args.queries, 2))
+        start = time.perf_counter()
+        result = locator.locate(queries)
+        query_time = time.perf_counter() - start
+
+        sites = np.array([(p.x, p.y) for p in points])
+        checked = is_nearest(sites, queries[:args.check], result[:args.check])
+
+        # Sites outside the box lose their cells and neighbours when the diagram is clipped
+        box = Box(*args.clip)
+        algorithm.get_diagram().intersect(box)
+        clipped_locator = PointLocator(algorithm.get_diagram(), box)
+        sample = rng.uniform(args.clip[:2], args.clip[2:], size=(args.check, 2))
+        clipped = is_nearest(sites, sample, clipped_locator.locate(sample))
+
+        print(f"{count:>10} {build_time:>10.3f} {args.queries:>10} {query_time:>10.3f} "
+              f"{args.queries / query_time:>12.0f} {str(checked):>8} {str(clipped):>8}")
+
+
+if __name__ == '__main__':
+    main()
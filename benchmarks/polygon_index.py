@@ -0,0 +1,63 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from geometry.PointInPolygon import classify_points
+from geometry.PolygonIndex import PolygonIndex
+from segment_engines import load_notebook
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build time, memory and query throughput of PolygonIndex on '
+                                                 'polygons of generate_polygon() in lab4.2, against classify_points()')
+    parser.add_argument('vertices', nargs='*', type=int, default=[1000, 10000, 100000])
+    parser.add_argument('--queries', type=int, default=1000000)
+    parser.add_argument('--cells-per-vertex', type=float, default=4.0)
+    parser.add_argument('--check', type=int, default=1000,
+                        help='queries verified against the notebook, a third of them vertices and edge points')
+    parser.add_argument('--compare', type=int, default=10000, help='queries timed with classify_points()')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    notebook = load_notebook('lab4.2')
+    print(f"{'vertices':>9} {'build, s':>9} {'memory, MB':>11} {'edges/cell':>11} {'queries/s':>11} "
+          f"{'batch/s':>11} {'speedup':>8} {'same':>6}")
+    for count in args.vertices:
+        np.random.seed(args.seed)
+        polygon = notebook['generate_polygon'](count)
+        rng = np.random.default_rng(args.seed)
+        queries = rng.uniform(-12.0, 12.0, (args.queries, 2))
+
+        start = time.perf_counter()
+        index = PolygonIndex(polygon, args.cells_per_vertex)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = index.classify(queries)
+        query_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = classify_points(polygon, queries[:args.compare])
+        batch_time = time.perf_counter() - start
+        same = np.array_equal(result[:args.compare], expected)
+
+        # Points on the boundary and next to it as well as random ones
+        on_edges = rng.integers(0, count, args.check // 3)
+        weights = rng.uniform(0.0, 1.0, (len(on_edges), 1))
+        sample = np.concatenate((queries[:args.check - 2 * len(on_edges)], polygon[on_edges],
+                                 polygon[on_edges] * weights + polygon[(on_edges + 1) % count] * (1.0 - weights)))
+        ray = np.array([notebook['is_point_inside_ray_method'](polygon, point) for point in sample])
+        same = same and np.array_equal(index.is_inside(sample), ray)
+
+        query_rate, batch_rate = args.queries / query_time, args.compare / batch_time
+        print(f"{count:>9} {build_time:>9.3f} {index.get_memory() / 1e6:>11.2f} {index.get_cell_load():>11.1f} "
+              f"{query_rate:>11.0f} {batch_rate:>11.0f} {query_rate / batch_rate:>8.1f} {str(same):>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from geometry import GridIntersection, RedBlueIntersection
+from segment_intersection import generate
+
+
+def run_filtered(red: np.ndarray, blue: np.ndarray):
+    # Every intersection of both layers together, the same-layer ones thrown away
+    pairs, points = GridIntersection.find_intersections(np.concatenate((red, blue)))
+    cross = (pairs[:, 0] < len(red)) & (pairs[:, 1] >= len(red))
+    return np.column_stack((pairs[cross, 0], pairs[cross, 1] - len(red))), points[cross], len(pairs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Red-blue intersection of a dense layer and a sparse one, against '
+                                                 'all intersections of both layers filtered afterwards')
+    parser.add_argument('sizes', nargs='*', type=int, default=[100000, 1000000])
+    parser.add_argument('--blue-fraction', type=float, default=0.05, help='size of the blue layer against the red')
+    parser.add_argument('--density', type=float, default=4.0,
+                        help='mean red segment length in units of 1 / sqrt(size), crossings grow with its square')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'red':>9} {'blue':>9} {'all pairs':>10} {'red-blue':>9} {'filtered, s':>12} {'red-blue, s':>12} "
+          f"{'speedup':>8} {'same':>6}")
+    for count in args.sizes:
+        rng = np.random.default_rng(args.seed)
+        red = generate(count, args.density / np.sqrt(count), rng)
+        blue_count = max(1, int(count * args.blue_fraction))
+        blue = generate(blue_count, 1.0 / np.sqrt(blue_count), rng)
+
+        start = time.perf_counter()
+        expected_pairs, expected_points, total = run_filtered(red, blue)
+        filtered_time = time.perf_counter() - start
+        start = time.perf_counter()
+        pairs, points = RedBlueIntersection.find_intersections(red, blue)
+        red_blue_time = time.perf_counter() - start
+        same = np.array_equal(pairs, expected_pairs) and np.array_equal(points, expected_points)
+        print(f"{count:>9} {blue_count:>9} {total:>10} {len(pairs):>9} {filtered_time:>12.3f} "
+              f"{red_blue_time:>12.3f} {filtered_time / red_blue_time:>7.1f}x {str(same):>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+import argparse
+import ast
+import contextlib
+import io
+import itertools
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from geometry import GridIntersection, ParallelIntersection, SegmentIntersection
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+VARIANTS = ('sparse', 'dense', 'collinear')
+NOTEBOOK_ENGINES = ('lab4.1a', 'lab4.1b', 'lab4.1c', 'lab4.1c2')
+ENGINES = NOTEBOOK_ENGINES + tuple(SegmentIntersection.ENGINES)
+# Side of the square of generate_random_segments()
+COORDINATE_RANGE = (0.0, 10.0)
+
+
+# Imports, functions and classes of the code cells of a notebook, without its demo code and plots
+def load_notebook(name: str) -> dict:
+    with open(os.path.join(ROOT, f'{name}.ipynb')) as file:
+        cells = json.load(file)['cells']
+    body = list()
+    for cell in cells:
+        if cell['cell_type'] != 'code':
+            continue
+        for node in ast.parse(''.join(cell['source'])).body:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                modules = [alias.name for alias in node.names] if isinstance(node, ast.Import) else [node.module]
+                if any(module.startswith('matplotlib') for module in modules):
+                    continue
+            elif not isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+                continue
+            body.append(node)
+    namespace = dict()
+    exec(compile(ast.Module(body=body, type_ignores=[]), name, 'exec'), namespace)
+    return namespace
+
+
+# (pairs, points) of the output of a notebook: (i, j) for lab4.1b, (i, j, point) for lab4.1a, (point, labels) for
+# the sweeps, where every two labels of a point are a pair
+def convert_notebook_output(name: str, output: list):
+    pairs, points = list(), list()
+    for item in output:
+        if name == 'lab4.1b':
+            pairs.append(item)
+            points.append((np.nan, np.nan))
+        elif name == 'lab4.1a':
+            pairs.append(item[:2])
+            points.append(tuple(item[2]))
+        else:
+            point, labels = item
+            for i, j in itertools.combinations(sorted(set(labels)), 2):
+                pairs.append((i, j))
+                points.append(tuple(point))
+    return pairs, points
+
+
+# n segments of the square of generate_random_segments() with length about length
+def generate_shape(variant: str, count: int, length: float, rng: np.random.Generator) -> np.ndarray:
+    low, high = COORDINATE_RANGE
+    if variant == 'sparse':
+        # Uniform positions and directions
+        starts = rng.uniform(low, high, (count, 2))
+        angles = rng.uniform(0.0, 2.0 * np.pi, count)
+        directions = np.column_stack((np.cos(angles), np.sin(angles)))
+    elif variant == 'dense':
+        # Clusters: most crossings in a few hot spots
+        centres = rng.uniform(low, high, (max(count // 500, 2), 2))
+        starts = centres[rng.integers(len(centres), size=count)] + rng.normal(0.0, 0.05 * (high - low), (count, 2))
+        angles = rng.uniform(0.0, 2.0 * np.pi, count)
+        directions = np.column_stack((np.cos(angles), np.sin(angles)))
+    elif variant == 'collinear':
+        # The horizontal and vertical segments of generate_random_segments() on the lines of a lattice, so that many
+        # of them share their line and overlap. Exact directions keep them on it.
+        side = max(int(np.sqrt(count)) // 4, 2)
+        starts = rng.uniform(low, high, (count, 2))
+        directions = np.array([(1.0, 0.0), (0.0, 1.0), (-1.0, 0.0), (0.0, -1.0)])[rng.integers(0, 4, count)]
+        across = directions[:, 0] == 0.0
+        starts[across, 0] = rng.integers(0, side, np.count_nonzero(across)) * ((high - low) / side) + low
+        starts[~across, 1] = rng.integers(0, side, np.count_nonzero(~across)) * ((high - low) / side) + low
+    else:
+        raise ValueError(variant)
+    ends = starts + rng.uniform(0.5, 1.5, count)[:, None] * length * directions
+    segments = np.stack((starts, ends), axis=1)
+    # As in generate_random_segments(), pairs of segments crossing for sure first
+    guaranteed = min(count // 20, 1000)
+    for i in range(0, 2 * guaranteed, 2):
+        x, y = rng.uniform(low, high, 2)
+        segments[i] = ((x, y - 0.5 * length), (x, y + 0.5 * length))
+        segments[i + 1] = ((x - 0.5 * length, y), (x + 0.5 * length, y))
+    return segments
+
+
+# n segments with about k intersecting pairs: the length is fitted to k with a few grid runs
+def generate(variant: str, count: int, intersections: int, seed: int) -> np.ndarray:
+    low, high = COORDINATE_RANGE
+    # For random directions a pair crosses with probability 2 length^2 / (pi area)
+    length = (high - low) * np.sqrt(np.pi * intersections / max(count * (count - 1), 1))
+    for _ in range(4):
+        segments = generate_shape(variant, count, length, np.random.default_rng(seed))
+        found = len(GridIntersection.find_intersections(segments)[0])
+        if intersections == 0 or abs(found - intersections) <= 0.1 * intersections:
+            break
+        length *= np.sqrt(max(intersections, 1) / max(found, 1))
+    return segments
+
+
+class Engines:
+    def __init__(self, workers: int):
+        self._notebooks = dict()
+        self._workers = workers
+
+    # (pairs, points) of an engine, pairs as a set of (i, j), points keyed by pair
+    def run(self, engine: str, segments: np.ndarray):
+        if engine in NOTEBOOK_ENGINES:
+            if engine not in self._notebooks:
+                self._notebooks[engine] = load_notebook(engine)
+            # The sweeps print their progress
+            with contextlib.redirect_stdout(io.StringIO()):
+                output = self._notebooks[engine]['find_intersections'](segments)
+            pairs, points = convert_notebook_output(engine, output)
+        else:
+            if engine == 'parallel':
+                pairs, points = ParallelIntersection.find_intersections(segments, self._workers)
+            else:
+                pairs, points = SegmentIntersection.ENGINES[engine](segments)
+            pairs, points = pairs.tolist(), points.tolist()
+        result = dict()
+        for (i, j), point in zip(pairs, points):
+            result.setdefault((min(i, j), max(i, j)), list()).append(point)
+        return result
+
+
+# Pairs of result missing from reference and extra in it, and the pairs of both without a point within tolerance
+def cross_check(result: dict, reference: dict, tolerance: float = 1e-7) -> dict:
+    missing = len(reference.keys() - result.keys())
+    extra = len(result.keys() - reference.keys())
+    far = 0
+    for pair in result.keys() & reference.keys():
+        points = [point for point in result[pair] if not np.isnan(point[0])]
+        if points and not any(np.hypot(x - rx, y - ry) <= tolerance * max(1.0, abs(rx), abs(ry))
+                              for x, y in points for rx, ry in reference[pair]):
+            far += 1
+    return {'missing': missing, 'extra': extra, 'far_points': far}
+
+
+def run(args):
+    engines = Engines(args.workers)
+    results = list()
+    # Engines over the time limit are not run on bigger inputs of the same variant and k per segment
+    slow = set()
+    for variant in args.variants:
+        for ratio in args.k_per_segment:
+            for count in sorted(args.sizes):
+                segments = generate(variant, count, int(round(ratio * count)), args.seed)
+                reference = None
+                for engine in ['grid'] + [engine for engine in args.engines if engine != 'grid']:
+                    if (variant, ratio, engine) in slow:
+                        continue
+                    # Runs under a second are repeated and the best time kept
+                    elapsed = np.inf
+                    try:
+                        for _ in range(args.repeat):
+                            start = time.perf_counter()
+                            result = engines.run(engine, segments)
+                            elapsed = min(elapsed, time.perf_counter() - start)
+                            if elapsed >= 1.0:
+                                break
+                    except Exception as error:
+                        results.append({'variant': variant, 'n': count, 'k_per_segment': ratio, 'engine': engine,
+                                        'error': f'{type(error).__name__}: {error}'})
+                        print(f'{variant:>9} n={count:<8} {engine:>11} error: {error}', file=sys.stderr)
+                        continue
+                    if elapsed > args.time_limit:
+                        slow.add((variant, ratio, engine))
+                    if reference is None:
+                        reference = result
+                    case = {'variant': variant, 'n': count, 'k_per_segment': ratio, 'k': len(reference),
+                            'engine': engine, 'time': elapsed, 'found': len(result)}
+                    case.update(cross_check(result, reference))
+                    results.append(case)
+                    print(_format_case(case), file=sys.stderr)
+    report = {'results': results}
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+
+# Fastest engine per input, then time against n and against k per engine, as PNG files when matplotlib is
+# installed
+def chart(args):
+    with open(args.report) as file:
+        results = [case for case in json.load(file)['results'] if 'error' not in case]
+    cases = sorted({(case['variant'], case['k_per_segment'], case['n']) for case in results})
+
+    print(f"{'variant':>9} {'k/n':>7} {'n':>8} {'k':>9} {'fastest':>11} {'auto':>11} "
+          + ' '.join(f'{engine:>11}' for engine in ENGINES))
+    for variant, ratio, count in cases:
+        times = {case['engine']: case for case in results
+                 if (case['variant'], case['k_per_segment'], case['n']) == (variant, ratio, count)}
+        # Engines that disagree with the reference are marked, not ranked
+        exact = {engine: case['time'] for engine, case in times.items()
+                 if case['missing'] == case['extra'] == case['far_points'] == 0}
+        fastest = min(exact, key=exact.get) if exact else '-'
+        k = next(iter(times.values()))['k']
+        cells = [f"{times[engine]['time']:>10.4f}{'' if engine in exact else '*'}" if engine in times
+                 else f"{'-':>11}" for engine in ENGINES]
+        auto = SegmentIntersection.choose_engine(count)
+        print(f"{variant:>9} {ratio:>7g} {count:>8} {k:>9} {fastest:>11} {auto:>11} " + ' '.join(
+            cell if cell.endswith('*') else cell + ' ' for cell in cells))
+    print('* output differs from the grid engine')
+
+    try:
+        from matplotlib import pyplot as plt
+    except ImportError:
+        print('matplotlib is not installed, no charts', file=sys.stderr)
+        return
+    os.makedirs(args.output, exist_ok=True)
+    for variant in sorted({case[0] for case in cases}):
+        figure, (by_n, by_k) = plt.subplots(1, 2, figsize=(12, 5))
+        for engine in ENGINES:
+            points = sorted((case['n'], case['k'], case['time'], case['k_per_segment']) for case in results
+                            if case['variant'] == variant and case['engine'] == engine)
+            if not points:
+                continue
+            for ratio in sorted({point[3] for point in points}):
+                line = [point for point in points if point[3] == ratio]
+                by_n.loglog([point[0] for point in line], [point[2] for point in line], marker='o',
+                            label=f'{engine}, k = {ratio:g} n')
+            largest = max(point[0] for point in points)
+            line = sorted((point[1], point[2]) for point in points if point[0] == largest)
+            by_k.loglog([point[0] for point in line], [point[1] for point in line], marker='o',
+                        label=f'{engine}, n = {largest}')
+        by_n.set_xlabel('n')
+        by_k.set_xlabel('k')
+        for axes in (by_n, by_k):
+            axes.set_ylabel('time, s')
+            axes.grid(True, which='both', alpha=0.3)
+            axes.legend(fontsize='x-small')
+        figure.suptitle(f'{variant} segments')
+        figure.tight_layout()
+        path = os.path.join(args.output, f'segment_engines_{variant}.png')
+        figure.savefig(path, dpi=120)
+        plt.close(figure)
+        print(f'wrote {path}', file=sys.stderr)
+
+
+def _format_case(case: dict) -> str:
+    check = '' if case['missing'] == case['extra'] == case['far_points'] == 0 else \
+        f" missing={case['missing']} extra={case['extra']} far_points={case['far_points']}"
+    return f"{case['variant']:>9} n={case['n']:<8} k={case['k']:<9} {case['engine']:>11} {case['time']:.4f}s{check}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time of every segment intersection engine, the notebook ones '
+                                                 'included, against the number of segments n and of intersecting '
+                                                 'pairs k')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run the engines and write a JSON report')
+    run_parser.add_argument('--sizes', nargs='+', type=int, default=[100, 300, 1000, 3000, 10000, 30000, 100000])
+    run_parser.add_argument('--k-per-segment', nargs='+', type=float, default=[0.1, 1.0, 10.0, 100.0],
+                            help='intersecting pairs per segment, k = ratio * n')
+    run_parser.add_argument('--variants', nargs='+', choices=VARIANTS, default=list(VARIANTS))
+    run_parser.add_argument('--engines', nargs='+', choices=ENGINES, default=list(ENGINES))
+    run_parser.add_argument('--time-limit', type=float, default=10.0,
+                            help='seconds after which an engine is not run on bigger inputs')
+    run_parser.add_argument('--repeat', type=int, default=5, help='runs of the engines taking under a second')
+    run_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='workers of the parallel engine')
+    run_parser.add_argument('--seed', type=int, default=42)
+    run_parser.add_argument('--output', '-o', help='JSON file, stdout by default')
+
+    chart_parser = commands.add_parser('chart', help='table of the fastest engines and charts of a report')
+    chart_parser.add_argument('report')
+    chart_parser.add_argument('--output', '-o', default='.', help='directory of the charts')
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        run(args)
+    else:
+        chart(args)
+
+
+if __name__ == '__main__':
+    main()
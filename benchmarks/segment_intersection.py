@@ -0,0 +1,57 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from geometry import GridIntersection, SweepIntersection
+from geometry.Segments import find_intersections_brute_force
+
+
+# count segments of the unit square of mean length about length
+def generate(count: int, length: float, rng: np.random.Generator) -> np.ndarray:
+    starts = rng.random((count, 2))
+    angles = rng.random(count) * 2.0 * np.pi
+    lengths = rng.random(count) * 2.0 * length
+    ends = starts + lengths[:, None] * np.column_stack((np.cos(angles), np.sin(angles)))
+    return np.stack((starts, ends), axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='All intersecting pairs of random segments: all pairs against the '
+                                                 'Bentley-Ottmann sweep and the grid broadphase')
+    parser.add_argument('sizes', nargs='*', type=int, default=[1000, 10000, 100000])
+    parser.add_argument('--length', type=float, default=None,
+                        help='mean segment length, 1 / sqrt(size) by default: about one intersection per segment')
+    parser.add_argument('--brute-force-limit', type=int, default=20000, help='largest size run with all pairs')
+    parser.add_argument('--max-memory', type=int, default=1 << 28, help='memory ceiling of the grid narrowphase')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'segments':>9} {'pairs':>9} {'all pairs, s':>13} {'sweep, s':>9} {'grid, s':>9} {'same':>6}")
+    for count in args.sizes:
+        length = args.length if args.length is not None else 1.0 / np.sqrt(count)
+        segments = generate(count, length, np.random.default_rng(args.seed))
+        results = dict()
+        times = dict()
+        runs = [('sweep', SweepIntersection.find_intersections),
+                ('grid', lambda s: GridIntersection.find_intersections(s, max_memory=args.max_memory))]
+        if count <= args.brute_force_limit:
+            runs.append(('all', find_intersections_brute_force))
+        for name, run in runs:
+            start = time.perf_counter()
+            results[name] = run(segments)
+            times[name] = time.perf_counter() - start
+        pairs = results['grid'][0]
+        same = all(np.array_equal(pairs, result[0]) and np.allclose(results['grid'][1], result[1], rtol=0.0,
+                                                                     atol=1e-9) for result in results.values())
+        brute_force = f"{times['all']:>13.3f}" if 'all' in times else f"{'-':>13}"
+        print(f"{count:>9} {len(pairs):>9} {brute_force} {times['sweep']:>9.3f} {times['grid']:>9.3f} "
+              f"{str(same):>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from voronoi.Box import Box
+from voronoi.FortuneAlgorithm import FortuneAlgorithm
+from voronoi.Vector2 import Vector2
+
+DISTRIBUTIONS = ('uniform', 'clustered', 'collinear', 'grid')
+PHASES = ('construct', 'bound', 'intersect')
+# Differences below these are noise and never flagged by compare
+MIN_DELTAS = {'time': 0.005, 'peak_rss_kb': 1024}
+
+
+def generate(distribution: str, count: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    if distribution == 'uniform':
+        return rng.random((count, 2))
+    if distribution == 'clustered':
+        centres = rng.random((max(count // 1000, 4), 2))
+        return centres[rng.integers(len(centres), size=count)] + rng.normal(0.0, 0.02, (count, 2))
+    if distribution == 'collinear':
+        x = rng.random(count)
+        return np.column_stack((x, 0.5 * x + rng.normal(0.0, 1e-4, count)))
+    if distribution == 'grid':
+        # Many equal y and cocircular quadruples
+        side = int(np.ceil(np.sqrt(count)))
+        return np.column_stack((np.arange(count) % side, np.arange(count) // side)).astype(np.float64)
+    raise ValueError(distribution)
+
+
+# One case in the current process: time, allocated blocks per phase and the peak RSS of the process
+def run_case(distribution: str, count: int, seed: int) -> dict:
+    coordinates = generate(distribution, count, seed)
+    points = [Vector2(x, y) for x, y in coordinates.tolist()]
+    left, bottom = coordinates.min(axis=0)
+    right, top = coordinates.max(axis=0)
+    margin = 0.05 * max(right - left, top - bottom, 1e-9)
+    result = {'distribution': distribution, 'n': count, 'seed': seed, 'phases': dict()}
+
+    algorithm = FortuneAlgorithm(points)
+    steps = (('construct', lambda: algorithm.construct()),
+             ('bound', lambda: algorithm.bound(Box(left - margin, bottom - margin, right + margin, top + margin))),
+             ('intersect', lambda: algorithm.get_diagram().intersect(Box(left, bottom, right, top))))
+    gc.collect()
+    for phase, step in steps:
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception as error:
+            result['error'] = f'{phase}: {type(error).__name__}: {error}'
+            break
+        elapsed = time.perf_counter() - start
+        result['phases'][phase] = {'time': elapsed, 'allocated_blocks': sys.getallocatedblocks() - blocks}
+
+    if 'construct' in result['phases']:
+        # Every circle event adds one Delaunay triangle
+        events = count + len(algorithm.get_delaunay_triangles())
+        result['events'] = events
+        result['events_per_second'] = events / max(result['phases']['construct']['time'], 1e-12)
+    result['peak_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return result
+
+
+def get_metadata() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ''
+    return {'commit': commit, 'date': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+            'numpy': np.__version__, 'machine': platform.machine(), 'processor': platform.processor()}
+
+
+def run(args):
+    results = list()
+    for count in args.sizes:
+        for distribution in args.distributions:
+            # A fresh process per case, so that peak RSS belongs to the case; best time of the repeats
+            best = None
+            for _ in range(args.repeat):
+                output = subprocess.run([sys.executable, os.path.abspath(__file__), 'case', distribution, str(count),
+                                         '--seed', str(args.seed)], capture_output=True, text=True)
+                if output.returncode != 0:
+                    case = {'distribution': distribution, 'n': count, 'seed': args.seed, 'phases': dict(),
+                            'error': output.stderr.strip().splitlines()[-1] if output.stderr.strip() else 'crashed'}
+                else:
+                    case = json.loads(output.stdout)
+                if best is None or _get_total_time(case) < _get_total_time(best):
+                    best = case
+            results.append(best)
+            print(_format_case(best), file=sys.stderr)
+
+    report = {'metadata': get_metadata(), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+
+# Regressions of new against base: a metric of a case grew by more than threshold (0.1 is 10%)
+def compare(args) -> int:
+    with open(args.base) as file:
+        base = {(case['distribution'], case['n']): case for case in json.load(file)['results']}
+    with open(args.new) as file:
+        new = {(case['distribution'], case['n']): case for case in json.load(file)['results']}
+
+    regressions = 0
+    print(f"{'distribution':>12} {'n':>9} {'metric':>20} {'base':>12} {'new':>12} {'change':>8}")
+    for key in sorted(base.keys() & new.keys()):
+        for metric, base_value, new_value in _get_metrics(base[key], new[key]):
+            change = (new_value - base_value) / base_value if base_value else 0.0
+            flag = ''
+            if change > args.threshold and new_value - base_value > MIN_DELTAS[metric.split('.')[-1]]:
+                flag = ' REGRESSION'
+                regressions += 1
+            print(f"{key[0]:>12} {key[1]:>9} {metric:>20} {base_value:>12.4g} {new_value:>12.4g} "
+                  f"{change:>+7.1%}{flag}")
+        if 'error' in new[key] and 'error' not in base[key]:
+            print(f"{key[0]:>12} {key[1]:>9} {'error':>20} {new[key]['error']} REGRESSION")
+            regressions += 1
+    print(f'{regressions} regression(s) above {args.threshold:.0%}')
+    return 1 if regressions else 0
+
+
+def _get_metrics(base: dict, new: dict):
+    for phase in PHASES:
+        if phase in base['phases'] and phase in new['phases']:
+            yield f'{phase}.time', base['phases'][phase]['time'], new['phases'][phase]['time']
+    if 'peak_rss_kb' in base and 'peak_rss_kb' in new:
+        yield 'peak_rss_kb', base['peak_rss_kb'], new['peak_rss_kb']
+
+
+def _get_total_time(case: dict) -> float:
+    if 'error' in case:
+        return float('inf')
+    return sum(phase['time'] for phase in case['phases'].values())
+
+
+def _format_case(case: dict) -> str:
+    phases = ' '.join(f"{phase}={values['time']:.3f}s" for phase, values in case['phases'].items())
+    events = f" {case['events_per_second']:.0f} events/s" if 'events_per_second' in case else ''
+    error = f" error: {case['error']}" if 'error' in case else ''
+    return f"{case['distribution']:>10} n={case['n']:<8} {phases}{events}{error}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks of FortuneAlgorithm construct(), bound() and intersect()')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run the suite and write a JSON report')
+    run_parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000, 100000, 1000000])
+    run_parser.add_argument('--distributions', nargs='+', choices=DISTRIBUTIONS, default=list(DISTRIBUTIONS))
+    run_parser.add_argument('--repeat', type=int, default=1, help='runs per case, the fastest one is kept')
+    run_parser.add_argument('--seed', type=int, default=42)
+    run_parser.add_argument('--output', '-o', help='JSON file, stdout by default')
+
+    compare_parser = commands.add_parser('compare', help='compare two reports, exit code 1 on regressions')
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=0.1, help='relative growth flagged, 0.1 is 10%%')
+
+    case_parser = commands.add_parser('case', help='run a single case in this process and print it as JSON')
+    case_parser.add_argument('distribution', choices=DISTRIBUTIONS)
+    case_parser.add_argument('n', type=int)
+    case_parser.add_argument('--seed', type=int, default=42)
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        run(args)
+    elif args.command == 'compare':
+        sys.exit(compare(args))
+    else:
+        json.dump(run_case(args.distribution, args.n, args.seed), sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
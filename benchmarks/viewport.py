@@ -0,0 +1,79 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from voronoi.Box import Box
+from voronoi.FortuneAlgorithm import FortuneAlgorithm
+from voronoi.Vector2 import Vector2
+from voronoi.ViewportFortuneAlgorithm import ViewportFortuneAlgorithm
+
+
+# Clipped cells by global site index: sorted (x, y, neighbour) of their vertices, rounded to absorb the rounding of
+# the box crossings. Zero-length edges of co-circular sites are merged away by the set.
+def get_cells(diagram, site_indices) -> dict:
+    cells = dict()
+    for site in diagram.get_sites():
+        half_edge = site.face.outer_component
+        if half_edge is None:
+            continue
+        vertices = set()
+        while True:
+            twin = site_indices[half_edge.twin.incident_face.site.index] if half_edge.twin is not None else -1
+            vertices.add((round(half_edge.origin.point.x, 9), round(half_edge.origin.point.y, 9), twin))
+            half_edge = half_edge.next
+            if half_edge is site.face.outer_component:
+                break
+        cells[site_indices[site.index]] = sorted(vertices)
+    return cells
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ViewportFortuneAlgorithm against a full build + intersect(box)')
+    parser.add_argument('--sites', type=int, default=100000)
+    parser.add_argument('--widths', nargs='+', type=float, default=[0.005, 0.02, 0.05, 0.1, 0.3, 1.0])
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    points = [Vector2(random.random(), random.random()) for _ in range(args.sites)]
+    start = time.perf_counter()
+    viewport = ViewportFortuneAlgorithm(points)
+    index_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    algorithm = FortuneAlgorithm(points)
+    algorithm.construct()
+    algorithm.bound(Box(-0.05, -0.05, 1.05, 1.05))
+    full_time = time.perf_counter() - start
+    print(f'{args.sites} sites: full construct + bound {full_time:.3f}s, viewport index {index_time:.3f}s')
+
+    print(f"{'width':>8} {'cells':>8} {'swept':>8} {'full, s':>9} {'viewport, s':>12} {'speedup':>8} {'same':>6}")
+    site_indices = list(range(args.sites))
+    for width in args.widths:
+        left, bottom = random.uniform(0.0, 1.0 - width), random.uniform(0.0, 1.0 - width)
+        box = (left, bottom, left + width, bottom + width)
+
+        # intersect() is destructive, the full diagram is rebuilt for every box
+        start = time.perf_counter()
+        algorithm = FortuneAlgorithm(points)
+        algorithm.construct()
+        algorithm.bound(Box(-0.05, -0.05, 1.05, 1.05))
+        algorithm.get_diagram().intersect(Box(*box))
+        full_box_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        viewport.construct(Box(*box))
+        viewport_time = time.perf_counter() - start
+
+        expected = get_cells(algorithm.get_diagram(), site_indices)
+        cells = get_cells(viewport.get_diagram(), viewport.get_site_indices().tolist())
+        print(f'{width:>8.3f} {len(cells):>8} {len(viewport.get_site_indices()):>8} {full_box_time:>9.3f} '
+              f'{viewport_time:>12.4f} {full_box_time / viewport_time:>7.1f}x {str(cells == expected):>6}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from geometry.Segments import intersect_pairs, normalize, sort_pairs
+
+# Bytes of the temporary arrays per candidate pair, to turn the memory ceiling into a chunk size
+BYTES_PER_PAIR = 256
+
+
+# Uniform grid broadphase: every segment goes into the cells its bounding box covers, and two segments are a
+# candidate pair in the cell holding the lower left corner of the intersection of their bounding boxes, so every
+# pair is generated once without deduplication. The candidates are tested by intersect_pairs() in chunks of at most
+# max_memory bytes of temporaries. cell_size defaults to the mean bounding box side, at least the side of a cell
+# of the bounding box of all the segments split into len(segments) cells.
+def find_intersections(segments: np.ndarray, cell_size: Optional[float] = None, max_memory: int = 1 << 28) \
+        -> Tuple[np.ndarray, np.ndarray]:
+    segments = normalize(segments)
+    pairs, points = [np.empty((0, 2), dtype=np.int64)], [np.empty((0, 2), dtype=np.float64)]
+    for first, second in get_candidate_pairs(segments, cell_size, max_memory // BYTES_PER_PAIR):
+        mask, chunk_points = intersect_pairs(segments, first, second)
+        pairs.append(np.column_stack((first[mask], second[mask])))
+        points.append(chunk_points[mask])
+    return sort_pairs(np.concatenate(pairs), np.concatenate(points))
+
+
+# Chunks (first, second) of at most chunk_size candidate pairs, first < second, with overlapping bounding boxes.
+# With layers, an array of 0 and 1 per segment, only pairs of a segment of layer 0 and one of layer 1 are generated.
+def get_candidate_pairs(segments: np.ndarray, cell_size: Optional[float] = None, chunk_size: int = 1 << 20,
+                        layers: Optional[np.ndarray] = None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    count = len(segments)
+    if count < 2:
+        return
+    low = np.minimum(segments[:, 0], segments[:, 1])
+    high = np.maximum(segments[:, 0], segments[:, 1])
+    origin = low.min(axis=0)
+    if cell_size is None:
+        extent = high.max(axis=0) - origin
+        cell_size = max(float(np.mean(high - low)), float(np.sqrt(extent[0] * extent[1] / count)))
+    if not cell_size > 0.0:
+        cell_size = 1.0
+
+    low_cells = np.floor((low - origin) / cell_size).astype(np.int64)
+    high_cells = np.floor((high - origin) / cell_size).astype(np.int64)
+    width = int(high_cells[:, 0].max()) + 1
+    spans = high_cells - low_cells + 1
+
+    # One entry per segment and covered cell, sorted by cell, then layer
+    counts = spans[:, 0] * spans[:, 1]
+    entry_segments = np.repeat(np.arange(count), counts)
+    local = np.arange(len(entry_segments)) - np.repeat(np.cumsum(counts) - counts, counts)
+    entry_cells = (low_cells[entry_segments, 1] + local // spans[entry_segments, 0]) * width \
+        + low_cells[entry_segments, 0] + local % spans[entry_segments, 0]
+    del local
+    keys = entry_cells if layers is None else 2 * entry_cells + layers[entry_segments]
+    order = np.argsort(keys, kind='stable')
+    keys, entry_cells, entry_segments = keys[order], entry_cells[order], entry_segments[order]
+    del order
+
+    if layers is None:
+        # Each entry pairs with the entries after it in its cell
+        partner_begins = np.arange(len(keys)) + 1
+        pair_counts = np.searchsorted(keys, keys, side='right') - partner_begins
+    else:
+        # Entries of the first layer pair with the entries of the second layer in their cell, the others with none
+        partner_begins = np.searchsorted(keys, 2 * entry_cells + 1, side='left')
+        pair_counts = np.searchsorted(keys, 2 * entry_cells + 2, side='left') - partner_begins
+        pair_counts[(keys & 1) == 1] = 0
+    del keys
+    pair_ends = np.cumsum(pair_counts)
+
+    begin = 0
+    while begin < len(entry_cells):
+        before = pair_ends[begin] - pair_counts[begin]
+        end = max(int(np.searchsorted(pair_ends, before + chunk_size, side='right')), begin + 1)
+        chunk_counts = pair_counts[begin:end]
+        first_entries = np.repeat(np.arange(begin, end), chunk_counts)
+        second_entries = partner_begins[first_entries] + np.arange(len(first_entries)) \
+            - np.repeat(pair_ends[begin:end] - chunk_counts - before, chunk_counts)
+        begin = end
+
+        first, second = entry_segments[first_entries], entry_segments[second_entries]
+        corner = np.maximum(low[first], low[second])
+        keep = np.all(corner <= np.minimum(high[first], high[second]), axis=1)
+        corner_cells = np.floor((corner - origin) / cell_size).astype(np.int64)
+        keep &= corner_cells[:, 1] * width + corner_cells[:, 0] == entry_cells[first_entries]
+        first, second = first[keep], second[keep]
+        yield np.minimum(first, second), np.maximum(first, second)
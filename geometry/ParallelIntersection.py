@@ -0,0 +1,101 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from geometry import GridIntersection, SweepIntersection
+from geometry.Segments import normalize, sort_pairs
+
+ENGINES = {
+    'grid': GridIntersection.find_intersections,
+    'sweep': SweepIntersection.find_intersections,
+}
+
+
+# Pairs of one strip with global indices, and what the strip cost
+class StripResult:
+    def __init__(self, strip: int, low: float, high: float, segment_count: int, found_count: int,
+                 pairs: np.ndarray, points: np.ndarray, seconds: float):
+        self.strip = strip
+        self.low = low
+        self.high = high
+        self.segment_count = segment_count
+        # Pairs found in the strip, before those owned by other strips were dropped
+        self.found_count = found_count
+        self.pairs = pairs
+        self.points = points
+        self.seconds = seconds
+
+
+def _find_strip(task: Tuple) -> StripResult:
+    strip, low, high, segments, indices, engine = task
+    start = time.perf_counter()
+    pairs, points = ENGINES[engine](segments)
+    # Owned pairs: the y of their point clamped to the y range both segments cover is in [low, high)
+    first, second = pairs[:, 0], pairs[:, 1]
+    bottom = np.maximum(segments[first, 1, 1], segments[second, 1, 1])
+    top = np.minimum(segments[first, 0, 1], segments[second, 0, 1])
+    ys = np.minimum(np.maximum(points[:, 1], bottom), top)
+    owned = (ys >= low) & (ys < high)
+    # Local indices are increasing in the global ones, so the pairs and their points are those of a global run
+    return StripResult(strip, low, high, len(segments), len(pairs), indices[pairs[owned]], points[owned],
+                       time.perf_counter() - start)
+
+
+# Same pairs and points as the other engines, with the work split across processes.
+#
+# The plane is cut into horizontal strips with the same number of segment midpoints. A segment belongs to every
+# strip its y range touches, and each strip runs the engine over its segments in its own process. A pair found by
+# several strips is kept by one: the strip that holds the y of its point clamped to the y range both segments cover.
+# The point is computed by the same arithmetic in every strip, and both segments belong to that strip, so every
+# pair is kept exactly once.
+class ParallelIntersection:
+    def __init__(self, segments: np.ndarray, workers: Optional[int] = None, strips: Optional[int] = None,
+                 engine: str = 'grid'):
+        if engine not in ENGINES:
+            raise ValueError(f'unknown engine {engine!r}, expected one of {sorted(ENGINES)}')
+        self._segments = normalize(segments)
+        self._workers = workers or os.cpu_count() or 1
+        self._strips = strips or self._workers
+        self._engine = engine
+        self._strip_results: List[StripResult] = list()
+
+    # Per-strip results of the last find(), to see the load balance
+    def get_strip_results(self) -> List[StripResult]:
+        return self._strip_results
+
+    def find(self) -> Tuple[np.ndarray, np.ndarray]:
+        segments = self._segments
+        count = len(segments)
+        # Upper endpoints first, so y goes down from the first endpoint to the second
+        tops, bottoms = segments[:, 0, 1], segments[:, 1, 1]
+        strips = max(1, min(self._strips, count))
+        middles = np.sort(0.5 * (tops + bottoms))
+        boundaries = middles[count * np.arange(1, strips) // strips] if count > 0 else np.empty(0)
+        first_strips = np.searchsorted(boundaries, bottoms, side='left')
+        last_strips = np.searchsorted(boundaries, tops, side='right')
+
+        tasks = list()
+        for strip in range(strips):
+            indices = np.flatnonzero((first_strips <= strip) & (last_strips >= strip))
+            low = boundaries[strip - 1] if strip > 0 else -np.inf
+            high = boundaries[strip] if strip < strips - 1 else np.inf
+            tasks.append((strip, float(low), float(high), segments[indices], indices, self._engine))
+        # Biggest strips first, so the last ones to finish are short
+        tasks.sort(key=lambda task: len(task[4]), reverse=True)
+
+        with ProcessPoolExecutor(self._workers) if self._workers > 1 and strips > 1 else nullcontext() as executor:
+            results = list((executor.map if executor is not None else map)(_find_strip, tasks))
+        self._strip_results = sorted(results, key=lambda result: result.strip)
+        return sort_pairs(np.concatenate([np.empty((0, 2), dtype=np.int64)]
+                                         + [result.pairs for result in self._strip_results]),
+                          np.concatenate([np.empty((0, 2), dtype=np.float64)]
+                                         + [result.points for result in self._strip_results]))
+
+
+def find_intersections(segments: np.ndarray, workers: Optional[int] = None, strips: Optional[int] = None,
+                       engine: str = 'grid') -> Tuple[np.ndarray, np.ndarray]:
+    return ParallelIntersection(segments, workers, strips, engine).find()
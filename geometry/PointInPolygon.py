@@ -0,0 +1,117 @@
+from typing import Iterator, Tuple
+
+import numpy as np
+
+# Absolute tolerance of the boundary tests of is_point_inside_ray_method() in lab4.2
+TOLERANCE = 1e-9
+
+OUTSIDE, INSIDE, BOUNDARY = 0, 1, 2
+
+# Bytes of the temporary arrays per candidate point and edge, to turn the memory ceiling into a chunk size
+BYTES_PER_TEST = 192
+# Candidates of a chunk at most, whatever the ceiling: the temporaries of smaller chunks stay in the cache
+CHUNK_SIZE = 1 << 14
+
+
+# Edges of the polygon of the (n, 2) vertices, edge i from vertex i to vertex i + 1, with the per-edge values of the
+# tests of is_point_inside_ray_method(). [low, high] and [left, right] are the y and x ranges widened by the tolerance
+# and a few ulps: points outside the y range are neither on nor crossing an edge, and points outside the x range are
+# on an edge of neither side, whatever the rounding of the tests.
+class PolygonEdges:
+    def __init__(self, polygon: np.ndarray):
+        polygon = np.asarray(polygon, dtype=np.float64).reshape(-1, 2)
+        self.x1, self.y1 = polygon[:, 0], polygon[:, 1]
+        self.x2, self.y2 = np.roll(self.x1, -1), np.roll(self.y1, -1)
+        self.dx, self.dy = self.x2 - self.x1, self.y2 - self.y1
+        self.horizontal = np.abs(self.dy) < TOLERANCE
+        self.vertical = ~self.horizontal & (np.abs(self.dx) < TOLERANCE)
+        # Divisors of the masked-out edges, which divide by zero otherwise
+        self.safe_dx = np.where(self.horizontal | self.vertical, 1.0, self.dx)
+        self.safe_dy = np.where(self.dy == 0.0, 1.0, self.dy)
+        y_padding = TOLERANCE + 8.0 * np.spacing(np.maximum(np.abs(self.y1), np.abs(self.y2)))
+        x_padding = TOLERANCE + 8.0 * np.spacing(np.maximum(np.abs(self.x1), np.abs(self.x2)))
+        self.low, self.high = np.minimum(self.y1, self.y2) - y_padding, np.maximum(self.y1, self.y2) + y_padding
+        self.left, self.right = np.minimum(self.x1, self.x2) - x_padding, np.maximum(self.x1, self.x2) + x_padding
+
+    def __len__(self) -> int:
+        return len(self.x1)
+
+    # Whether the points (px, py) are on the edges and whether their rays cross them, point i against edges[i]
+    def test(self, px: np.ndarray, py: np.ndarray, edges: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        x1, y1, x2, y2 = self.x1[edges], self.y1[edges], self.x2[edges], self.y2[edges]
+        t = (px - x1) / self.safe_dx[edges]
+        on_edge = np.where(self.horizontal[edges],
+                           (np.abs(py - y1) < TOLERANCE) & (np.minimum(x1, x2) <= px) & (px <= np.maximum(x1, x2)),
+                           np.where(self.vertical[edges],
+                                    (np.abs(px - x1) < TOLERANCE) & (np.minimum(y1, y2) <= py)
+                                    & (py <= np.maximum(y1, y2)),
+                                    (0.0 <= t) & (t <= 1.0) & (np.abs(py - (y1 + t * self.dy[edges])) < TOLERANCE)))
+        crossing = ((y1 > py) != (y2 > py)) & (px < self.dx[edges] * (py - y1) / self.safe_dy[edges] + x1)
+        return on_edge, crossing
+
+
+# Location of every point of the (N, 2) points against the polygon of the (n, 2) vertices, as OUTSIDE, INSIDE or
+# BOUNDARY in an int8 array. Makes the decisions of is_point_inside_ray_method() with the same float operations:
+# points within TOLERANCE of an edge are on the boundary, the others are inside if a ray to +x crosses an odd number
+# of edges, an edge being crossed if its ends are on different sides of y and the ray starts left of it.
+#
+# A point can only be on or cross the edges whose y range, widened by the tolerance, holds it. With the points sorted
+# by y, those of an edge are a range found by bisection, and the crossing numbers are evaluated on these candidate
+# (point, edge) pairs alone, in chunks of at most max_memory bytes of temporaries, in O((N + n) log N + candidates).
+# A ray meets a few edges of most polygons, so there are a few candidates per point.
+def classify_points(polygon: np.ndarray, points: np.ndarray, max_memory: int = 1 << 28) -> np.ndarray:
+    edges = PolygonEdges(polygon)
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    result = np.zeros(len(points), dtype=np.int8)
+    if len(edges) == 0 or len(points) == 0:
+        return result
+
+    order = np.argsort(points[:, 1], kind='stable')
+    sorted_x, sorted_y = points[order, 0], points[order, 1]
+    starts = np.searchsorted(sorted_y, edges.low, side='left')
+    counts = np.searchsorted(sorted_y, edges.high, side='right') - starts
+
+    crossings = np.zeros(len(points), dtype=np.int64)
+    boundary = np.zeros(len(points), dtype=bool)
+    for candidate_edges, offsets in get_chunks(counts, max(1, min(CHUNK_SIZE, max_memory // BYTES_PER_TEST))):
+        positions = starts[candidate_edges] + offsets
+        px, py = sorted_x[positions], sorted_y[positions]
+        # Edges left of a point are neither crossed nor touched by it, those clearly right of it are crossed if they
+        # straddle its y, whatever the rounding of their x at it
+        clear = px < edges.left[candidate_edges]
+        straddle = (edges.y1[candidate_edges] > py) != (edges.y2[candidate_edges] > py)
+        add_counts(crossings, positions[clear & straddle])
+        near = ~clear & (px <= edges.right[candidate_edges])
+
+        positions = positions[near]
+        on_edge, crossing = edges.test(px[near], py[near], candidate_edges[near])
+        boundary[positions[on_edge]] = True
+        add_counts(crossings, positions[crossing])
+
+    inside = crossings % 2 == 1
+    result[order[inside]] = INSIDE
+    result[order[boundary]] = BOUNDARY
+    return result
+
+
+# is_point_inside_ray_method() of every point: True inside, False outside and on the boundary
+def is_inside(polygon: np.ndarray, points: np.ndarray, max_memory: int = 1 << 28) -> np.ndarray:
+    return classify_points(polygon, points, max_memory) == INSIDE
+
+
+# Chunks (owners, offsets) of at most chunk_size items, over counts[i] items of every owner i in order
+def get_chunks(counts: np.ndarray, chunk_size: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    ends = np.cumsum(counts)
+    total = int(ends[-1]) if len(ends) > 0 else 0
+    for start in range(0, total, chunk_size):
+        items = np.arange(start, min(start + chunk_size, total))
+        owners = np.searchsorted(ends, items, side='right')
+        yield owners, items - (ends[owners] - counts[owners])
+
+
+# counts[i] += number of times i is in indices, over the span of indices only
+def add_counts(counts: np.ndarray, indices: np.ndarray):
+    if len(indices) > 0:
+        low = int(indices.min())
+        span = np.bincount(indices - low)
+        counts[low:low + len(span)] += span
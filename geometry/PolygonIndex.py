@@ -0,0 +1,179 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from geometry.PointInPolygon import BOUNDARY, CHUNK_SIZE, INSIDE, OUTSIDE, PolygonEdges, add_counts, get_chunks
+
+# Columns of the grid at most: the parity table holds one bit per column for every vertex
+MAX_COLUMNS = 256
+
+
+# Point-in-polygon index of the polygon of the (n, 2) vertices, with the answers of classify_points(), which are those
+# of is_point_inside_ray_method(), on-edge points included.
+#
+# A grid of rows and columns over the bounding box of the polygon. For a point in a cell, the edges of a row fall in
+# three groups by the x range of their part in the row, widened by the tolerance: those left of the cell are neither
+# crossed nor touched by the ray of the point, those right of it are crossed if they straddle the y of the point, and
+# the others are listed in the cell and tested exactly. The parity of the crossings of the edges right of the cell is
+# a function of y that only changes at vertices: the rows are cut into sub-slabs at the vertices, and a table holds
+# that parity for every sub-slab and column, one bit each. A query bisects its sub-slab, reads the bit and tests the
+# edges of its cell, in O(log n + edges per cell).
+#
+# The grid has cells_per_vertex cells per vertex, at most MAX_COLUMNS columns. Polygons with edges about as long as
+# the cells have a few edges per cell; those of generate_polygon() with long spikes over the whole polygon have about
+# n / sqrt(cells) per cell, still far fewer than the edges a ray crosses.
+class PolygonIndex:
+    # Bytes of the temporaries of a build or query chunk per item, to turn the memory ceiling into a chunk size
+    BYTES_PER_ITEM = 192
+
+    def __init__(self, polygon: np.ndarray, cells_per_vertex: float = 4.0, max_memory: int = 1 << 28):
+        self._edges = PolygonEdges(polygon)
+        self._max_memory = max_memory
+        if len(self._edges) == 0:
+            return
+        edges = self._edges
+        chunk_size = max(1, max_memory // self.BYTES_PER_ITEM)
+
+        # Grid over the widened bounding box, points outside it are outside the polygon
+        bottom, top = float(edges.low.min()), float(edges.high.max())
+        left, right = float(edges.left.min()), float(edges.right.max())
+        cell_count = max(1.0, cells_per_vertex * len(edges))
+        column_count = int(min(MAX_COLUMNS, max(1, round(np.sqrt(cell_count * (right - left) / (top - bottom))))))
+        row_count = max(1, int(round(cell_count / column_count)))
+        self._rows = np.linspace(bottom, top, row_count + 1)
+        self._columns = np.linspace(left, right, column_count + 1)
+        # Sub-slab i is [breaks[i], breaks[i + 1]), in row slab_rows[i]
+        self._breaks = np.unique(np.concatenate((self._rows, edges.y1)))
+        self._slab_rows = np.searchsorted(self._rows, self._breaks[:-1], side='right') - 1
+        row_slabs = np.searchsorted(self._breaks, self._rows, side='left')
+
+        # Rows of every edge, and the x range of the edge in each, widened by the tolerance in y, then in x
+        first_rows = np.clip(np.searchsorted(self._rows, edges.low, side='right') - 1, 0, row_count - 1)
+        last_rows = np.clip(np.searchsorted(self._rows, edges.high, side='right') - 1, 0, row_count - 1)
+        cells: List[np.ndarray] = [np.empty(0, dtype=np.int64)]
+        cell_edges: List[np.ndarray] = [np.empty(0, dtype=np.int64)]
+        flips: List[np.ndarray] = [np.empty(0, dtype=np.int64)]
+        for row_edges, offsets in get_chunks(last_rows - first_rows + 1, chunk_size):
+            rows = first_rows[row_edges] + offsets
+            x_low, x_high = self._get_row_range(row_edges, rows)
+            # Columns right of the range, where the edge is crossed if it straddles y, and those of the range
+            clear = np.searchsorted(self._columns[1:], x_low, side='right')
+            last_columns = np.minimum(np.searchsorted(self._columns[:-1], x_high, side='right') - 1, column_count - 1)
+
+            for owners, columns in get_chunks(np.maximum(last_columns - clear + 1, 0), chunk_size):
+                cells.append(rows[owners] * column_count + clear[owners] + columns)
+                cell_edges.append(row_edges[owners])
+
+            # The edge straddles the sub-slabs from its lower vertex up to its upper one, in the row: the parity of
+            # the columns left of clear flips there, from the first of them to the last
+            y_low = np.minimum(edges.y1[row_edges], edges.y2[row_edges])
+            y_high = np.maximum(edges.y1[row_edges], edges.y2[row_edges])
+            first_slabs = np.maximum(np.searchsorted(self._breaks, y_low, side='left'), row_slabs[rows])
+            end_slabs = np.minimum(np.searchsorted(self._breaks, y_high, side='left'), row_slabs[rows + 1])
+            flipped = (first_slabs < end_slabs) & (clear > 0)
+            keys = np.concatenate((first_slabs[flipped], end_slabs[flipped])) * (column_count + 1) + \
+                np.tile(clear[flipped], 2)
+            # Flips of the same key cancel, as at the row boundaries an edge goes through
+            keys, key_counts = np.unique(keys, return_counts=True)
+            flips.append(keys[key_counts % 2 == 1])
+
+        cells, cell_edges = np.concatenate(cells), np.concatenate(cell_edges)
+        order = np.argsort(cells, kind='stable')
+        # Half the memory of the largest array, for any polygon that fits in memory
+        self._cell_edges = cell_edges[order].astype(np.int32)
+        self._cell_starts = np.zeros(row_count * column_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=row_count * column_count), out=self._cell_starts[1:])
+        del cells, cell_edges, order
+
+        keys, key_counts = np.unique(np.concatenate(flips), return_counts=True)
+        self._parities = self._get_parities(keys[key_counts % 2 == 1], len(self._breaks), column_count)
+
+    # Bytes of the arrays of the index
+    def get_memory(self) -> int:
+        if len(self._edges) == 0:
+            return 0
+        return sum(array.nbytes for array in (self._rows, self._columns, self._breaks, self._slab_rows,
+                                              self._cell_edges, self._cell_starts, self._parities)) + \
+            sum(array.nbytes for array in vars(self._edges).values())
+
+    # Edges per cell on average
+    def get_cell_load(self) -> float:
+        if len(self._edges) == 0:
+            return 0.0
+        return len(self._cell_edges) / (len(self._cell_starts) - 1)
+
+    # OUTSIDE, INSIDE or BOUNDARY for every point of the (N, 2) points, as classify_points()
+    def classify(self, points: np.ndarray) -> np.ndarray:
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        result = np.full(len(points), OUTSIDE, dtype=np.int8)
+        if len(self._edges) == 0:
+            return result
+        chunk_size = max(1, min(CHUNK_SIZE, self._max_memory // self.BYTES_PER_ITEM))
+        for start in range(0, len(points), chunk_size):
+            px, py = points[start:start + chunk_size, 0], points[start:start + chunk_size, 1]
+            result[start:start + len(px)] = self._classify_chunk(px, py, chunk_size)
+        return result
+
+    # is_point_inside_ray_method() of every point: True inside, False outside and on the boundary
+    def is_inside(self, points: np.ndarray) -> np.ndarray:
+        return self.classify(points) == INSIDE
+
+    def _classify_chunk(self, px: np.ndarray, py: np.ndarray, chunk_size: int) -> np.ndarray:
+        result = np.full(len(px), OUTSIDE, dtype=np.int8)
+        column_count = len(self._columns) - 1
+        # NaN and points outside the grid are outside, as the ray of the method crosses no edge or an even number
+        inside_grid = np.flatnonzero((py >= self._rows[0]) & (py < self._rows[-1])
+                                     & (px >= self._columns[0]) & (px < self._columns[-1]))
+        px, py = px[inside_grid], py[inside_grid]
+        slabs = np.searchsorted(self._breaks, py, side='right') - 1
+        columns = np.minimum(np.searchsorted(self._columns, px, side='right') - 1, column_count - 1)
+        crossings = (self._parities[slabs, columns >> 3] >> (7 - (columns & 7)) & 1).astype(np.int64)
+
+        cells = self._slab_rows[slabs] * column_count + columns
+        starts = self._cell_starts[cells]
+        boundary = np.zeros(len(px), dtype=bool)
+        for points, offsets in get_chunks(self._cell_starts[cells + 1] - starts, chunk_size):
+            on_edge, crossing = self._edges.test(px[points], py[points], self._cell_edges[starts[points] + offsets])
+            boundary[points[on_edge]] = True
+            add_counts(crossings, points[crossing])
+
+        chunk_result = np.where(crossings % 2 == 1, INSIDE, OUTSIDE).astype(np.int8)
+        chunk_result[boundary] = BOUNDARY
+        result[inside_grid] = chunk_result
+        return result
+
+    # [x_low, x_high] of the part of every edge in its row, with the rows widened by the tolerance: the points of the
+    # row near the edge are in it, and the ray crosses the edge at an x in it
+    def _get_row_range(self, edges: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        polygon_edges = self._edges
+        y1, y2, dy = polygon_edges.y1[edges], polygon_edges.y2[edges], polygon_edges.dy[edges]
+        y_low, y_high = np.minimum(y1, y2), np.maximum(y1, y2)
+        bottom = np.clip(self._rows[rows] - (y_low - polygon_edges.low[edges]), y_low, y_high)
+        top = np.clip(self._rows[rows + 1] + (polygon_edges.high[edges] - y_high), y_low, y_high)
+        # x along the edge at both ends, as the method computes it, exact at the vertices
+        x1, dx, safe_dy = polygon_edges.x1[edges], polygon_edges.dx[edges], polygon_edges.safe_dy[edges]
+        x_bottom, x_top = dx * (bottom - y1) / safe_dy + x1, dx * (top - y1) / safe_dy + x1
+        straight = polygon_edges.horizontal[edges] | polygon_edges.vertical[edges] | (dy == 0.0)
+        padding = polygon_edges.right[edges] - np.maximum(x1, polygon_edges.x2[edges])
+        x_low = np.where(straight, polygon_edges.left[edges], np.minimum(x_bottom, x_top) - padding)
+        x_high = np.where(straight, polygon_edges.right[edges], np.maximum(x_bottom, x_top) + padding)
+        return np.maximum(x_low, polygon_edges.left[edges]), np.minimum(x_high, polygon_edges.right[edges])
+
+    # Parity of the crossings right of every column of every sub-slab, packed 8 columns a byte, from the flips at
+    # keys sub-slab * (columns + 1) + column, each of which flips the columns left of column from its sub-slab up
+    def _get_parities(self, keys: np.ndarray, slab_count: int, column_count: int) -> np.ndarray:
+        width = column_count + 1
+        parities = np.zeros((slab_count, (column_count + 7) // 8), dtype=np.uint8)
+        carry = np.zeros(column_count, dtype=np.uint8)
+        block = max(1, self._max_memory // (4 * width))
+        for start in range(0, slab_count, block):
+            stop = min(start + block, slab_count)
+            chunk_keys = keys[(keys >= start * width) & (keys < stop * width)] - start * width
+            flips = np.zeros((stop - start, width), dtype=np.uint8)
+            flips[chunk_keys // width, chunk_keys % width] = 1
+            # Columns left of a flip, then sub-slabs from it up
+            flips = np.bitwise_xor.accumulate(flips[:, ::-1], axis=1)[:, ::-1][:, 1:]
+            flips = np.bitwise_xor.accumulate(flips, axis=0) ^ carry
+            carry = flips[-1]
+            parities[start:stop] = np.packbits(flips, axis=1)
+        return parities
@@ -0,0 +1,45 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+from geometry.GridIntersection import BYTES_PER_PAIR, get_candidate_pairs
+from geometry.Segments import intersect_pairs, normalize, sort_pairs
+
+
+# Intersections between two layers of segments, roads and rivers, ignoring those inside a layer. Returns the pairs
+# (red index, blue index) sorted, and their points, which are those the other engines give for the segments of both
+# layers together, red first.
+#
+# Runs the grid broadphase of GridIntersection with both layers in the same grid: in every cell the red entries are
+# paired with the blue ones only, so no pair of one layer is ever generated or tested and the work follows the
+# number of red-blue candidates. The sweep has no such mode: its status stays sorted only if it processes every
+# crossing, red-red and blue-blue ones included.
+def find_intersections(red: np.ndarray, blue: np.ndarray, cell_size: Optional[float] = None,
+                       max_memory: int = 1 << 28) -> Tuple[np.ndarray, np.ndarray]:
+    red = np.asarray(red, dtype=np.float64).reshape(-1, 2, 2)
+    blue = np.asarray(blue, dtype=np.float64).reshape(-1, 2, 2)
+    segments = normalize(np.concatenate((red, blue)))
+    layers = np.repeat(np.array([0, 1], dtype=np.int64), (len(red), len(blue)))
+    pairs, points = [np.empty((0, 2), dtype=np.int64)], [np.empty((0, 2), dtype=np.float64)]
+    for first, second in get_candidate_pairs(segments, cell_size, max_memory // BYTES_PER_PAIR, layers):
+        mask, chunk_points = intersect_pairs(segments, first, second)
+        pairs.append(np.column_stack((first[mask], second[mask] - len(red))))
+        points.append(chunk_points[mask])
+    return sort_pairs(np.concatenate(pairs), np.concatenate(points))
+
+
+# Reference: every red-blue pair tested, in chunks of at most chunk_size pairs
+def find_intersections_brute_force(red: np.ndarray, blue: np.ndarray, chunk_size: int = 1 << 20) \
+        -> Tuple[np.ndarray, np.ndarray]:
+    red = np.asarray(red, dtype=np.float64).reshape(-1, 2, 2)
+    blue = np.asarray(blue, dtype=np.float64).reshape(-1, 2, 2)
+    segments = normalize(np.concatenate((red, blue)))
+    total = len(red) * len(blue)
+    pairs, points = [np.empty((0, 2), dtype=np.int64)], [np.empty((0, 2), dtype=np.float64)]
+    for start in range(0, total, chunk_size):
+        indices = np.arange(start, min(start + chunk_size, total))
+        first, second = indices // len(blue), indices % len(blue) + len(red)
+        mask, chunk_points = intersect_pairs(segments, first, second)
+        pairs.append(np.column_stack((first[mask], second[mask] - len(red))))
+        points.append(chunk_points[mask])
+    return sort_pairs(np.concatenate(pairs), np.concatenate(points))
@@ -0,0 +1,32 @@
+from typing import Tuple
+
+import numpy as np
+
+from geometry import GridIntersection, ParallelIntersection, SweepIntersection
+from geometry.Segments import find_intersections_brute_force
+
+# Largest number of segments all pairs are the fastest on, from benchmarks/segment_engines.py: about 60 segments with
+# k ~ n intersecting pairs and 200 with k ~ 10 n, by less than a millisecond. The grid is the fastest above, at any
+# k, and the sweep never is.
+BRUTE_FORCE_LIMIT = 64
+
+ENGINES = {
+    'brute_force': find_intersections_brute_force,
+    'sweep': SweepIntersection.find_intersections,
+    'grid': GridIntersection.find_intersections,
+    'parallel': ParallelIntersection.find_intersections,
+}
+
+
+# Engine find_intersections() runs for count segments with 'auto'
+def choose_engine(count: int) -> str:
+    return 'brute_force' if count <= BRUTE_FORCE_LIMIT else 'grid'
+
+
+# (k, 2) pairs i < j and (k, 2) points as in Segments, by one of ENGINES or by the one chosen for the input size
+def find_intersections(segments: np.ndarray, engine: str = 'auto') -> Tuple[np.ndarray, np.ndarray]:
+    if engine == 'auto':
+        engine = choose_engine(len(segments))
+    if engine not in ENGINES:
+        raise ValueError(f"unknown engine {engine!r}, expected 'auto' or one of {sorted(ENGINES)}")
+    return ENGINES[engine](segments)
@@ -0,0 +1,107 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Segments are (n, 2, 2) float64 arrays of endpoints. The intersection test is the one of lab4.1b (signs of the four
+# cross products), with collinear segments intersecting only when they overlap. Every engine returns the pairs
+# (i, j), i < j, sorted, and one point per pair: the crossing point, or for overlapping collinear segments the first
+# point of the overlap in sweep order (decreasing y, then increasing x).
+
+
+# Endpoints swapped so that the first one comes first in sweep order
+def normalize(segments: np.ndarray) -> np.ndarray:
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 2, 2)
+    swap = (segments[:, 0, 1] < segments[:, 1, 1]) \
+        | ((segments[:, 0, 1] == segments[:, 1, 1]) & (segments[:, 0, 0] > segments[:, 1, 0]))
+    result = segments.copy()
+    result[swap] = segments[swap, ::-1]
+    return result
+
+
+# Intersection of normalized segments ab and cd, None if they do not intersect. Same operations in the same order
+# as intersect_pairs(), so both give the same answers.
+def intersect(ax: float, ay: float, bx: float, by: float, cx: float, cy: float, dx: float, dy: float) \
+        -> Optional[Tuple[float, float]]:
+    ex, ey = bx - ax, by - ay
+    fx, fy = dx - cx, dy - cy
+    d1 = (cx - ax) * ey - ex * (cy - ay)
+    d2 = (dx - ax) * ey - ex * (dy - ay)
+    d3 = (ax - cx) * fy - fx * (ay - cy)
+    d4 = (bx - cx) * fy - fx * (by - cy)
+    # Bounding boxes apart, which the signs of nearly collinear segments can miss by rounding
+    if d1 * d2 > 0.0 or d3 * d4 > 0.0 or ay < dy or cy < by or max(ax, bx) < min(cx, dx) or max(cx, dx) < min(ax, bx):
+        return None
+    if (d1 == 0.0 and d2 == 0.0) or (d3 == 0.0 and d4 == 0.0):
+        # Collinear: the later start has to come before the earlier end
+        if ay > cy or (ay == cy and ax < cx):
+            px, py = cx, cy
+        else:
+            px, py = ax, ay
+        if by > dy or (by == dy and bx < dx):
+            qx, qy = bx, by
+        else:
+            qx, qy = dx, dy
+        if py < qy or (py == qy and px > qx):
+            return None
+        return px, py
+    t = d1 / (d1 - d2)
+    # Clamped to both bounding boxes, which rounding can leave: crossings of horizontal segments stay on their line
+    px = min(max(cx + fx * t, max(min(ax, bx), min(cx, dx))), min(max(ax, bx), max(cx, dx)))
+    py = min(max(cy + fy * t, max(by, dy)), min(ay, cy))
+    return px, py
+
+
+# intersect() for the pairs (first[k], second[k]) of normalized segments: mask of the intersecting pairs and their
+# points (undefined where the mask is False)
+def intersect_pairs(segments: np.ndarray, first: np.ndarray, second: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    ax, ay, bx, by = (segments[first, i, j] for i, j in ((0, 0), (0, 1), (1, 0), (1, 1)))
+    cx, cy, dx, dy = (segments[second, i, j] for i, j in ((0, 0), (0, 1), (1, 0), (1, 1)))
+    ex, ey = bx - ax, by - ay
+    fx, fy = dx - cx, dy - cy
+    d1 = (cx - ax) * ey - ex * (cy - ay)
+    d2 = (dx - ax) * ey - ex * (dy - ay)
+    d3 = (ax - cx) * fy - fx * (ay - cy)
+    d4 = (bx - cx) * fy - fx * (by - cy)
+    mask = (d1 * d2 <= 0.0) & (d3 * d4 <= 0.0) & (ay >= dy) & (cy >= by) \
+        & (np.maximum(ax, bx) >= np.minimum(cx, dx)) & (np.maximum(cx, dx) >= np.minimum(ax, bx))
+    collinear = mask & (((d1 == 0.0) & (d2 == 0.0)) | ((d3 == 0.0) & (d4 == 0.0)))
+
+    points = np.empty((len(first), 2), dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        t = d1 / (d1 - d2)
+        points[:, 0] = np.minimum(np.maximum(cx + fx * t, np.maximum(np.minimum(ax, bx), np.minimum(cx, dx))),
+                                  np.minimum(np.maximum(ax, bx), np.maximum(cx, dx)))
+        points[:, 1] = np.minimum(np.maximum(cy + fy * t, np.maximum(by, dy)), np.minimum(ay, cy))
+
+    if np.any(collinear):
+        a_first = (ay > cy) | ((ay == cy) & (ax < cx))
+        px, py = np.where(a_first, cx, ax), np.where(a_first, cy, ay)
+        b_first = (by > dy) | ((by == dy) & (bx < dx))
+        qx, qy = np.where(b_first, bx, dx), np.where(b_first, by, dy)
+        empty = (py < qy) | ((py == qy) & (px > qx))
+        mask &= ~(collinear & empty)
+        points[collinear, 0] = px[collinear]
+        points[collinear, 1] = py[collinear]
+    return mask, points
+
+
+# Pairs and points sorted by pair
+def sort_pairs(pairs: np.ndarray, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    order = np.lexsort((pairs[:, 1], pairs[:, 0]))
+    return pairs[order], points[order]
+
+
+# Reference: every pair tested, in chunks of at most chunk_size pairs
+def find_intersections_brute_force(segments: np.ndarray, chunk_size: int = 1 << 20) -> Tuple[np.ndarray, np.ndarray]:
+    segments = normalize(segments)
+    count = len(segments)
+    first, second = np.triu_indices(count, 1) if count > 1 else (np.empty(0, np.int64), np.empty(0, np.int64))
+    pairs, points = [np.empty((0, 2), dtype=np.int64)], [np.empty((0, 2), dtype=np.float64)]
+    for start in range(0, len(first), chunk_size):
+        chunk_first, chunk_second = first[start:start + chunk_size], second[start:start + chunk_size]
+        mask, chunk_points = intersect_pairs(segments, chunk_first, chunk_second)
+        pairs.append(np.column_stack((chunk_first[mask], chunk_second[mask])))
+        points.append(chunk_points[mask])
+    return sort_pairs(np.concatenate(pairs), np.concatenate(points))
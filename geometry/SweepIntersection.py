@@ -0,0 +1,197 @@
+import heapq
+import math
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from geometry.Segments import intersect, normalize, sort_pairs
+
+
+# Segment with its upper endpoint (x, y) first, going (dx, dy) down to the other one. The status orders the segments
+# by their x at the sweep line. An event is located against a segment by the x range [left, right] of the segment,
+# then by the sign of dx (py - y) - dy (px - x), which is the length of the segment times the distance from the event
+# to its line and, unlike x at the sweep line, stays accurate for nearly horizontal segments. Events closer to the line
+# than error, the rounding error of the points, are on it.
+class Segment:
+    __slots__ = ('label', 'x', 'y', 'end_x', 'end_y', 'left', 'right', 'dx', 'dy', 'tolerance', 'below_key', 'ended')
+
+    def __init__(self, label: int, x: float, y: float, end_x: float, end_y: float, error: float):
+        self.label = label
+        self.x = x
+        self.y = y
+        self.end_x = end_x
+        self.end_y = end_y
+        self.left = min(x, end_x) - error
+        self.right = max(x, end_x) + error
+        self.dx = end_x - x
+        self.dy = end_y - y
+        self.tolerance = error * math.hypot(self.dx, self.dy)
+        # Order of the segments through a point just below it, horizontal ones last on the side they go to
+        self.below_key = -self.dx / self.dy if self.dy != 0.0 else math.copysign(math.inf, self.dx)
+        self.ended = False
+
+
+# Point of the event queue with the segments starting, ending and crossing there. below is how much the exact point
+# is below y, for crossings rounded to the same y as other events.
+class Event:
+    __slots__ = ('x', 'y', 'below', 'starts', 'ends', 'crossings')
+
+    def __init__(self, x: float, y: float, below: float):
+        self.x = x
+        self.y = y
+        self.below = below
+        self.starts = list()
+        self.ends = list()
+        self.crossings = list()
+
+
+# Bentley-Ottmann sweep of lab4.1c2 from top to bottom, in O((n + k) log n) for k intersections. The status is a
+# list of Segment in x order searched with bisection over precomputed per-segment floats, with no comparator or
+# key objects. The queue is a heap of (-y, below, x) with one Event per point.
+class SweepIntersection:
+    # Relative rounding error of the points, in units of the largest coordinate
+    ERROR = 1e-15
+
+    def __init__(self, segments: np.ndarray):
+        self._segments = normalize(segments)
+        scale = float(np.max(np.abs(self._segments))) if len(self._segments) > 0 else 0.0
+        self._error = self.ERROR * scale
+        self._status: List[Segment] = list()
+        self._queue: List[Tuple[float, float, float]] = list()
+        self._events: Dict[Tuple[float, float], Event] = dict()
+        self._intersections: Dict[Tuple[int, int], Tuple[float, float]] = dict()
+        self._event_count = 0
+
+    def get_event_count(self) -> int:
+        return self._event_count
+
+    # (k, 2) pairs i < j and (k, 2) points as in Segments
+    def find(self) -> Tuple[np.ndarray, np.ndarray]:
+        for label, (x, y, end_x, end_y) in enumerate(self._segments.reshape(-1, 4).tolist()):
+            segment = Segment(label, x, y, end_x, end_y, self._error)
+            self._get_event(x, y).starts.append(segment)
+            self._get_event(end_x, end_y).ends.append(segment)
+
+        while self._queue:
+            y, below, x = heapq.heappop(self._queue)
+            event = self._events.get((x, -y))
+            # Entries left behind by events moved earlier
+            if event is None or event.below != below:
+                continue
+            del self._events[(x, -y)]
+            self._handle_event(event)
+            self._event_count += 1
+
+        if not self._intersections:
+            return np.empty((0, 2), dtype=np.int64), np.empty((0, 2), dtype=np.float64)
+        return sort_pairs(list(self._intersections.keys()), list(self._intersections.values()))
+
+    def _get_event(self, x: float, y: float, below: float = 0.0) -> Event:
+        event = self._events.get((x, y))
+        if event is None:
+            event = Event(x, y, below)
+            self._events[(x, y)] = event
+            heapq.heappush(self._queue, (-y, below, x))
+        elif below < event.below and not event.starts and not event.ends:
+            # Crossings rounded to the same point come at the first of their exact points, endpoints where they are
+            event.below = below
+            heapq.heappush(self._queue, (-y, below, x))
+        return event
+
+    def _handle_event(self, event: Event):
+        x, y = event.x, event.y
+        status = self._status
+
+        # First segment the event is not right of
+        begin, end = 0, len(status)
+        while begin < end:
+            middle = (begin + end) // 2
+            segment = status[middle]
+            if x > segment.right or (x >= segment.left and segment.dx * (y - segment.y)
+                                     - segment.dy * (x - segment.x) > segment.tolerance):
+                begin = middle + 1
+            else:
+                end = middle
+        # Segments through the event, ending there or not. Segments closer to each other than the tolerance can be
+        # out of order, so the run is extended on both sides.
+        end = begin
+        while end < len(status) and self._is_through(status[end], x, y):
+            end += 1
+        while begin > 0 and self._is_through(status[begin - 1], x, y):
+            begin -= 1
+        through = status[begin:end]
+        # Ending and crossing segments the search missed, when rounding puts the event just off them. They join the
+        # run, or stand for it where the first of them is if the search found none.
+        missed = [segment for segment in event.ends if segment not in through and segment not in event.starts]
+        for segment in event.crossings:
+            if not segment.ended and segment not in through and segment not in missed:
+                missed.append(segment)
+        if missed:
+            indices = sorted(status.index(segment) for segment in missed)
+            if not through:
+                begin = end = indices[0]
+            for index in reversed(indices):
+                through.append(status.pop(index))
+                if index < begin:
+                    begin -= 1
+                    end -= 1
+
+        for segment in event.ends:
+            segment.ended = True
+
+        if len(through) + len(event.starts) > 1:
+            group = through + event.starts
+            for i in range(len(group)):
+                for j in range(i + 1, len(group)):
+                    self._test(group[i], group[j], event)
+
+        below = [segment for segment in through if segment.end_x != x or segment.end_y != y]
+        below.extend(segment for segment in event.starts if segment.end_x != x or segment.end_y != y)
+        below.sort(key=lambda segment: segment.below_key)
+        status[begin:end] = below
+
+        if below:
+            if begin > 0:
+                self._test(status[begin - 1], below[0], event)
+            if begin + len(below) < len(status):
+                self._test(below[-1], status[begin + len(below)], event)
+        elif 0 < begin < len(status):
+            self._test(status[begin - 1], status[begin], event)
+
+    @staticmethod
+    def _is_through(segment: Segment, x: float, y: float) -> bool:
+        if x < segment.left or x > segment.right:
+            return False
+        return abs(segment.dx * (y - segment.y) - segment.dy * (x - segment.x)) <= segment.tolerance
+
+    def _test(self, first: Segment, second: Segment, event: Event):
+        # Smaller label first, for the same point as intersect_pairs()
+        if first.label > second.label:
+            first, second = second, first
+        pair = (first.label, second.label)
+        point = self._intersections.get(pair)
+        new = point is None
+        if new:
+            point = intersect(first.x, first.y, first.end_x, first.end_y,
+                              second.x, second.y, second.end_x, second.end_y)
+            if point is None:
+                return
+            self._intersections[pair] = point
+        # The event is on the flatter segment, where y follows x closely: the crossings a flat segment makes keep its
+        # order when they round to the same y, or even when rounding misorders their y from intersect()
+        px, py = point
+        flat = first if abs(first.dy * second.dx) < abs(second.dy * first.dx) else second
+        below = 0.0
+        if flat.dx != 0.0:
+            drop = (px - flat.x) * flat.dy / flat.dx
+            py = flat.y + drop
+            below = py - flat.y - drop
+        # Crossings below the sweep line swap the segments there. New ones above it by rounding do too, right after
+        # this event, unless one of the segments ends here.
+        if (-py, below, px) > (-event.y, event.below, event.x) \
+                or (new and (px, py) != (event.x, event.y) and not first.ended and not second.ended):
+            self._get_event(px, py, below).crossings.extend((first, second))
+
+
+def find_intersections(segments: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    return SweepIntersection(segments).find()
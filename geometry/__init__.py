@@ -0,0 +1,28 @@
+# Segment intersection and point-in-polygon queries over NumPy arrays, the library versions of lab4. Like the voronoi
+# package, `import geometry` imports no module, and every module is an attribute of the package on first use:
+#   from geometry.SweepIntersection import find_intersections
+#   import geometry
+#   pairs, points = geometry.SweepIntersection.find_intersections(segments)
+import importlib
+
+__all__ = [
+    'GridIntersection',
+    'ParallelIntersection',
+    'PointInPolygon',
+    'PolygonIndex',
+    'RedBlueIntersection',
+    'SegmentIntersection',
+    'Segments',
+    'SweepIntersection',
+]
+
+
+def __getattr__(name: str):
+    if name in __all__:
+        # import_module() also sets the module as an attribute of the package, later lookups do not get here
+        return importlib.import_module(f'{__name__}.{name}')
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
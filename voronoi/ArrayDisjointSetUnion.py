@@ -0,0 +1,116 @@
+import numpy as np
+
+
+# Disjoint set union over int64 arrays with union by size and path halving, for bulk work over millions of
+# edges: union_many() merges an (m, 2) edge array in a few vectorized rounds, find_many() and components() answer
+# for whole arrays of elements. union() and get() keep the interface of DisjointSetUnion.
+class ArrayDisjointSetUnion:
+    def __init__(self, size: int):
+        self._parent = np.arange(size, dtype=np.int64)
+        self._size = np.ones(size, dtype=np.int64)
+        self._components_count = size
+
+    def __len__(self) -> int:
+        return len(self._parent)
+
+    def get_components_count(self) -> int:
+        return self._components_count
+
+    # Number of elements in the set of x
+    def get_size(self, x: int) -> int:
+        return int(self._size[self.get(x)])
+
+    def get(self, x: int) -> int:
+        parent = self._parent
+        x = int(x)
+        while True:
+            p = int(parent[x])
+            if p == x:
+                return x
+            grandparent = int(parent[p])
+            # Path halving: every visited element skips its parent
+            parent[x] = grandparent
+            x = grandparent
+
+    # False if x and y already were in the same set
+    def union(self, x: int, y: int) -> bool:
+        x_root = self.get(x)
+        y_root = self.get(y)
+        if x_root == y_root:
+            return False
+        if self._size[x_root] < self._size[y_root]:
+            x_root, y_root = y_root, x_root
+        self._parent[y_root] = x_root
+        self._size[x_root] += self._size[y_root]
+        self._components_count -= 1
+        return True
+
+    def find_many(self, xs: np.ndarray) -> np.ndarray:
+        current = np.asarray(xs, dtype=np.int64).ravel()
+        result = np.empty_like(current)
+        positions = np.arange(len(current))
+        while len(current) > 0:
+            parents = self._parent[current]
+            grandparents = self._parent[parents]
+            done = parents == grandparents
+            result[positions[done]] = parents[done]
+            running = ~done
+            current, grandparents, positions = current[running], grandparents[running], positions[running]
+            # Path halving for all the queries at once; elements visited by several queries get the same value
+            self._parent[current] = grandparents
+            current = grandparents
+        return result.reshape(np.shape(xs))
+
+    # Merges the sets of both ends of every edge of an (m, 2) array, returns the number of merges.
+    #
+    # Each round hooks every root under its neighbouring root of highest priority, if that one is higher than its
+    # own: bigger sets first, then smaller indices. Priorities are a total order, so the hooks cannot form cycles,
+    # and smaller sets go under bigger ones like in union(). Pointer jumping among the hooked roots then points each
+    # of them to its new root, so the ends of the remaining edges stay roots; the other elements keep their paths
+    # until find_many() or components() shortens them. Edges already inside one set are dropped between rounds.
+    def union_many(self, edges: np.ndarray) -> int:
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        count = len(self._parent)
+        before = self._components_count
+        first, second = self.find_many(edges[:, 0]), self.find_many(edges[:, 1])
+        best = np.full(count, -1, dtype=np.int64)
+        while True:
+            crossing = first != second
+            first, second = first[crossing], second[crossing]
+            if len(first) == 0:
+                break
+            first_priority = self._size[first] * count + (count - 1 - first)
+            second_priority = self._size[second] * count + (count - 1 - second)
+            lower = first_priority < second_priority
+            children = np.where(lower, first, second)
+            np.maximum.at(best, children, np.where(lower, second_priority, first_priority))
+            hooked = np.flatnonzero(best >= 0)
+            self._parent[hooked] = count - 1 - best[hooked] % count
+            best[hooked] = -1
+
+            while True:
+                parents = self._parent[hooked]
+                grandparents = self._parent[parents]
+                if np.array_equal(parents, grandparents):
+                    break
+                self._parent[hooked] = grandparents
+            np.add.at(self._size, parents, self._size[hooked])
+            self._components_count -= len(hooked)
+            first, second = self._parent[first], self._parent[second]
+        return before - self._components_count
+
+    # Set label of every element, 0 to get_components_count() - 1 in the order of the roots of the sets
+    def components(self) -> np.ndarray:
+        self._flatten()
+        roots = self._parent == np.arange(len(self._parent))
+        return (np.cumsum(roots) - 1)[self._parent]
+
+    def _flatten(self):
+        # Pointer jumping: the depth of every element halves at each step
+        parent = self._parent
+        while True:
+            grandparents = parent[parent]
+            if not np.any(grandparents != parent):
+                break
+            parent = grandparents
+        self._parent = parent
@@ -0,0 +1,60 @@
+from typing import Optional
+
+import numpy as np
+
+from voronoi.ArrayVoronoiDiagram import ArrayVoronoiDiagram
+from voronoi.Box import Box
+from voronoi.FortuneAlgorithm import FortuneAlgorithm, LinkedVertex
+from voronoi.VoronoiDiagram import Arc
+
+
+# Fortune's algorithm writing straight into an ArrayVoronoiDiagram: arcs keep half-edge indices
+# instead of HalfEdge objects, and every link is a write into the diagram index arrays.
+class ArrayFortuneAlgorithm(FortuneAlgorithm):
+    _diagram: ArrayVoronoiDiagram
+
+    def get_diagram(self) -> 'ArrayVoronoiDiagram':
+        return self._diagram
+
+    def _create_diagram(self, points: list) -> 'ArrayVoronoiDiagram':
+        return ArrayVoronoiDiagram(points)
+
+    def _add_edge(self, left: Arc, right: Arc):
+        left.right_half_edge = self._diagram._create_half_edge(left.site.face)
+        right.left_half_edge = self._diagram._create_half_edge(right.site.face)
+        self._diagram._set_twins(left.right_half_edge, right.left_half_edge)
+
+    def _set_origin(self, left: Arc, right: Arc, vertex: int):
+        self._diagram._set_destination(left.right_half_edge, vertex)
+        self._diagram._set_origin(right.left_half_edge, vertex)
+
+    def _set_destination(self, left: Arc, right: Arc, vertex: int):
+        self._diagram._set_origin(left.right_half_edge, vertex)
+        self._diagram._set_destination(right.left_half_edge, vertex)
+
+    def _set_prev_half_edge(self, prev: int, next_: int):
+        self._diagram._set_next(prev, next_)
+
+    def _expand_box(self, box: Box):
+        vertices = self._diagram.get_vertices()[self._diagram.get_vertex_alive()]
+        if len(vertices) == 0:
+            return
+        left, bottom = np.min(vertices, axis=0)
+        right, top = np.max(vertices, axis=0)
+        box.left = min(float(left), box.left)
+        box.bottom = min(float(bottom), box.bottom)
+        box.right = max(float(right), box.right)
+        box.top = max(float(top), box.top)
+
+    def _link_vertices(self, face: int, start: LinkedVertex, end: LinkedVertex):
+        half_edge = self._diagram._create_half_edge(face)
+        self._diagram._set_origin(half_edge, start.vertex)
+        self._diagram._set_destination(half_edge, end.vertex)
+        start.next_half_edge = half_edge
+        self._diagram._set_next(self._nil_if_none(start.prev_half_edge), half_edge)
+        end.prev_half_edge = half_edge
+        self._diagram._set_next(half_edge, self._nil_if_none(end.next_half_edge))
+
+    @staticmethod
+    def _nil_if_none(half_edge: Optional[int]) -> int:
+        return ArrayVoronoiDiagram.NIL if half_edge is None else half_edge
@@ -0,0 +1,527 @@
+import struct
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+from voronoi.Box import Box
+from voronoi.CellArrays import CellArrays, build_cell_arrays
+from voronoi.Vector2 import Vector2
+from voronoi.VoronoiDiagram import HalfEdge, Site, Vertex, VoronoiDiagram
+
+
+class HalfEdgeArrays(NamedTuple):
+    origin: np.ndarray
+    destination: np.ndarray
+    twin: np.ndarray
+    prev: np.ndarray
+    next: np.ndarray
+    incident_face: np.ndarray
+    alive: np.ndarray
+
+
+def _grow(array: np.ndarray, capacity: int, fill) -> np.ndarray:
+    result = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+    result[:len(array)] = array
+    return result
+
+
+# Struct-of-arrays DCEL: vertices are rows of a float64 (n, 2) array, half-edges are rows of int32
+# index arrays and faces are identified by the index of their site. Removed vertices and half-edges
+# are only marked dead (tombstones) until compact() is called.
+#
+# save() writes a flat little-endian file, every array starting at a multiple of ALIGNMENT bytes:
+#   header (64 bytes): magic b'VORONOI\0', uint32 version, uint32 reserved, uint64 sites, vertices and
+#                      half-edges counts, zero padding
+#   float64 site points (sites, 2)
+#   int32 outer_component (sites), half-edge index of every face or NIL
+#   float64 vertices (vertices, 2)
+#   int32 origin, destination, twin, prev, next (half-edges each), vertex and half-edge indices or NIL
+#   int32 incident_face (half-edges), site index
+# load() maps the arrays with np.memmap in copy-on-write mode, so opening does not read the file and the pages
+# are shared between processes until one of them modifies the diagram.
+class ArrayVoronoiDiagram:
+    NIL = -1
+    MAGIC = b'VORONOI\0'
+    VERSION = 1
+    ALIGNMENT = 64
+    _HEADER = struct.Struct('<8sII3Q')
+
+    def __init__(self, points: List[Vector2]):
+        sites_count = len(points)
+        # Sites keep Vector2 points for the sweep; face of a site is its index. A loaded diagram creates them
+        # on first use, see get_sites()
+        self._sites: Optional[List[Site]] = [Site(i, points[i], i) for i in range(sites_count)]
+        self._site_points = np.array([(p.x, p.y) for p in points], dtype=np.float64).reshape(-1, 2)
+        self._outer_component = np.full(sites_count, self.NIL, dtype=np.int32)
+
+        # Fortune creates about 2n vertices and 6n half-edges, bound() adds a few more
+        vertices_capacity = 2 * sites_count + 16
+        self._vertices = np.empty((vertices_capacity, 2), dtype=np.float64)
+        self._vertex_alive = np.zeros(vertices_capacity, dtype=bool)
+        self._vertices_count = 0
+
+        half_edges_capacity = 6 * sites_count + 16
+        self._origin = np.full(half_edges_capacity, self.NIL, dtype=np.int32)
+        self._destination = np.full(half_edges_capacity, self.NIL, dtype=np.int32)
+        self._twin = np.full(half_edges_capacity, self.NIL, dtype=np.int32)
+        self._prev = np.full(half_edges_capacity, self.NIL, dtype=np.int32)
+        self._next = np.full(half_edges_capacity, self.NIL, dtype=np.int32)
+        self._incident_face = np.full(half_edges_capacity, self.NIL, dtype=np.int32)
+        self._half_edge_alive = np.zeros(half_edges_capacity, dtype=bool)
+        self._half_edges_count = 0
+        # Cache of get_cell_arrays(), dropped by every change of the diagram
+        self._cell_arrays: Optional[CellArrays] = None
+
+    @classmethod
+    def from_diagram(cls, diagram: VoronoiDiagram) -> 'ArrayVoronoiDiagram':
+        result = cls([site.point for site in diagram.get_sites()])
+        vertices = list(diagram.get_vertices())
+        half_edges = list(diagram.get_half_edges())
+        result._reserve_vertices(len(vertices))
+        result._reserve_half_edges(len(half_edges))
+
+        vertex_index = {id(vertex): i for i, vertex in enumerate(vertices)}
+        half_edge_index = {id(half_edge): i for i, half_edge in enumerate(half_edges)}
+        face_index = {id(site.face): site.index for site in diagram.get_sites()}
+
+        def index_of(mapping, item) -> int:
+            return cls.NIL if item is None else mapping.get(id(item), cls.NIL)
+
+        for i, vertex in enumerate(vertices):
+            result._vertices[i] = (vertex.point.x, vertex.point.y)
+        result._vertex_alive[:len(vertices)] = True
+        result._vertices_count = len(vertices)
+
+        for i, half_edge in enumerate(half_edges):
+            result._origin[i] = index_of(vertex_index, half_edge.origin)
+            result._destination[i] = index_of(vertex_index, half_edge.destination)
+            result._twin[i] = index_of(half_edge_index, half_edge.twin)
+            result._prev[i] = index_of(half_edge_index, half_edge.prev)
+            result._next[i] = index_of(half_edge_index, half_edge.next)
+            result._incident_face[i] = index_of(face_index, half_edge.incident_face)
+        result._half_edge_alive[:len(half_edges)] = True
+        result._half_edges_count = len(half_edges)
+
+        for site in diagram.get_sites():
+            result._outer_component[site.index] = index_of(half_edge_index, site.face.outer_component)
+        return result
+
+    # Inverse of from_diagram(): the same diagram as linked objects, without the tombstones
+    def to_diagram(self) -> VoronoiDiagram:
+        result = VoronoiDiagram([Vector2(x, y) for x, y in self._site_points.tolist()])
+        # The extra last element of each list is None, so NIL references give None
+        vertices: List[Optional[Vertex]] = [None] * (self._vertices_count + 1)
+        alive = np.flatnonzero(self.get_vertex_alive())
+        for i, (x, y) in zip(alive.tolist(), self._vertices[alive].tolist()):
+            vertices[i] = result._create_vertex(Vector2(x, y))
+
+        half_edges_count = self._half_edges_count
+        alive = np.flatnonzero(self._half_edge_alive[:half_edges_count]).tolist()
+        half_edges: List[Optional[HalfEdge]] = [None] * (half_edges_count + 1)
+        faces = [result.get_face(i) for i in range(self.get_sites_count())]
+        for i, face in zip(alive, self._incident_face[alive].tolist()):
+            half_edges[i] = result._create_half_edge(faces[face])
+        for i, origin, destination, twin, prev, next_ in zip(
+                alive, self._origin[alive].tolist(), self._destination[alive].tolist(), self._twin[alive].tolist(),
+                self._prev[alive].tolist(), self._next[alive].tolist()):
+            half_edge = half_edges[i]
+            half_edge.origin = vertices[origin]
+            half_edge.destination = vertices[destination]
+            half_edge.twin = half_edges[twin]
+            half_edge.prev = half_edges[prev]
+            half_edge.next = half_edges[next_]
+
+        for face, outer_component in zip(faces, self._outer_component.tolist()):
+            face.outer_component = half_edges[outer_component]
+        return result
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> Optional['ArrayVoronoiDiagram']:
+        with open(path, 'rb') as file:
+            header = file.read(cls.ALIGNMENT)
+        if len(header) < cls.ALIGNMENT:
+            return None
+        magic, version, _, sites_count, vertices_count, half_edges_count = cls._HEADER.unpack_from(header)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            return None
+
+        arrays = list()
+        for dtype, shape, offset in cls._get_layout(sites_count, vertices_count, half_edges_count):
+            if shape[0] == 0:
+                arrays.append(np.empty(shape, dtype=dtype))
+            elif mmap:
+                arrays.append(np.memmap(path, dtype=dtype, mode='c', offset=offset, shape=shape))
+            else:
+                count = int(np.prod(shape))
+                arrays.append(np.fromfile(path, dtype=dtype, count=count, offset=offset).reshape(shape))
+
+        result = cls.__new__(cls)
+        result._sites = None
+        result._site_points, result._outer_component, result._vertices = arrays[:3]
+        result._origin, result._destination, result._twin, result._prev, result._next, \
+            result._incident_face = arrays[3:]
+        result._vertex_alive = np.ones(vertices_count, dtype=bool)
+        result._vertices_count = vertices_count
+        result._half_edge_alive = np.ones(half_edges_count, dtype=bool)
+        result._half_edges_count = half_edges_count
+        result._cell_arrays = None
+        return result
+
+    # Compacts the diagram first, tombstones are not stored
+    def save(self, path: str):
+        if not self.is_compact():
+            self.compact()
+        sites_count = self.get_sites_count()
+        vertices_count = self._vertices_count
+        half_edges_count = self._half_edges_count
+        arrays = (self._site_points, self._outer_component, self._vertices[:vertices_count],
+                  self._origin[:half_edges_count], self._destination[:half_edges_count],
+                  self._twin[:half_edges_count], self._prev[:half_edges_count], self._next[:half_edges_count],
+                  self._incident_face[:half_edges_count])
+        layout = self._get_layout(sites_count, vertices_count, half_edges_count)
+        with open(path, 'wb') as file:
+            header = self._HEADER.pack(self.MAGIC, self.VERSION, 0, sites_count, vertices_count, half_edges_count)
+            file.write(header.ljust(self.ALIGNMENT, b'\0'))
+            for array, (dtype, shape, offset) in zip(arrays, layout):
+                file.write(b'\0' * (offset - file.tell()))
+                file.write(np.ascontiguousarray(array, dtype=dtype).tobytes())
+
+    @classmethod
+    def _get_layout(cls, sites_count: int, vertices_count: int, half_edges_count: int) -> list:
+        # (dtype, shape, offset) of every array of the file, in file order
+        layout = list()
+        offset = cls.ALIGNMENT
+        for dtype, shape in ((np.dtype('<f8'), (sites_count, 2)), (np.dtype('<i4'), (sites_count,)),
+                             (np.dtype('<f8'), (vertices_count, 2))) + ((np.dtype('<i4'), (half_edges_count,)),) * 6:
+            layout.append((dtype, shape, offset))
+            size = dtype.itemsize * int(np.prod(shape))
+            offset += (size + cls.ALIGNMENT - 1) // cls.ALIGNMENT * cls.ALIGNMENT
+        return layout
+
+    def get_site(self, i: int) -> Site:
+        return self.get_sites()[i]
+
+    def get_sites(self) -> 'List[Site]':
+        if self._sites is None:
+            self._sites = [Site(i, Vector2(x, y), i) for i, (x, y) in enumerate(self._site_points.tolist())]
+        return self._sites
+
+    def get_sites_count(self) -> int:
+        return len(self._site_points)
+
+    def get_site_points(self) -> np.ndarray:
+        return self._site_points
+
+    def get_face(self, i: int) -> int:
+        return i
+
+    def get_outer_components(self) -> np.ndarray:
+        return self._outer_component
+
+    def get_vertices(self) -> np.ndarray:
+        # Rows may contain tombstones until compact() is called, see get_vertex_alive()
+        return self._vertices[:self._vertices_count]
+
+    def get_vertex_alive(self) -> np.ndarray:
+        return self._vertex_alive[:self._vertices_count]
+
+    def get_vertices_count(self) -> int:
+        return int(np.count_nonzero(self.get_vertex_alive()))
+
+    def get_half_edges(self) -> HalfEdgeArrays:
+        count = self._half_edges_count
+        return HalfEdgeArrays(
+            self._origin[:count],
+            self._destination[:count],
+            self._twin[:count],
+            self._prev[:count],
+            self._next[:count],
+            self._incident_face[:count],
+            self._half_edge_alive[:count]
+        )
+
+    def get_cell_arrays(self) -> CellArrays:
+        if self._cell_arrays is None:
+            half_edges = self.get_half_edges()
+            alive = np.flatnonzero(half_edges.alive)
+            # Positions of the alive half-edges, the extra last element keeps NIL references NIL
+            positions = np.full(self._half_edges_count + 1, self.NIL, dtype=np.int64)
+            positions[alive] = np.arange(len(alive))
+            twins = half_edges.twin[alive]
+            twin_faces = np.where(twins != self.NIL, half_edges.incident_face[twins], self.NIL)
+            origins = half_edges.origin[alive]
+            points = np.where((origins != self.NIL)[:, None], self._vertices[origins], np.nan)
+            self._cell_arrays = build_cell_arrays(self._site_points, half_edges.incident_face[alive], twin_faces,
+                                                  points, positions[half_edges.next[alive]],
+                                                  positions[self._outer_component])
+        return self._cell_arrays
+
+    def get_half_edges_count(self) -> int:
+        return int(np.count_nonzero(self._half_edge_alive[:self._half_edges_count]))
+
+    def get_point(self, vertex: int) -> Vector2:
+        return Vector2(float(self._vertices[vertex, 0]), float(self._vertices[vertex, 1]))
+
+    def is_compact(self) -> bool:
+        return self.get_vertices_count() == self._vertices_count \
+            and self.get_half_edges_count() == self._half_edges_count
+
+    def compact(self):
+        self._cell_arrays = None
+        vertices_count = self._vertices_count
+        vertex_alive = self._vertex_alive[:vertices_count].copy()
+        vertex_map = np.full(vertices_count + 1, self.NIL, dtype=np.int32)
+        vertex_map[:vertices_count][vertex_alive] = np.arange(np.count_nonzero(vertex_alive), dtype=np.int32)
+
+        half_edges_count = self._half_edges_count
+        half_edge_alive = self._half_edge_alive[:half_edges_count].copy()
+        half_edge_map = np.full(half_edges_count + 1, self.NIL, dtype=np.int32)
+        half_edge_map[:half_edges_count][half_edge_alive] = np.arange(np.count_nonzero(half_edge_alive),
+                                                                      dtype=np.int32)
+
+        # The extra last element of each map is NIL, so NIL references stay NIL
+        new_vertices_count = int(np.count_nonzero(vertex_alive))
+        self._vertices[:new_vertices_count] = self._vertices[:vertices_count][vertex_alive]
+        self._vertex_alive[:new_vertices_count] = True
+        self._vertex_alive[new_vertices_count:] = False
+        self._vertices_count = new_vertices_count
+
+        new_half_edges_count = int(np.count_nonzero(half_edge_alive))
+        for array, mapping in ((self._origin, vertex_map), (self._destination, vertex_map),
+                               (self._twin, half_edge_map), (self._prev, half_edge_map),
+                               (self._next, half_edge_map), (self._incident_face, None)):
+            live = array[:half_edges_count][half_edge_alive]
+            if mapping is not None:
+                live = mapping[live]
+            array[:new_half_edges_count] = live
+            array[new_half_edges_count:] = self.NIL
+        self._half_edge_alive[:new_half_edges_count] = True
+        self._half_edge_alive[new_half_edges_count:] = False
+        self._half_edges_count = new_half_edges_count
+
+        self._outer_component[:] = half_edge_map[self._outer_component]
+
+    def intersect(self, box: Box) -> bool:
+        self._cell_arrays = None
+        error = False
+        processed_half_edges = set()
+        vertices_to_remove = set()
+
+        # Same bulk pass as VoronoiDiagram.intersect(): flags and intersections of all half-edges at once, then
+        # only the faces leaving the box are relinked
+        half_edges_count = self._half_edges_count
+        alive = np.flatnonzero(self._half_edge_alive[:half_edges_count])
+        origins = self._vertices[self._origin[alive]]
+        destinations = self._vertices[self._destination[alive]]
+        faces = self._incident_face[alive]
+        origins_inside = box.contains_points(origins)
+        destinations_inside = box.contains_points(destinations)
+        crossing_faces = np.zeros(self.get_sites_count(), dtype=bool)
+        crossing_faces[faces[~(origins_inside & destinations_inside)]] = True
+        selected = np.flatnonzero(crossing_faces[faces])
+        counts, sides, points = box.get_segments_intersections(origins[selected], destinations[selected])
+        positions = np.full(half_edges_count, self.NIL, dtype=np.int64)
+        positions[alive[selected]] = np.arange(len(selected))
+        positions = positions.tolist()
+        origins_inside = origins_inside[selected].tolist()
+        destinations_inside = destinations_inside[selected].tolist()
+        crossing = np.flatnonzero(counts).tolist()
+        sides = dict(zip(crossing, sides[crossing].tolist()))
+        points = dict(zip(crossing, points[crossing].tolist()))
+        counts = counts.tolist()
+        crossing_faces = crossing_faces.tolist()
+
+        for site in self.get_sites():
+            half_edge = int(self._outer_component[site.index])
+            if half_edge == self.NIL or not crossing_faces[site.index]:
+                continue
+            inside = origins_inside[positions[half_edge]]
+            outer_component_dirty = not inside
+            incoming_half_edge = self.NIL  # First half edge coming in the box
+            outgoing_half_edge = self.NIL  # Last half edge going out the box
+            incoming_side = outgoing_side = Box.Side.LEFT
+
+            while True:
+                position = positions[half_edge]
+                intersections_count = counts[position]
+                intersection_sides = sides.get(position)
+                intersection_points = points.get(position)
+                next_inside = destinations_inside[position]
+                next_half_edge = int(self._next[half_edge])
+                twin_half_edge = int(self._twin[half_edge])
+                if not inside and not next_inside:
+                    # Outside, or only through a corner of the box
+                    if intersections_count <= 1:
+                        vertices_to_remove.add(int(self._origin[half_edge]))
+                        self._remove_half_edge(half_edge)
+                    elif intersections_count == 2:
+                        vertices_to_remove.add(int(self._origin[half_edge]))
+                        if twin_half_edge in processed_half_edges:
+                            self._origin[half_edge] = self._destination[twin_half_edge]
+                            self._destination[half_edge] = self._origin[twin_half_edge]
+                        else:
+                            self._origin[half_edge] = self._create_vertex(Vector2(*intersection_points[0]))
+                            self._destination[half_edge] = self._create_vertex(Vector2(*intersection_points[1]))
+                        if outgoing_half_edge != self.NIL:
+                            self._link(box, outgoing_half_edge, outgoing_side,
+                                       half_edge, Box.Side(intersection_sides[0]))
+                        if incoming_half_edge == self.NIL:
+                            incoming_half_edge = half_edge
+                            incoming_side = Box.Side(intersection_sides[0])
+                        outgoing_half_edge = half_edge
+                        outgoing_side = Box.Side(intersection_sides[1])
+                        processed_half_edges.add(half_edge)
+                    else:
+                        error = True
+                elif inside and not next_inside:
+                    if intersections_count == 0:
+                        intersection_sides, intersection_points = box.get_endpoint_crossing(
+                            Vector2(*self._vertices[self._origin[half_edge]].tolist()),
+                            Vector2(*self._vertices[self._destination[half_edge]].tolist()))
+                        intersections_count = 1
+                    if intersections_count == 1:
+                        if twin_half_edge in processed_half_edges:
+                            self._destination[half_edge] = self._origin[twin_half_edge]
+                        else:
+                            self._destination[half_edge] = self._create_vertex(Vector2(*intersection_points[0]))
+                        outgoing_half_edge = half_edge
+                        outgoing_side = Box.Side(intersection_sides[0])
+                        processed_half_edges.add(half_edge)
+                    else:
+                        error = True
+                elif not inside and next_inside:
+                    if intersections_count == 0:
+                        intersection_sides, intersection_points = box.get_endpoint_crossing(
+                            Vector2(*self._vertices[self._destination[half_edge]].tolist()),
+                            Vector2(*self._vertices[self._origin[half_edge]].tolist()))
+                        intersections_count = 1
+                    if intersections_count == 1:
+                        vertices_to_remove.add(int(self._origin[half_edge]))
+                        if twin_half_edge in processed_half_edges:
+                            self._origin[half_edge] = self._destination[twin_half_edge]
+                        else:
+                            self._origin[half_edge] = self._create_vertex(Vector2(*intersection_points[0]))
+                        if outgoing_half_edge != self.NIL:
+                            self._link(box, outgoing_half_edge, outgoing_side,
+                                       half_edge, Box.Side(intersection_sides[0]))
+                        if incoming_half_edge == self.NIL:
+                            incoming_half_edge = half_edge
+                            incoming_side = Box.Side(intersection_sides[0])
+                        processed_half_edges.add(half_edge)
+                    else:
+                        error = True
+
+                half_edge = next_half_edge
+                inside = next_inside
+                if half_edge == self._outer_component[site.index]:
+                    break
+
+            if outer_component_dirty and incoming_half_edge != self.NIL:
+                self._link(box, outgoing_half_edge, outgoing_side,
+                           incoming_half_edge, incoming_side)
+
+            if outer_component_dirty:
+                self._outer_component[site.index] = incoming_half_edge
+
+        for vertex in vertices_to_remove:
+            self._remove_vertex(vertex)
+
+        return not error
+
+    def _reserve_vertices(self, count: int):
+        required = self._vertices_count + count
+        if required <= len(self._vertices):
+            return
+        capacity = max(required, 2 * len(self._vertices))
+        self._vertices = _grow(self._vertices, capacity, 0.0)
+        self._vertex_alive = _grow(self._vertex_alive, capacity, False)
+
+    def _reserve_half_edges(self, count: int):
+        required = self._half_edges_count + count
+        if required <= len(self._origin):
+            return
+        capacity = max(required, 2 * len(self._origin))
+        self._origin = _grow(self._origin, capacity, self.NIL)
+        self._destination = _grow(self._destination, capacity, self.NIL)
+        self._twin = _grow(self._twin, capacity, self.NIL)
+        self._prev = _grow(self._prev, capacity, self.NIL)
+        self._next = _grow(self._next, capacity, self.NIL)
+        self._incident_face = _grow(self._incident_face, capacity, self.NIL)
+        self._half_edge_alive = _grow(self._half_edge_alive, capacity, False)
+
+    def _create_vertex(self, point: Vector2) -> int:
+        self._cell_arrays = None
+        if self._vertices_count == len(self._vertices):
+            self._reserve_vertices(1)
+        vertex = self._vertices_count
+        self._vertices[vertex, 0] = point.x
+        self._vertices[vertex, 1] = point.y
+        self._vertex_alive[vertex] = True
+        self._vertices_count += 1
+        return vertex
+
+    def _create_corner(self, box: Box, side: Box.Side) -> Optional[int]:
+        match side:
+            case Box.Side.LEFT:
+                return self._create_vertex(Vector2(box.left, box.top))
+            case Box.Side.BOTTOM:
+                return self._create_vertex(Vector2(box.left, box.bottom))
+            case Box.Side.RIGHT:
+                return self._create_vertex(Vector2(box.right, box.bottom))
+            case Box.Side.TOP:
+                return self._create_vertex(Vector2(box.right, box.top))
+            case _:
+                return None
+
+    def _create_half_edge(self, face: int) -> int:
+        self._cell_arrays = None
+        if self._half_edges_count == len(self._origin):
+            self._reserve_half_edges(1)
+        half_edge = self._half_edges_count
+        self._incident_face[half_edge] = face
+        self._half_edge_alive[half_edge] = True
+        self._half_edges_count += 1
+        if self._outer_component[face] == self.NIL:
+            self._outer_component[face] = half_edge
+        return half_edge
+
+    def _set_twins(self, half_edge: int, twin: int):
+        self._twin[half_edge] = twin
+        self._twin[twin] = half_edge
+
+    def _set_origin(self, half_edge: int, vertex: int):
+        self._origin[half_edge] = vertex
+
+    def _set_destination(self, half_edge: int, vertex: int):
+        self._destination[half_edge] = vertex
+
+    def _set_next(self, prev: int, next_: int):
+        if prev != self.NIL:
+            self._next[prev] = next_
+        if next_ != self.NIL:
+            self._prev[next_] = prev
+
+    def _link(self, box: Box, start: int, start_side: Box.Side, end: int, end_side: Box.Side):
+        half_edge = start
+        face = int(self._incident_face[start])
+        side = int(start_side)
+        while side != int(end_side):
+            side = (side + 1) % 4
+            next_half_edge = self._create_half_edge(face)
+            self._set_next(half_edge, next_half_edge)
+            self._origin[next_half_edge] = self._destination[half_edge]
+            self._destination[next_half_edge] = self._create_corner(box, Box.Side(side))
+            half_edge = next_half_edge
+        next_half_edge = self._create_half_edge(face)
+        self._set_next(half_edge, next_half_edge)
+        self._set_next(next_half_edge, end)
+        self._origin[next_half_edge] = self._destination[half_edge]
+        self._destination[next_half_edge] = self._origin[end]
+
+    def _remove_vertex(self, vertex: int):
+        self._cell_arrays = None
+        self._vertex_alive[vertex] = False
+
+    def _remove_half_edge(self, half_edge: int):
+        self._cell_arrays = None
+        self._half_edge_alive[half_edge] = False
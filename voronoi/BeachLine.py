@@ -1,7 +1,7 @@
 import math
 
-from VoronoiDiagram import Arc, Site
-from Vector2 import Vector2
+from voronoi.VoronoiDiagram import Arc, Site
+from voronoi.Vector2 import Vector2
 
 
 class Beachline:
@@ -11,89 +11,93 @@ class Beachline:
     def __init__(self):
         self._nil = Arc()
         self._root = self._nil
-        self._nil.color = Arc.Color.BLACK
+        self._nil.red = False
 
     def create_arc(self, site: Site) -> Arc:
-        res = Arc()
-        res.parent = self._nil
-        res.left = self._nil
-        res.right = self._nil
-        res.site = site
-        res.left_half_edge = None
-        res.right_half_edge = None
-        res.event = None
-        res.prev = self._nil
-        res.next = self._nil
-        res.color = Arc.Color.RED
-        return res
+        return Arc(site, self._nil)
 
     def is_nil(self, x: Arc) -> bool:
-        return x == self._nil
+        return x is self._nil
 
     def is_empty(self) -> bool:
-        return self.is_nil(self._root)
+        return self._root is self._nil
 
     def set_root(self, x):
         self._root = x
-        self._root.color = Arc.Color.BLACK
+        self._root.red = False
+
+    # Number of arcs on the longest root-to-leaf path, O(size)
+    def get_height(self) -> int:
+        height = 0
+        level = [self._root] if self._root is not self._nil else []
+        while level:
+            height += 1
+            level = [child for x in level for child in (x.left, x.right) if child is not self._nil]
+        return height
 
     def get_leftmost_arc(self) -> Arc:
         x = self._root
-        while not self.is_nil(x.prev):
+        while x.prev is not self._nil:
             x = x.prev
         return x
 
     def _compute_breakpoint(self, point1: Vector2, point2: Vector2, l: float) -> float:
         x1, y1, x2, y2 = point1.x, point1.y, point2.x, point2.y
+        # Sites of equal y: the parabolas are translates of each other and meet halfway
+        if y1 == y2:
+            return (x1 + x2) * 0.5
+        # A site on the sweep line has a vertical ray for parabola
+        if y1 == l:
+            return x1
+        if y2 == l:
+            return x2
         d1 = 1.0 / (2.0 * (y1 - l))
         d2 = 1.0 / (2.0 * (y2 - l))
         a = d1 - d2
         b = 2.0 * (x2 * d2 - x1 * d1)
         c = (y1 * y1 + x1 * x1 - l * l) * d1 - (y2 * y2 + x2 * x2 - l * l) * d2
-        delta = b * b - 4.0 * a * c
-        return (-b + math.sqrt(delta)) / (2.0 * a)
+        # Rounding pushes delta of nearly tangent parabolas below 0
+        root = math.sqrt(max(b * b - 4.0 * a * c, 0.0))
+        # Same root without the cancellation in -b + root, which is large for sites of nearly equal y
+        if b > 0.0:
+            return -2.0 * c / (b + root)
+        return (-b + root) / (2.0 * a)
 
     def locate_arc_above(self, point: Vector2, l: float) -> Arc:
+        nil = self._nil
+        x = point.x
         node = self._root
-        found = False
-        while not found:
-            breakpoint_left = -math.inf
-            breakpoint_right = math.inf
-            if not self.is_nil(node.prev):
-                breakpoint_left = self._compute_breakpoint(node.prev.site.point, node.site.point, l)
-            if not self.is_nil(node.next):
-                breakpoint_right = self._compute_breakpoint(node.site.point, node.next.site.point, l)
-            if point.x < breakpoint_left:
+        while True:
+            if node.prev is not nil and x < self._compute_breakpoint(node.prev.site.point, node.site.point, l):
                 node = node.left
-            elif point.x > breakpoint_right:
+            elif node.next is not nil and x > self._compute_breakpoint(node.site.point, node.next.site.point, l):
                 node = node.right
             else:
-                found = True
-        return node
+                return node
 
     def insert_before(self, x: Arc, y: Arc):
-        if self.is_nil(x.left):
+        if x.left is self._nil:
             x.left = y
             y.parent = x
         else:
             x.prev.right = y
             y.parent = x.prev
         y.prev = x.prev
-        if not self.is_nil(y.prev):
+        if y.prev is not self._nil:
             y.prev.next = y
         x.prev = y
         y.next = x
         self._insert_fixup(y)
 
     def insert_after(self, x: Arc, y: Arc):
-        if self.is_nil(x.right):
+        if x.right is self._nil:
             x.right = y
             y.parent = x
         else:
             x.next.left = y
             y.parent = x.next
         y.next = x.next
-        if not self.is_nil(y.next):
+        if y.next is not self._nil:
             y.next.prev = y
         y.prev = x
         x.next = y
@@ -103,30 +107,30 @@ class Beachline:
         self._transplant(x, y)
         y.left = x.left
         y.right = x.right
-        if not self.is_nil(y.left):
+        if y.left is not self._nil:
             y.left.parent = y
-        if not self.is_nil(y.right):
+        if y.right is not self._nil:
             y.right.parent = y
         y.prev = x.prev
         y.next = x.next
-        if not self.is_nil(y.prev):
+        if y.prev is not self._nil:
             y.prev.next = y
-        if not self.is_nil(y.next):
+        if y.next is not self._nil:
             y.next.prev = y
-        y.color = x.color
+        y.red = x.red
 
     def remove(self, z: Arc):
         y = z
-        y_original_color = y.color
-        if self.is_nil(z.left):
+        y_original_red = y.red
+        if z.left is self._nil:
             x = z.right
             self._transplant(z, z.right)
-        elif self.is_nil(z.right):
+        elif z.right is self._nil:
             x = z.left
             self._transplant(z, z.left)
         else:
             y = self._minimum(z.right)
-            y_original_color = y.color
+            y_original_red = y.red
             x = y.right
             if y.parent == z:
                 x.parent = y  # Because x could be Nil
@@ -137,21 +141,21 @@ class Beachline:
             self._transplant(z, y)
             y.left = z.left
             y.left.parent = y
-            y.color = z.color
-        if y_original_color == Arc.Color.BLACK:
+            y.red = z.red
+        if not y_original_red:
             self._remove_fixup(x)
-        if not self.is_nil(z.prev):
+        if z.prev is not self._nil:
             z.prev.next = z.next
-        if not self.is_nil(z.next):
+        if z.next is not self._nil:
             z.next.prev = z.prev
 
     def _minimum(self, x: Arc) -> Arc:
-        while not self.is_nil(x.left):
+        while x.left is not self._nil:
             x = x.left
         return x
 
     def _transplant(self, u: Arc, v: Arc):
-        if self.is_nil(u.parent):
+        if u.parent is self._nil:
             self._root = v
         elif u == u.parent.left:
             u.parent.left = v
@@ -160,14 +164,14 @@ class Beachline:
         v.parent = u.parent
 
     def _insert_fixup(self, z: Arc):
-        while z.parent.color == Arc.Color.RED:
+        while z.parent.red:
             if z.parent == z.parent.parent.left:
                 y = z.parent.parent.right
                 # Case 1
-                if y.color == Arc.Color.RED:
-                    z.parent.color = Arc.Color.BLACK
-                    y.color = Arc.Color.BLACK
-                    z.parent.parent.color = Arc.Color.RED
+                if y.red:
+                    z.parent.red = False
+                    y.red = False
+                    z.parent.parent.red = True
                     z = z.parent.parent
                 else:
                     # Case 2
@@ -175,16 +179,16 @@ class Beachline:
                         z = z.parent
                         self._left_rotate(z)
                     # Case 3
-                    z.parent.color = Arc.Color.BLACK
-                    z.parent.parent.color = Arc.Color.RED
+                    z.parent.red = False
+                    z.parent.parent.red = True
                     self._right_rotate(z.parent.parent)
             else:
                 y = z.parent.parent.left
                 # Case 1
-                if y.color == Arc.Color.RED:
-                    z.parent.color = Arc.Color.BLACK
-                    y.color = Arc.Color.BLACK
-                    z.parent.parent.color = Arc.Color.RED
+                if y.red:
+                    z.parent.red = False
+                    y.red = False
+                    z.parent.parent.red = True
                     z = z.parent.parent
                 else:
                     # Case 2
@@ -192,72 +196,72 @@ class Beachline:
                         z = z.parent
                         self._right_rotate(z)
                     # Case 3
-                    z.parent.color = Arc.Color.BLACK
-                    z.parent.parent.color = Arc.Color.RED
+                    z.parent.red = False
+                    z.parent.parent.red = True
                     self._left_rotate(z.parent.parent)
-        self._root.color = Arc.Color.BLACK
+        self._root.red = False
 
     def _remove_fixup(self, x: Arc):
-        while x != self._root and x.color == Arc.Color.BLACK:
+        while x != self._root and not x.red:
             if x == x.parent.left:
                 w = x.parent.right
                 # Case 1
-                if w.color == Arc.Color.RED:
-                    w.color = Arc.Color.BLACK
-                    x.parent.color = Arc.Color.RED
+                if w.red:
+                    w.red = False
+                    x.parent.red = True
                     self._left_rotate(x.parent)
                     w = x.parent.right
                 # Case 2
-                if w.left.color == Arc.Color.BLACK and w.right.color == Arc.Color.BLACK:
-                    w.color = Arc.Color.RED
+                if not w.left.red and not w.right.red:
+                    w.red = True
                     x = x.parent
                 else:
                     # Case 3
-                    if w.right.color == Arc.Color.BLACK:
-                        w.left.color = Arc.Color.BLACK
-                        w.color = Arc.Color.RED
+                    if not w.right.red:
+                        w.left.red = False
+                        w.red = True
                         self._right_rotate(w)
                         w = x.parent.right
                     # Case 4
-                    w.color = x.parent.color
-                    x.parent.color = Arc.Color.BLACK
-                    w.right.color = Arc.Color.BLACK
+                    w.red = x.parent.red
+                    x.parent.red = False
+                    w.right.red = False
                     self._left_rotate(x.parent)
                     x = self._root
             else:
                 w = x.parent.left
                 # Case 1
-                if w.color == Arc.Color.RED:
-                    w.color = Arc.Color.BLACK
-                    x.parent.color = Arc.Color.RED
+                if w.red:
+                    w.red = False
+                    x.parent.red = True
                     self._right_rotate(x.parent)
                     w = x.parent.left
                 # Case 2
-                if w.right.color == Arc.Color.BLACK and w.left.color == Arc.Color.BLACK:
-                    w.color = Arc.Color.RED
+                if not w.right.red and not w.left.red:
+                    w.red = True
                     x = x.parent
                 else:
                     # Case 3
-                    if w.left.color == Arc.Color.BLACK:
-                        w.right.color = Arc.Color.BLACK
-                        w.color = Arc.Color.RED
+                    if not w.left.red:
+                        w.right.red = False
+                        w.red = True
                         self._left_rotate(w)
                         w = x.parent.left
                     # Case 4
-                    w.color = x.parent.color
-                    x.parent.color = Arc.Color.BLACK
-                    w.left.color = Arc.Color.BLACK
+                    w.red = x.parent.red
+                    x.parent.red = False
+                    w.left.red = False
                     self._right_rotate(x.parent)
                     x = self._root
-        x.color = Arc.Color.BLACK
+        x.red = False
 
     def _left_rotate(self, x: Arc):
         y = x.right
         x.right = y.left
-        if not self.is_nil(y.left):
+        if y.left is not self._nil:
             y.left.parent = x
         y.parent = x.parent
-        if self.is_nil(x.parent):
+        if x.parent is self._nil:
             self._root = y
         elif x == x.parent.left:
             x.parent.left = y
@@ -269,10 +273,10 @@ class Beachline:
     def _right_rotate(self, y: Arc):
         x = y.left
         y.left = x.right
-        if not self.is_nil(x.right):
+        if x.right is not self._nil:
             x.right.parent = y
         x.parent = y.parent
-        if self.is_nil(y.parent):
+        if y.parent is self._nil:
             self._root = x
         elif y == y.parent.left:
             y.parent.left = x
@@ -283,16 +287,35 @@ class Beachline:
 
     def arc_str(self, arc: Arc, tabs: str = '') -> str:
         result = f"{tabs}{arc.site.index} {arc.left_half_edge} {arc.right_half_edge}\n"
-        if not self.is_nil(arc.left):
+        if arc.left is not self._nil:
             result += self.arc_str(arc.left, tabs + '\t')
-        if not self.is_nil(arc.right):
+        if arc.right is not self._nil:
             result += self.arc_str(arc.right, tabs + '\t')
         return result
 
     def __str__(self):
         result = []
         arc = self.get_leftmost_arc()
-        while not self.is_nil(arc):
+        while arc is not self._nil:
             result.append(str(arc.site.index))
             arc = arc.next
         return ' '.join(result)
+
+
+# Beachline of an instrumented sweep: counts locate_arc_above() calls and tree levels walked into SweepStats
+class InstrumentedBeachline(Beachline):
+    def __init__(self, stats: 'SweepStats'):
+        super().__init__()
+        self._stats = stats
+
+    def locate_arc_above(self, point: Vector2, l: float) -> Arc:
+        arc = super().locate_arc_above(point, l)
+        # The search walked from the root down to the arc, one level per ancestor and one for the arc
+        iterations = 1
+        node = arc.parent
+        while node is not self._nil:
+            iterations += 1
+            node = node.parent
+        self._stats.locate_calls += 1
+        self._stats.locate_iterations += iterations
+        return arc
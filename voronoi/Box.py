@@ -1,10 +1,15 @@
 import math
 from enum import Enum, auto, IntEnum
-from typing import List, Optional
-from Vector2 import Vector2
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from voronoi.Vector2 import Vector2
 
 
 class Intersection:
+    __slots__ = ('side', 'point')
+
     def __init__(self, side: Optional['Box.Side'] = None, point: Optional['Vector2'] = None):
         self.side = side
         self.point = point
@@ -31,25 +36,27 @@ class Box:
 
     def get_first_intersection(self, origin: 'Vector2', direction: 'Vector2') -> 'Intersection':
         intersection = Intersection()
+        ox, oy, dx, dy = origin.x, origin.y, direction.x, direction.y
         t = math.inf
-        if direction.x > 0.0:
-            t = (self.right - origin.x) / direction.x
+        t_point = None
+        if dx > 0.0:
+            t = t_point = (self.right - ox) / dx
             intersection.side = Box.Side.RIGHT
-            intersection.point = origin + t * direction
-        elif direction.x < 0.0:
-            t = (self.left - origin.x) / direction.x
+        elif dx < 0.0:
+            t = t_point = (self.left - ox) / dx
             intersection.side = Box.Side.LEFT
-            intersection.point = origin + t * direction
-        if direction.y > 0.0:
-            t_by_y = (self.top - origin.y) / direction.y
+        if dy > 0.0:
+            t_by_y = (self.top - oy) / dy
             if t_by_y < t:
+                t_point = t_by_y
                 intersection.side = Box.Side.TOP
-                intersection.point = origin + t_by_y * direction
-        elif direction.y < 0.0:
-            t_by_y = (self.bottom - origin.y) / direction.y
+        elif dy < 0.0:
+            t_by_y = (self.bottom - oy) / dy
             if t_by_y < t:
+                t_point = t_by_y
                 intersection.side = Box.Side.BOTTOM
-                intersection.point = origin + t_by_y * direction
+        if t_point is not None:
+            intersection.point = Vector2(ox + dx * t_point, oy + dy * t_point)
         return intersection
 
     def get_intersections(self, origin: 'Vector2', destination: 'Vector2', intersections: List['Intersection']) \
@@ -81,7 +88,8 @@ class Box:
             if i < 2 and self.EPSILON < t[i] < 1.0 - self.EPSILON:
                 intersections[i].side = Box.Side.BOTTOM
                 intersections[i].point = origin + t[i] * direction
-                if self.left - self.EPSILON <= intersections[i].point.x <= self.right + self.EPSILON:
+                if self.left - self.EPSILON <= intersections[i].point.x <= self.right + self.EPSILON \
+                        and not self._is_corner_repeated(intersections, i):
                     i += 1
 
         if (origin.y > self.top + self.EPSILON or destination.y > self.top + self.EPSILON) and abs(
@@ -90,10 +98,74 @@ class Box:
             if i < 2 and self.EPSILON < t[i] < 1.0 - self.EPSILON:
                 intersections[i].side = Box.Side.TOP
                 intersections[i].point = origin + t[i] * direction
-                if self.left - self.EPSILON <= intersections[i].point.x <= self.right + self.EPSILON:
+                if self.left - self.EPSILON <= intersections[i].point.x <= self.right + self.EPSILON \
+                        and not self._is_corner_repeated(intersections, i):
                     i += 1
 
         if i == 2 and t[0] > t[1]:
             intersections[0], intersections[1] = intersections[1], intersections[0]
 
         return i
+
+    # Crossing of a segment that leaves the box at its origin, lying on a side, where get_intersections() finds
+    # none: the side and the point in the format of get_segments_intersections()
+    def get_endpoint_crossing(self, origin: 'Vector2', destination: 'Vector2') -> Tuple[List[int], List[List[float]]]:
+        intersection = self.get_first_intersection(origin, destination - origin)
+        return [int(intersection.side)], [[intersection.point.x, intersection.point.y]]
+
+    # A segment through a corner crosses a vertical and a horizontal side at the same point, counted once
+    def _is_corner_repeated(self, intersections: List['Intersection'], i: int) -> bool:
+        return i == 1 and abs(intersections[1].point.x - intersections[0].point.x) <= self.EPSILON \
+            and abs(intersections[1].point.y - intersections[0].point.y) <= self.EPSILON
+
+    # contains() for an (n, 2) array of points
+    def contains_points(self, points: np.ndarray) -> np.ndarray:
+        x, y = points[:, 0], points[:, 1]
+        return (self.left - self.EPSILON <= x) & (x <= self.right + self.EPSILON) \
+            & (self.bottom - self.EPSILON <= y) & (y <= self.top + self.EPSILON)
+
+    # get_intersections() for all segments of (n, 2) origin and destination arrays at once, with the same
+    # arithmetic: returns the numbers of intersections (n), their sides (n, 2) and points (n, 2, 2)
+    def get_segments_intersections(self, origins: np.ndarray, destinations: np.ndarray) \
+            -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        count = len(origins)
+        ox, oy = origins[:, 0], origins[:, 1]
+        dx, dy = destinations[:, 0] - ox, destinations[:, 1] - oy
+        counts = np.zeros(count, dtype=np.int64)
+        t = np.zeros((count, 2), dtype=np.float64)
+        sides = np.zeros((count, 2), dtype=np.int64)
+        points = np.zeros((count, 2, 2), dtype=np.float64)
+        eps = self.EPSILON
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Sides in the order of get_intersections(): (side, line, segment crosses the line, direction along
+            # the normal, origin along the normal, the other coordinate of the point must be in [low, high])
+            for side, line, crosses, along, start, vertical, low, high in (
+                    (Box.Side.LEFT, self.left, np.minimum(ox, destinations[:, 0]) < self.left - eps, dx, ox, True,
+                     self.bottom, self.top),
+                    (Box.Side.RIGHT, self.right, np.maximum(ox, destinations[:, 0]) > self.right + eps, dx, ox, True,
+                     self.bottom, self.top),
+                    (Box.Side.BOTTOM, self.bottom, np.minimum(oy, destinations[:, 1]) < self.bottom - eps, dy, oy,
+                     False, self.left, self.right),
+                    (Box.Side.TOP, self.top, np.maximum(oy, destinations[:, 1]) > self.top + eps, dy, oy, False,
+                     self.left, self.right)):
+                side_t = (line - start) / along
+                x = ox + side_t * dx
+                y = oy + side_t * dy
+                other = y if vertical else x
+                hit = crosses & (np.abs(along) > eps) & (eps < side_t) & (side_t < 1.0 - eps) \
+                    & (low - eps <= other) & (other <= high + eps) & (counts < 2)
+                if not vertical:
+                    hit &= ~((counts == 1) & (np.abs(x - points[:, 0, 0]) <= eps)
+                             & (np.abs(y - points[:, 0, 1]) <= eps))
+                hit = np.flatnonzero(hit)
+                slots = counts[hit]
+                t[hit, slots] = side_t[hit]
+                sides[hit, slots] = int(side)
+                points[hit, slots, 0] = x[hit]
+                points[hit, slots, 1] = y[hit]
+                counts[hit] += 1
+
+        swapped = np.flatnonzero((counts == 2) & (t[:, 0] > t[:, 1]))
+        sides[swapped] = sides[swapped, ::-1]
+        points[swapped] = points[swapped, ::-1]
+        return counts, sides, points
@@ -0,0 +1,97 @@
+from typing import NamedTuple
+
+import numpy as np
+
+NIL = -1
+
+
+# Per-cell data of a diagram in flat arrays, cells are indexed by site:
+#   indptr, indices: CSR adjacency, the neighbours of cell i are indices[indptr[i]:indptr[i + 1]] in increasing order
+#   vertices, offsets: the polygon of cell i is vertices[offsets[i]:offsets[i + 1]], counter-clockwise from the
+#                      origin of its outer component
+#   areas, perimeters, vertex_counts: one value per cell
+# A cell without a closed boundary (unbounded before bound(), or a broken cycle) has no polygon and NaN area and
+# perimeter; an empty cell (outside the box of intersect(), or a removed site) has no polygon and 0 area and perimeter.
+class CellArrays(NamedTuple):
+    indptr: np.ndarray
+    indices: np.ndarray
+    vertices: np.ndarray
+    offsets: np.ndarray
+    areas: np.ndarray
+    perimeters: np.ndarray
+    vertex_counts: np.ndarray
+
+
+# One pass over the half-edges given as flat arrays: incident face and face of the twin (NIL without twin) of every
+# half-edge, its origin (NaN without origin) and its next half-edge (NIL without next), and the outer component of
+# every face (NIL for an empty face). Faces are site indices.
+def build_cell_arrays(sites: np.ndarray, faces: np.ndarray, twin_faces: np.ndarray, origins: np.ndarray,
+                      next_: np.ndarray, outer_components: np.ndarray) -> CellArrays:
+    count = len(sites)
+    faces = faces.astype(np.int64)
+    twin_faces = twin_faces.astype(np.int64)
+    next_ = next_.astype(np.int64)
+    outer_components = outer_components.astype(np.int64)
+
+    # Adjacency: distinct (face, twin face) pairs sorted by face then neighbour, as one int64 key per pair (a plain
+    # sort, much faster than np.unique over rows)
+    paired = (twin_faces != NIL) & (twin_faces != faces)
+    keys = np.sort(faces[paired] * max(count, 1) + twin_faces[paired])
+    keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))] if len(keys) else keys
+    indptr = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys // max(count, 1), minlength=count), out=indptr[1:])
+    indices = keys % max(count, 1)
+
+    # The cycles of all faces are walked together, one half-edge of every face per step
+    open_faces = np.zeros(count, dtype=bool)
+    active = np.flatnonzero(outer_components != NIL)
+    current = outer_components[active]
+    empty = np.empty(0, dtype=np.int64)
+    step_faces, step_half_edges, step_numbers = [empty], [empty], [empty]
+    step = 0
+    while len(active) > 0:
+        if step > len(next_):
+            # A cycle that never comes back to its outer component
+            open_faces[active] = True
+            break
+        step_faces.append(active)
+        step_half_edges.append(current)
+        step_numbers.append(np.full(len(active), step, dtype=np.int64))
+        current = next_[current]
+        broken = current == NIL
+        open_faces[active[broken]] = True
+        running = ~broken
+        running[running] = current[running] != outer_components[active[running]]
+        active, current = active[running], current[running]
+        step += 1
+
+    # Slot of a walked half-edge: start of its face plus its step, which orders the polygons without a sort
+    walked_faces = np.concatenate(step_faces)
+    starts = np.concatenate(([0], np.cumsum(np.bincount(walked_faces, minlength=count))[:-1]))
+    slots = starts[walked_faces] + np.concatenate(step_numbers)
+    walked_half_edges = np.empty_like(walked_faces)
+    walked_half_edges[slots] = np.concatenate(step_half_edges)
+    walked_faces[slots] = walked_faces.copy()
+    polygon_points = origins[walked_half_edges]
+    open_faces[walked_faces[np.isnan(polygon_points).any(axis=1)]] = True
+    closed = ~open_faces[walked_faces]
+    walked_faces, vertices = walked_faces[closed], polygon_points[closed]
+
+    vertex_counts = np.bincount(walked_faces, minlength=count)
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(vertex_counts, out=offsets[1:])
+    # Next vertex of every vertex along its polygon
+    following = np.arange(1, len(vertices) + 1)
+    nonempty = vertex_counts > 0
+    following[offsets[1:][nonempty] - 1] = offsets[:-1][nonempty]
+
+    # Shoelace formula relative to the site, which keeps the terms small
+    relative = vertices - sites[walked_faces]
+    relative_next = relative[following]
+    cross = relative[:, 0] * relative_next[:, 1] - relative_next[:, 0] * relative[:, 1]
+    areas = 0.5 * np.bincount(walked_faces, cross, minlength=count).astype(np.float64)
+    sides = relative_next - relative
+    perimeters = np.bincount(walked_faces, np.hypot(sides[:, 0], sides[:, 1]), minlength=count).astype(np.float64)
+    areas[open_faces] = np.nan
+    perimeters[open_faces] = np.nan
+    return CellArrays(indptr, indices, vertices, offsets, areas, perimeters, vertex_counts)
@@ -0,0 +1,168 @@
+import hashlib
+import os
+import struct
+import tempfile
+import time
+from typing import List, Optional, Union
+
+import numpy as np
+
+from voronoi.ArrayFortuneAlgorithm import ArrayFortuneAlgorithm
+from voronoi.ArrayVoronoiDiagram import ArrayVoronoiDiagram
+from voronoi.Box import Box
+from voronoi.Vector2 import Vector2
+from voronoi.VoronoiDiagram import VoronoiDiagram
+
+
+# On-disk cache of diagrams in front of FortuneAlgorithm: construct(), bound(box) and intersect(clip_box).
+#
+# An entry is the file of ArrayVoronoiDiagram.save() named by a hash of the site coordinates, the boxes and the
+# options that change the result. Its modification time is the time of its last use: hits touch it, and when the
+# files exceed max_bytes the least recently used ones are removed. Entries are written to a temporary file of the
+# same directory and renamed into place, which is atomic, so concurrent processes see either no entry or a
+# complete one, and a removed entry that another process still reads stays readable until it is closed. Diagrams
+# with cells that bound() or intersect() could not finish are returned but not stored, and counted in get_failures().
+class DiagramCache:
+    EXTENSION = '.voronoi'
+    # Part of every key, to be changed whenever the diagrams built from the same input change
+    KEY_VERSION = 1
+    # Temporary files older than this were left by a crashed writer
+    STALE_TEMPORARY_AGE = 3600.0
+
+    def __init__(self, directory: str, max_bytes: int = 1 << 30):
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._failures = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def get_hits(self) -> int:
+        return self._hits
+
+    def get_misses(self) -> int:
+        return self._misses
+
+    def get_evictions(self) -> int:
+        return self._evictions
+
+    # Diagrams built with cells that could not be bounded or clipped
+    def get_failures(self) -> int:
+        return self._failures
+
+    # Bytes of the entries currently on disk, written by any process
+    def get_size(self) -> int:
+        return sum(size for _, size, _ in self._list_entries())
+
+    @classmethod
+    def get_key(cls, points: np.ndarray, box: Box, clip_box: Optional[Box] = None, use_legacy_queue: bool = False) \
+            -> str:
+        points = np.ascontiguousarray(points, dtype='<f8').reshape(-1, 2)
+        key = hashlib.blake2b(digest_size=20)
+        key.update(struct.pack('<IIQ?', cls.KEY_VERSION, ArrayVoronoiDiagram.VERSION, len(points), use_legacy_queue))
+        key.update(struct.pack('<4d', box.left, box.bottom, box.right, box.top))
+        if clip_box is not None:
+            key.update(struct.pack('<4d', clip_box.left, clip_box.bottom, clip_box.right, clip_box.top))
+        key.update(points.tobytes())
+        return key.hexdigest()
+
+    # The diagram of points bounded by box and clipped to clip_box, built only on a miss. Hits are memory-mapped
+    # ArrayVoronoiDiagram files; a VoronoiDiagram is rebuilt from it unless array is True.
+    def construct(self, points: Union[List[Vector2], np.ndarray], box: Box, clip_box: Optional[Box] = None,
+                  use_legacy_queue: bool = False, array: bool = False) \
+            -> Union[VoronoiDiagram, ArrayVoronoiDiagram]:
+        if isinstance(points, np.ndarray):
+            coordinates = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+            points = [Vector2(x, y) for x, y in coordinates.tolist()]
+        else:
+            coordinates = np.array([(p.x, p.y) for p in points], dtype=np.float64).reshape(-1, 2)
+        path = os.path.join(self._directory, self.get_key(coordinates, box, clip_box, use_legacy_queue)
+                            + self.EXTENSION)
+
+        diagram = self._load(path)
+        if diagram is not None:
+            self._hits += 1
+            return diagram if array else diagram.to_diagram()
+
+        self._misses += 1
+        algorithm = ArrayFortuneAlgorithm(points, use_legacy_queue)
+        algorithm.construct()
+        # bound() grows its box to the vertices, the box of the key stays as it is
+        bounded = algorithm.bound(Box(box.left, box.bottom, box.right, box.top))
+        diagram = algorithm.get_diagram()
+        intersected = clip_box is None or diagram.intersect(clip_box)
+        if bounded and intersected:
+            self._store(path, diagram)
+        else:
+            self._failures += 1
+        return diagram if array else diagram.to_diagram()
+
+    def clear(self):
+        for path, _, _ in self._list_entries():
+            self._remove(path)
+
+    def _load(self, path: str) -> Optional[ArrayVoronoiDiagram]:
+        try:
+            diagram = ArrayVoronoiDiagram.load(path)
+            os.utime(path)
+        except (OSError, ValueError):
+            # Removed by another process, or a file of another layout
+            return None
+        return diagram
+
+    def _store(self, path: str, diagram: ArrayVoronoiDiagram):
+        handle, temporary = tempfile.mkstemp(suffix='.tmp', dir=self._directory)
+        os.close(handle)
+        try:
+            diagram.save(temporary)
+            os.replace(temporary, path)
+        except OSError:
+            # A full disk only costs the entry
+            self._remove(temporary)
+            return
+        self._evict()
+
+    def _evict(self):
+        entries = self._list_entries()
+        size = sum(entry_size for _, entry_size, _ in entries)
+        # Least recently used first
+        entries.sort(key=lambda entry: entry[2])
+        for path, entry_size, _ in entries:
+            if size <= self._max_bytes:
+                break
+            if self._remove(path):
+                self._evictions += 1
+            size -= entry_size
+
+        now = time.time()
+        for name in os.listdir(self._directory):
+            if name.endswith('.tmp'):
+                path = os.path.join(self._directory, name)
+                try:
+                    if now - os.stat(path).st_mtime > self.STALE_TEMPORARY_AGE:
+                        self._remove(path)
+                except OSError:
+                    pass
+
+    # (path, size, last use) of every entry
+    def _list_entries(self) -> list:
+        entries = list()
+        for name in os.listdir(self._directory):
+            if not name.endswith(self.EXTENSION):
+                continue
+            path = os.path.join(self._directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+        except OSError:
+            return False
+        return True
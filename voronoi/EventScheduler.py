@@ -0,0 +1,51 @@
+import heapq
+from typing import List
+
+import numpy as np
+
+from voronoi.VoronoiDiagram import Event, Site
+
+
+# Event queue of the sweep. Sites are sorted once by decreasing y, then increasing x, and read with a cursor; a
+# site comes before the circle events of its y. Circle events live in a heapq heap. Every queued circle event gets
+# a version token in its index field; remove() only resets the token, and heap entries whose token no longer
+# matches are skipped when they reach the top.
+class EventScheduler:
+    INVALID = -1
+
+    def __init__(self, sites: List[Site]):
+        self._sites = sites
+        xs = np.fromiter((site.point.x for site in sites), dtype=np.float64, count=len(sites))
+        ys = np.fromiter((site.point.y for site in sites), dtype=np.float64, count=len(sites))
+        self._site_order: List[int] = np.lexsort((xs, -ys)).tolist()
+        self._cursor = 0
+        self._circle_events: List = list()
+        self._next_token = 0
+
+    def is_empty(self) -> bool:
+        self._discard_invalid()
+        return self._cursor == len(self._site_order) and not self._circle_events
+
+    def pop(self) -> Event:
+        self._discard_invalid()
+        if self._cursor < len(self._site_order):
+            site = self._sites[self._site_order[self._cursor]]
+            if not self._circle_events or site.point.y >= -self._circle_events[0][0]:
+                self._cursor += 1
+                return Event(site)
+        event = heapq.heappop(self._circle_events)[2]
+        event.index = self.INVALID
+        return event
+
+    def push(self, event: Event) -> None:
+        event.index = self._next_token
+        heapq.heappush(self._circle_events, (-event.y, self._next_token, event))
+        self._next_token += 1
+
+    def remove(self, event: Event) -> None:
+        event.index = self.INVALID
+
+    def _discard_invalid(self) -> None:
+        circle_events = self._circle_events
+        while circle_events and circle_events[0][2].index != circle_events[0][1]:
+            heapq.heappop(circle_events)
@@ -1,11 +1,17 @@
+import math
+import time
 from typing import Optional, Tuple, Mapping, List, Dict
 
-from Box import Box
-from Vector2 import Vector2
-from BeachLine import Beachline
-from PriorityQueue import PriorityQueue
-from VoronoiDiagram import VoronoiDiagram, Vertex, HalfEdge, Event, Arc, Site
-from voronoi.VoronoiDiagram import EventType
+import numpy as np
+
+from voronoi.Box import Box
+from voronoi.Vector2 import Vector2
+from voronoi.BeachLine import Beachline, InstrumentedBeachline
+from voronoi.EventScheduler import EventScheduler
+from voronoi.Predicates import orientation, in_circle, exact_circumcenter
+from voronoi.PriorityQueue import PriorityQueue
+from voronoi.SweepStats import SweepStats
+from voronoi.VoronoiDiagram import VoronoiDiagram, Vertex, HalfEdge, Event, EventType, Arc, Site
 
 
 class LinkedVertex:
@@ -22,20 +28,41 @@ class LinkedVertex:
 class FortuneAlgorithm:
     _diagram: VoronoiDiagram
     _beachline: Beachline
-    _events: PriorityQueue
+    _events: 'PriorityQueue | EventScheduler'
     _beachline_y: float
-
-    def __init__(self, points: list):
-        self._diagram = VoronoiDiagram(points)
-        self._beachline = Beachline()
+    # Relative size of the determinant under which the convergence point is computed exactly
+    CONVERGENCE_BOUND = 1e-8
+    # Relative distance between two convergence points under which co-circularity is tested exactly
+    COCIRCULAR_TOLERANCE = 1e-9
+
+    # use_legacy_queue switches back to the binary heap of PriorityQueue that holds site events too;
+    # stats turns on the instrumentation of the sweep, without it the sweep runs uninstrumented
+    def __init__(self, points: list, use_legacy_queue: bool = False, stats: Optional[SweepStats] = None):
+        self._diagram = self._create_diagram(points)
+        self._stats = stats
+        self._beachline = Beachline() if stats is None else InstrumentedBeachline(stats)
+        self._use_legacy_queue = use_legacy_queue
         self._events = PriorityQueue()
         self._beachline_y = 0.0
+        # Dual Delaunay triangulation, recorded during the sweep as flat lists of site indices
+        self._delaunay_edges: List[int] = list()
+        self._delaunay_triangles: List[int] = list()
+        # Vertical edges between the first sites of the sweep, open to the top until bound()
+        self._top_edges: List[Tuple[Arc, Arc]] = list()
 
     def construct(self):
-        for i in range(self._diagram.get_sites_count()):
-            self._events.push(Event(self._diagram.get_site(i)))
+        start = time.perf_counter()
+        if self._use_legacy_queue:
+            for i in range(self._diagram.get_sites_count()):
+                self._events.push(Event(self._diagram.get_site(i)))
+        else:
+            self._events = EventScheduler(self._diagram.get_sites())
 
         # Обработка событий
+        if self._stats is not None:
+            self._process_events_instrumented()
+            self._stats.add_time('construct', time.perf_counter() - start)
+            return
         while not self._events.is_empty():
             event = self._events.pop()
             self._beachline_y = event.y
@@ -44,9 +71,54 @@ class FortuneAlgorithm:
             else:
                 self._handle_circle_event(event)
 
+    def _process_events_instrumented(self):
+        stats = self._stats
+        measured_size = 0
+        while not self._events.is_empty():
+            event = self._events.pop()
+            self._beachline_y = event.y
+            if event.type == EventType.SITE:
+                # The first arc is the root, every other site splits an arc in two around its own
+                stats.beachline_size += 1 if self._beachline.is_empty() else 2
+                self._handle_site_event(event)
+                stats.site_events += 1
+            else:
+                self._handle_circle_event(event)
+                stats.circle_events += 1
+                stats.beachline_size -= 1
+            if stats.beachline_size > stats.max_beachline_size:
+                stats.max_beachline_size = stats.beachline_size
+                if stats.beachline_size >= measured_size * stats.HEIGHT_MEASURE_GROWTH:
+                    measured_size = stats.beachline_size
+                    stats.max_beachline_height = max(stats.max_beachline_height, self._beachline.get_height())
+            if stats.callback is not None:
+                stats.callback(event, stats)
+
+    def get_stats(self) -> Optional[SweepStats]:
+        return self._stats
+
     def get_diagram(self) -> 'VoronoiDiagram':
         return self._diagram
 
+    def get_delaunay_edges(self) -> np.ndarray:
+        edges = np.array(self._delaunay_edges, dtype=np.int64).reshape(-1, 2)
+        edges.sort(axis=1)
+        return np.unique(edges, axis=0)
+
+    def get_delaunay_triangles(self) -> np.ndarray:
+        triangles = np.array(self._delaunay_triangles, dtype=np.int64).reshape(-1, 3)
+        if len(triangles) == 0:
+            return triangles
+        # Orient every triangle counter-clockwise
+        points = np.array([(site.point.x, site.point.y) for site in self._diagram.get_sites()])
+        a, b, c = points[triangles[:, 0]], points[triangles[:, 1]], points[triangles[:, 2]]
+        clockwise = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0]) < 0
+        triangles[clockwise] = triangles[clockwise][:, [0, 2, 1]]
+        return triangles
+
+    def _create_diagram(self, points: list) -> 'VoronoiDiagram':
+        return VoronoiDiagram(points)
+
     def _handle_site_event(self, event: Event):
         site = event.site
 
@@ -57,6 +129,9 @@ class FortuneAlgorithm:
 
         # 2. Найти дугу, над которой появляется сайт
         arc_to_break = self._beachline.locate_arc_above(site.point, self._beachline_y)
+        if arc_to_break.site.point.y == site.point.y:
+            self._add_arc_on_sweep_line(arc_to_break, site)
+            return
         self._delete_event(arc_to_break)
         # 3. Разделить дугу и вставить новую
         middle_arc = self._break_arc(arc_to_break, site)
@@ -65,6 +140,7 @@ class FortuneAlgorithm:
 
         # 4. Добавить новое ребро
         self._add_edge(left_arc, middle_arc)
+        self._delaunay_edges += (left_arc.site.index, middle_arc.site.index)
         middle_arc.right_half_edge = middle_arc.left_half_edge
         right_arc.left_half_edge = left_arc.right_half_edge
 
@@ -74,6 +150,22 @@ class FortuneAlgorithm:
         if not self._beachline.is_nil(right_arc.next):
             self._add_event(middle_arc, right_arc, right_arc.next)
 
+    # The sites sharing the first y of the sweep still have vertical rays as arcs: the new arc goes next to the
+    # arc found, which is the rightmost one as sites of equal y come by increasing x, instead of splitting it.
+    # No circle event is possible between them, and the edge between them is a vertical line open to the top.
+    def _add_arc_on_sweep_line(self, arc: Arc, site: Site):
+        new_arc = self._beachline.create_arc(site)
+        self._beachline.insert_after(arc, new_arc)
+        self._add_edge(arc, new_arc)
+        self._delaunay_edges += (arc.site.index, site.index)
+        # Arcs are split and dropped during the sweep, keep the half-edges in arcs of their own
+        left_arc, right_arc = Arc(arc.site), Arc(site)
+        left_arc.right_half_edge, right_arc.left_half_edge = arc.right_half_edge, new_arc.left_half_edge
+        self._top_edges.append((left_arc, right_arc))
+        if self._stats is not None:
+            # Counted as a split by the instrumented sweep, which adds two arcs
+            self._stats.beachline_size -= 1
+
     def _handle_circle_event(self, event: Event):
         point = event.point
         arc = event.arc
@@ -89,12 +181,13 @@ class FortuneAlgorithm:
 
         # 3. Обновить beachline и диаграмму
         self._remove_arc(arc, vertex)
+        self._delaunay_triangles += (left_arc.site.index, arc.site.index, right_arc.site.index)
 
         # 4. Проверить и добавить новые circle-события
         if not self._beachline.is_nil(left_arc.prev):
-            self._add_event(left_arc.prev, left_arc, right_arc)
+            self._add_event(left_arc.prev, left_arc, right_arc, event)
         if not self._beachline.is_nil(right_arc.next):
-            self._add_event(left_arc, right_arc, right_arc.next)
+            self._add_event(left_arc, right_arc, right_arc.next, event)
 
     def _break_arc(self, arc: Arc, site: Site):
         # 1. Создать новую дугу и разбить старую на 2
@@ -118,8 +211,7 @@ class FortuneAlgorithm:
         self._set_destination(arc, arc.next, vertex)
 
         # 2. Соединяем ребра
-        arc.left_half_edge.next = arc.right_half_edge
-        arc.right_half_edge.prev = arc.left_half_edge
+        self._set_prev_half_edge(arc.left_half_edge, arc.right_half_edge)
 
         # 3. Обновляем beachline
         self._beachline.remove(arc)
@@ -128,17 +220,11 @@ class FortuneAlgorithm:
         prev_half_edge = arc.prev.right_half_edge
         next_half_edge = arc.next.left_half_edge
         self._add_edge(arc.prev, arc.next)
+        self._delaunay_edges += (arc.prev.site.index, arc.next.site.index)
         self._set_origin(arc.prev, arc.next, vertex)
         self._set_prev_half_edge(arc.prev.right_half_edge, prev_half_edge)
         self._set_prev_half_edge(next_half_edge, arc.next.left_half_edge)
 
-    def _is_moving_right(self, left: Arc, right: Arc) -> bool:
-        return left.site.point.y < right.site.point.y
-
-    # Breakpoint logic
-    def _get_initial_x(self, left: Arc, right: Arc, moving_right: bool) -> float:
-        return left.site.point.x if moving_right else right.site.point.x
-
     def _add_edge(self, left: Arc, right: Arc):
         # 1. Создаем два новых полуребра
         left.right_half_edge = self._diagram._create_half_edge(left.site.face)
@@ -161,66 +247,96 @@ class FortuneAlgorithm:
         prev.next = next_
         next_.prev = prev
 
-    def _add_event(self, left: Arc, middle: Arc, right: Arc):
-        # 1.
-        y, convergence_point = self._compute_convergence_point(left.site.point, middle.site.point, right.site.point)
+    # previous is the circle event being handled, if any: its vertex is reused when the four sites are co-circular
+    def _add_event(self, left: Arc, middle: Arc, right: Arc, previous: Optional[Event] = None):
+        left_point = left.site.point
+        middle_point = middle.site.point
+        right_point = right.site.point
 
-        # 2. Проверяем, находится ли точка ниже текущего уровня beachline
-        is_below = y <= self._beachline_y
+        # 1. Точки пересечения сходятся, только если сайты образуют правый поворот (точный предикат)
+        if orientation(left_point.x, left_point.y, middle_point.x, middle_point.y, right_point.x, right_point.y) >= 0:
+            return
 
-        # 3. Смотрим, куда движутся точки пересечений
-        left_breakpoint_moving_right = self._is_moving_right(left, middle)
-        right_breakpoint_moving_right = self._is_moving_right(middle, right)
+        # 2. Находим точку схождения
+        y, center_x, center_y = self._compute_convergence_point(left_point, middle_point, right_point)
 
-        # 4. Получаем начальные координаты x для полурёбер
-        left_initial_x = self._get_initial_x(left, middle, left_breakpoint_moving_right)
-        right_initial_x = self._get_initial_x(middle, right, right_breakpoint_moving_right)
+        # 3. Сайты на одной окружности с удалённой дугой: та же окружность, та же вершина
+        if previous is not None and abs(center_x - previous.point.x) + abs(center_y - previous.point.y) \
+                <= self.COCIRCULAR_TOLERANCE * (abs(center_x) + abs(center_y) + center_y - y):
+            removed_point = previous.arc.site.point
+            if in_circle(left_point.x, left_point.y, middle_point.x, middle_point.y, right_point.x, right_point.y,
+                         removed_point.x, removed_point.y) == 0:
+                y, center_x, center_y = previous.y, previous.point.x, previous.point.y
 
-        # 5. Проверяем, удовлетворяют ли дуги условиям для добавления события
-        is_valid = (
-                           (left_breakpoint_moving_right and left_initial_x < convergence_point.x) or
-                           (not left_breakpoint_moving_right and left_initial_x > convergence_point.x)
-                   ) and (
-                           (right_breakpoint_moving_right and right_initial_x < convergence_point.x) or
-                           (not right_breakpoint_moving_right and right_initial_x > convergence_point.x)
-                   )
+        # 4. Сходящиеся точки не могут встретиться выше beachline, это ошибка округления
+        if y > self._beachline_y:
+            y = self._beachline_y
 
-        # 6. Если событие валидно и точка находится ниже, добавляем его в очередь событий
-        if is_valid and is_below:
-            event = Event(y, convergence_point, middle)
-            middle.event = event
-            self._events.push(event)
+        # 5. Событие валидно, добавляем его в очередь событий
+        event = Event(y, Vector2(center_x, center_y), middle)
+        middle.event = event
+        self._events.push(event)
 
     # Events
     def _delete_event(self, arc: Arc):
         if arc.event is not None:
-            self._events.remove(arc.event.index)
+            if self._stats is not None:
+                self._stats.invalidated_circle_events += 1
+            if self._use_legacy_queue:
+                self._events.remove(arc.event.index)
+            else:
+                self._events.remove(arc.event)
             arc.event = None
 
-    def _compute_convergence_point(self, point1: Vector2, point2: Vector2, point3: Vector2) -> Tuple[float, Vector2]:
-
-        v1 = (point1 - point2).orthogonal()
-        v2 = (point2 - point3).orthogonal()
+    def _compute_convergence_point(self, point1: Vector2, point2: Vector2, point3: Vector2) \
+            -> Tuple[float, float, float]:
+        x1, y1 = point1.x, point1.y
+        x2, y2 = point2.x, point2.y
+        x3, y3 = point3.x, point3.y
 
-        delta = 0.5 * (point3 - point1)
+        # v1 = (point1 - point2).orthogonal(), v2 = (point2 - point3).orthogonal()
+        v1x, v1y = -(y1 - y2), x1 - x2
+        v2x, v2y = -(y2 - y3), x2 - x3
 
-        t = delta.det(v2) / v1.det(v2)
+        # delta = 0.5 * (point3 - point1)
+        delta_x = (x3 - x1) * 0.5
+        delta_y = (y3 - y1) * 0.5
 
-        center = 0.5 * (point1 + point2) + t * v1
+        det = v1x * v2y - v1y * v2x
+        # Nearly collinear sites: the float center would be mostly rounding error
+        if abs(det) <= self.CONVERGENCE_BOUND * (abs(v1x * v2y) + abs(v1y * v2x)):
+            center_x, center_y = exact_circumcenter(x1, y1, x2, y2, x3, y3)
+        else:
+            t = (delta_x * v2y - delta_y * v2x) / det
+            center_x = (x1 + x2) * 0.5 + v1x * t
+            center_y = (y1 + y2) * 0.5 + v1y * t
 
-        r = center.distance_to(point1)
+        dx = center_x - x1
+        dy = center_y - y1
+        r = math.sqrt(dx ** 2 + dy ** 2)
 
-        y = center.y - r
-
-        return y, center
+        return center_y - r, center_x, center_y
 
     def bound(self, box: Box) -> bool:
+        if self._stats is None:
+            return self._bound(box)
+        start = time.perf_counter()
+        result = self._bound(box)
+        self._stats.add_time('bound', time.perf_counter() - start)
+        return result
+
+    # Clips the diagram with diagram.intersect(box), timed when the sweep is instrumented
+    def intersect(self, box: Box) -> bool:
+        if self._stats is None:
+            return self._diagram.intersect(box)
+        start = time.perf_counter()
+        result = self._diagram.intersect(box)
+        self._stats.add_time('intersect', time.perf_counter() - start)
+        return result
+
+    def _bound(self, box: Box) -> bool:
         # Расширяем box
-        for vertex in self._diagram.get_vertices():
-            box.left = min(vertex.point.x, box.left)
-            box.bottom = min(vertex.point.y, box.bottom)
-            box.right = max(vertex.point.x, box.right)
-            box.top = max(vertex.point.y, box.top)
+        self._expand_box(box)
 
         # Retrieve all non-bounded half-edges from the beachline
         linked_vertices = []
@@ -256,6 +372,20 @@ class FortuneAlgorithm:
                 left_arc = right_arc
                 right_arc = right_arc.next
 
+        # Close the vertical edges between the first sites of the sweep on the top side
+        for left_arc, right_arc in self._top_edges:
+            vertex = self._diagram._create_vertex(Vector2((left_arc.site.point.x + right_arc.site.point.x) * 0.5,
+                                                          box.top))
+            self._set_origin(left_arc, right_arc, vertex)
+            if left_arc.site.index not in vertices:
+                vertices[left_arc.site.index] = [None] * 8
+            if right_arc.site.index not in vertices:
+                vertices[right_arc.site.index] = [None] * 8
+            linked_vertices.append(LinkedVertex(left_arc.right_half_edge, vertex, None))
+            vertices[left_arc.site.index][2 * int(Box.Side.TOP)] = linked_vertices[-1]
+            linked_vertices.append(LinkedVertex(None, vertex, right_arc.left_half_edge))
+            vertices[right_arc.site.index][2 * int(Box.Side.TOP) + 1] = linked_vertices[-1]
+
         # Add corners
         for cell_vertices in vertices.values():
             for i in range(5):
@@ -279,17 +409,27 @@ class FortuneAlgorithm:
         for i, cell_vertices in vertices.items():
             for side in range(4):
                 if cell_vertices[2 * side] is not None:
-                    # Link vertices
-                    half_edge = self._diagram._create_half_edge(self._diagram.get_face(i))
-                    half_edge.origin = cell_vertices[2 * side].vertex
-                    half_edge.destination = cell_vertices[2 * side + 1].vertex
-                    cell_vertices[2 * side].next_half_edge = half_edge
-                    half_edge.prev = cell_vertices[2 * side].prev_half_edge
-                    if cell_vertices[2 * side].prev_half_edge is not None:
-                        cell_vertices[2 * side].prev_half_edge.next = half_edge
-                    cell_vertices[2 * side + 1].prev_half_edge = half_edge
-                    half_edge.next = cell_vertices[2 * side + 1].next_half_edge
-                    if cell_vertices[2 * side + 1].next_half_edge is not None:
-                        cell_vertices[2 * side + 1].next_half_edge.prev = half_edge
+                    self._link_vertices(self._diagram.get_face(i), cell_vertices[2 * side],
+                                        cell_vertices[2 * side + 1])
 
         return True
+
+    def _expand_box(self, box: Box):
+        for vertex in self._diagram.get_vertices():
+            box.left = min(vertex.point.x, box.left)
+            box.bottom = min(vertex.point.y, box.bottom)
+            box.right = max(vertex.point.x, box.right)
+            box.top = max(vertex.point.y, box.top)
+
+    def _link_vertices(self, face, start: LinkedVertex, end: LinkedVertex):
+        half_edge = self._diagram._create_half_edge(face)
+        half_edge.origin = start.vertex
+        half_edge.destination = end.vertex
+        start.next_half_edge = half_edge
+        half_edge.prev = start.prev_half_edge
+        if start.prev_half_edge is not None:
+            start.prev_half_edge.next = half_edge
+        end.prev_half_edge = half_edge
+        half_edge.next = end.next_half_edge
+        if end.next_half_edge is not None:
+            end.next_half_edge.prev = half_edge
@@ -0,0 +1,71 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from voronoi.ArrayFortuneAlgorithm import ArrayFortuneAlgorithm
+from voronoi.ArrayVoronoiDiagram import ArrayVoronoiDiagram
+from voronoi.Box import Box
+from voronoi.Vector2 import Vector2
+
+
+# Areas and centroids of all cells in one shoelace pass over the half-edges. The sum over the edges of a cycle
+# does not depend on their order, so the cycles are never walked: every alive half-edge adds its term to its face.
+# Coordinates are taken relative to the site of the face to keep the cross products small.
+def get_cell_geometry(diagram: ArrayVoronoiDiagram, areas: Optional[np.ndarray] = None,
+                      centroids: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    sites = diagram.get_site_points()
+    count = len(sites)
+    if areas is None:
+        areas = np.empty(count, dtype=np.float64)
+    if centroids is None:
+        centroids = np.empty((count, 2), dtype=np.float64)
+
+    half_edges = diagram.get_half_edges()
+    alive = half_edges.alive & (half_edges.origin != ArrayVoronoiDiagram.NIL) \
+        & (half_edges.destination != ArrayVoronoiDiagram.NIL)
+    faces = half_edges.incident_face[alive]
+    vertices = diagram.get_vertices()
+    origins = vertices[half_edges.origin[alive]] - sites[faces]
+    destinations = vertices[half_edges.destination[alive]] - sites[faces]
+    cross = origins[:, 0] * destinations[:, 1] - destinations[:, 0] * origins[:, 1]
+
+    areas[:] = np.bincount(faces, cross, minlength=count)
+    centroids[:, 0] = np.bincount(faces, (origins[:, 0] + destinations[:, 0]) * cross, minlength=count)
+    centroids[:, 1] = np.bincount(faces, (origins[:, 1] + destinations[:, 1]) * cross, minlength=count)
+    # Empty cells keep their site as centroid
+    empty = areas == 0.0
+    areas[empty] = 1.0
+    centroids /= 3.0 * areas[:, None]
+    areas[empty] = 0.0
+    centroids[empty] = 0.0
+    centroids += sites
+    areas *= 0.5
+    return areas, centroids
+
+
+# Lloyd relaxation: moves every site to the centroid of its cell clipped to box. Stops after iterations steps or
+# as soon as no site moved by more than tol. Returns the relaxed sites as an (n, 2) array and the number of steps.
+def lloyd(points: List[Vector2], box: Box, iterations: int = 100, tol: float = 0.0) -> Tuple[np.ndarray, int]:
+    sites = np.array([(p.x, p.y) for p in points], dtype=np.float64).reshape(-1, 2)
+    if len(sites) < 2:
+        return sites, 0
+    margin = 0.1 * max(box.right - box.left, box.top - box.bottom)
+    areas = np.empty(len(sites), dtype=np.float64)
+    centroids = np.empty_like(sites)
+    displacements = np.empty(len(sites), dtype=np.float64)
+    step = 0
+    while step < iterations:
+        algorithm = ArrayFortuneAlgorithm([Vector2(x, y) for x, y in sites.tolist()])
+        algorithm.construct()
+        algorithm.bound(Box(box.left - margin, box.bottom - margin, box.right + margin, box.top + margin))
+        diagram = algorithm.get_diagram()
+        diagram.intersect(Box(box.left, box.bottom, box.right, box.top))
+        get_cell_geometry(diagram, areas, centroids)
+        step += 1
+
+        np.subtract(centroids, sites, out=centroids)
+        np.hypot(centroids[:, 0], centroids[:, 1], out=displacements)
+        sites += centroids
+        if displacements.max() <= tol:
+            break
+    return sites, step
@@ -0,0 +1,175 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from voronoi.Box import Box
+from voronoi.FortuneAlgorithm import FortuneAlgorithm
+from voronoi.Vector2 import Vector2
+from voronoi.VoronoiDiagram import VoronoiDiagram
+
+
+# Cells computed by one strip task: for every cell its global site index and its boundary as origin points and
+# twin site indices (-1 on the box); uncertified sites have to be recomputed with a wider halo.
+class StripResult:
+    def __init__(self, sites: np.ndarray, offsets: np.ndarray, origins: np.ndarray, twins: np.ndarray,
+                 uncertified: np.ndarray):
+        self.sites = sites
+        self.offsets = offsets
+        self.origins = origins
+        self.twins = twins
+        self.uncertified = uncertified
+
+
+def _construct_strip(task: Tuple) -> StripResult:
+    points, indices, owned, low, high, box = task
+    algorithm = FortuneAlgorithm([Vector2(x, y) for x, y in points.tolist()])
+    algorithm.construct()
+    left, bottom, right, top = box
+    margin = 0.1 * max(right - left, top - bottom)
+    algorithm.bound(Box(left - margin, bottom - margin, right + margin, top + margin))
+    diagram = algorithm.get_diagram()
+    diagram.intersect(Box(left, bottom, right, top))
+
+    sites, offsets, origins, twins, uncertified = list(), [0], list(), list(), list()
+    for local in np.flatnonzero(owned).tolist():
+        site = diagram.get_site(local)
+        half_edges = diagram._get_face_half_edges(site.face)
+        if half_edges is None:
+            if site.face.outer_component is not None or not (math.isinf(low) and math.isinf(high)):
+                uncertified.append(indices[local])
+            continue
+        # A vertex is final when its empty circle lies inside the band where no site is missing
+        certified = True
+        for half_edge in half_edges:
+            vertex = half_edge.origin.point
+            radius = math.hypot(vertex.x - site.point.x, vertex.y - site.point.y)
+            if vertex.x - radius < low or vertex.x + radius > high:
+                certified = False
+                break
+        if not certified:
+            uncertified.append(indices[local])
+            continue
+        sites.append(indices[local])
+        for half_edge in half_edges:
+            origins.append((half_edge.origin.point.x, half_edge.origin.point.y))
+            twins.append(indices[half_edge.twin.incident_face.site.index] if half_edge.twin is not None else -1)
+        offsets.append(len(twins))
+    return StripResult(np.array(sites, dtype=np.int64), np.array(offsets, dtype=np.int64),
+                       np.array(origins, dtype=np.float64).reshape(-1, 2), np.array(twins, dtype=np.int64),
+                       np.array(uncertified, dtype=np.int64))
+
+
+# Multi-core construction of the diagram clipped to a box, same cells as FortuneAlgorithm + bound() + intersect(box).
+#
+# Sites are split into vertical strips with the same number of sites. Every strip is swept in its own process
+# together with a halo of neighbouring sites; a cell is kept only if the empty circle of each of its vertices lies
+# inside the x band of sites the process saw, which proves that no missing site could change it. Cells that fail
+# are recomputed with a halo twice as wide. The cells are then stitched into one VoronoiDiagram: vertices are
+# shared by the sites they are equidistant to, half-edges are paired by their two sites.
+class ParallelFortuneAlgorithm:
+    def __init__(self, points: List[Vector2], box: Box, workers: Optional[int] = None,
+                 strips: Optional[int] = None):
+        self._points = points
+        self._coordinates = np.array([(p.x, p.y) for p in points], dtype=np.float64).reshape(-1, 2)
+        self._box = box
+        self._workers = workers or os.cpu_count() or 1
+        self._strips = strips or self._workers
+        self._diagram = VoronoiDiagram(points)
+
+    def get_diagram(self) -> VoronoiDiagram:
+        return self._diagram
+
+    def construct(self):
+        count = len(self._coordinates)
+        if count == 0:
+            return
+        box = (self._box.left, self._box.bottom, self._box.right, self._box.top)
+        xs = self._coordinates[:, 0]
+        order = np.argsort(xs, kind='stable')
+        sorted_xs = xs[order]
+        strips = max(1, min(self._strips, count))
+        bounds = [sorted_xs[0]] + [sorted_xs[count * i // strips] for i in range(1, strips)] + [sorted_xs[-1]]
+        extent = max(sorted_xs[-1] - sorted_xs[0], 1e-12)
+        spacing = math.sqrt(max(extent * (np.ptp(self._coordinates[:, 1]) or extent), 1e-24) / count)
+
+        # (strip, sites still to compute, margin)
+        pending = [(i, order[count * i // strips:count * (i + 1) // strips], 4.0 * spacing) for i in range(strips)]
+        results: List[StripResult] = list()
+        with ProcessPoolExecutor(self._workers) if self._workers > 1 else _InlineExecutor() as executor:
+            while pending:
+                tasks = [self._make_task(bounds, strip, owned, margin, box) for strip, owned, margin in pending]
+                next_pending = list()
+                for (strip, _, margin), result in zip(pending, executor.map(_construct_strip, tasks)):
+                    results.append(result)
+                    if len(result.uncertified):
+                        next_pending.append((strip, result.uncertified, 2.0 * margin))
+                pending = next_pending
+        self._stitch(results)
+
+    def _make_task(self, bounds: list, strip: int, owned: np.ndarray, margin: float, box: tuple) -> Tuple:
+        xs = self._coordinates[:, 0]
+        low = bounds[strip] - margin if strip > 0 else -math.inf
+        high = bounds[strip + 1] + margin if strip < len(bounds) - 2 else math.inf
+        if low <= bounds[0]:
+            low = -math.inf
+        if high >= bounds[-1]:
+            high = math.inf
+        indices = np.flatnonzero((xs >= low) & (xs <= high))
+        owned_mask = np.zeros(len(self._coordinates), dtype=bool)
+        owned_mask[owned] = True
+        return self._coordinates[indices], indices, owned_mask[indices], low, high, box
+
+    def _stitch(self, results: List[StripResult]):
+        diagram = self._diagram
+        box = self._box
+        vertices: Dict = dict()
+        paired: Dict[Tuple[int, int], object] = dict()
+        for result in results:
+            for cell, site_index in enumerate(result.sites.tolist()):
+                start, end = result.offsets[cell], result.offsets[cell + 1]
+                origins = result.origins[start:end].tolist()
+                twins = result.twins[start:end].tolist()
+                count = len(twins)
+                cycle_vertices = list()
+                for j in range(count):
+                    x, y = origins[j]
+                    previous_twin, twin = twins[j - 1], twins[j]
+                    if previous_twin >= 0 and twin >= 0:
+                        key = frozenset((site_index, previous_twin, twin))
+                    elif previous_twin >= 0 or twin >= 0:
+                        side = int(np.argmin((abs(x - box.left), abs(y - box.bottom),
+                                              abs(x - box.right), abs(y - box.top))))
+                        key = (frozenset((site_index, max(previous_twin, twin))), side)
+                    else:
+                        key = (site_index, j)
+                    if key not in vertices:
+                        vertices[key] = diagram._create_vertex(Vector2(x, y))
+                    cycle_vertices.append(vertices[key])
+
+                face = diagram.get_face(site_index)
+                half_edges = [diagram._create_half_edge(face) for _ in range(count)]
+                for j, half_edge in enumerate(half_edges):
+                    half_edge.origin = cycle_vertices[j]
+                    half_edge.destination = cycle_vertices[(j + 1) % count]
+                    half_edge.next = half_edges[(j + 1) % count]
+                    half_edge.next.prev = half_edge
+                    if twins[j] >= 0:
+                        paired[(site_index, twins[j])] = half_edge
+                        twin = paired.get((twins[j], site_index))
+                        if twin is not None:
+                            half_edge.twin = twin
+                            twin.twin = half_edge
+
+
+class _InlineExecutor:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def map(self, function, tasks):
+        return map(function, tasks)
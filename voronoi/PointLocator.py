@@ -0,0 +1,128 @@
+import math
+from typing import Optional, Union
+
+import numpy as np
+
+from voronoi.ArrayVoronoiDiagram import ArrayVoronoiDiagram, HalfEdgeArrays
+from voronoi.Box import Box
+from voronoi.Vector2 import Vector2
+from voronoi.VoronoiDiagram import VoronoiDiagram
+
+
+# Batch "which cell contains this point" queries on a built diagram.
+#
+# A uniform grid over the sites (about two sites per grid cell) stores for every grid cell the site nearest to
+# its centre. A query starts at the site of its grid cell and walks through the Voronoi neighbours (twin
+# half-edges), always moving to the neighbour closest to the query, until no neighbour is closer. Each step
+# leaves the current cell through the edge the segment site -> query crosses, so the walk ends in the cell
+# containing the query, usually after a constant number of steps. All queries of a chunk walk at once.
+#
+# For a diagram clipped with intersect(box) pass the same box: edges removed outside the box are not walked,
+# and queries outside the box get NIL. Sites whose cells were clipped away have no neighbours left, so the grid
+# is seeded only with sites that still have a cell: from those, the edge the segment from the cell to a query in
+# the box crosses lies in the box, so the walk still reaches the containing cell.
+class PointLocator:
+    NIL = -1
+    SITES_PER_GRID_CELL = 2.0
+
+    def __init__(self, diagram: Union[VoronoiDiagram, ArrayVoronoiDiagram], box: Optional[Box] = None):
+        if not isinstance(diagram, ArrayVoronoiDiagram):
+            diagram = ArrayVoronoiDiagram.from_diagram(diagram)
+        self._box = box
+        self._sites = np.ascontiguousarray(diagram.get_site_points(), dtype=np.float64)
+        half_edges = diagram.get_half_edges()
+        # Sites with a non-empty cell
+        self._seeds = np.unique(half_edges.incident_face[half_edges.alive]).astype(np.int64)
+        self._neighbors = self._build_neighbors(half_edges)
+        self._build_grid()
+
+    def get_neighbors(self) -> np.ndarray:
+        # (n, max_degree) site indices padded with NIL
+        return self._neighbors
+
+    def locate(self, points: np.ndarray, chunk_size: int = 1 << 18) -> np.ndarray:
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        result = np.full(len(points), self.NIL, dtype=np.int64)
+        if len(self._seeds) == 0:
+            return result
+        for start in range(0, len(points), chunk_size):
+            chunk = points[start:start + chunk_size]
+            result[start:start + len(chunk)] = self._walk(chunk, self._grid_sites[self._grid_index(chunk)])
+        if self._box is not None:
+            box = self._box
+            outside = (points[:, 0] < box.left - box.EPSILON) | (points[:, 0] > box.right + box.EPSILON) \
+                | (points[:, 1] < box.bottom - box.EPSILON) | (points[:, 1] > box.top + box.EPSILON)
+            result[outside] = self.NIL
+        return result
+
+    def locate_point(self, point: Vector2) -> int:
+        return int(self.locate(np.array([[point.x, point.y]]))[0])
+
+    def _build_neighbors(self, half_edges: HalfEdgeArrays) -> np.ndarray:
+        sites_count = len(self._sites)
+        paired = half_edges.alive & (half_edges.twin != ArrayVoronoiDiagram.NIL)
+        faces = half_edges.incident_face[paired].astype(np.int64)
+        twin_faces = half_edges.incident_face[half_edges.twin[paired]].astype(np.int64)
+        distinct = faces != twin_faces
+        pairs = np.unique(np.column_stack((faces[distinct], twin_faces[distinct])), axis=0)
+
+        degrees = np.bincount(pairs[:, 0], minlength=sites_count)
+        neighbors = np.full((sites_count, max(int(degrees.max(initial=0)), 1)), self.NIL, dtype=np.int64)
+        # pairs are sorted by their first site, so the column of a pair is its rank inside its row
+        offsets = np.concatenate(([0], np.cumsum(degrees)[:-1]))
+        columns = np.arange(len(pairs)) - offsets[pairs[:, 0]]
+        neighbors[pairs[:, 0], columns] = pairs[:, 1]
+        return neighbors
+
+    def _build_grid(self):
+        seeds_count = len(self._seeds)
+        if seeds_count == 0:
+            self._grid_sites = np.empty(0, dtype=np.int64)
+            return
+        seed_points = self._sites[self._seeds]
+        self._origin = seed_points.min(axis=0)
+        extent = np.maximum(seed_points.max(axis=0) - self._origin, 0.0)
+        area = max(extent[0], 1e-12) * max(extent[1], 1e-12)
+        cell_size = math.sqrt(area * self.SITES_PER_GRID_CELL / seeds_count)
+        cell_size = max(cell_size, extent.max() / seeds_count, 1e-12)
+        self._cell_size = cell_size
+        self._shape = (int(extent[1] // cell_size) + 1, int(extent[0] // cell_size) + 1)
+
+        # Seed every grid cell with a site falling into it, then spread seeds into empty cells
+        grid = np.full(self._shape, self.NIL, dtype=np.int64)
+        grid.reshape(-1)[self._grid_index(seed_points)] = self._seeds
+        while (grid == self.NIL).any():
+            for shifted, target in ((grid[1:], grid[:-1]), (grid[:-1], grid[1:]),
+                                    (grid[:, 1:], grid[:, :-1]), (grid[:, :-1], grid[:, 1:])):
+                empty = target == self.NIL
+                target[empty] = shifted[empty]
+        self._grid_sites = grid.reshape(-1)
+
+        # Replace the seeds by the sites nearest to the grid cell centres
+        rows, columns = np.divmod(np.arange(self._grid_sites.size), self._shape[1])
+        centres = self._origin + (np.column_stack((columns, rows)) + 0.5) * cell_size
+        self._grid_sites = self._walk(centres, self._grid_sites.copy())
+
+    def _grid_index(self, points: np.ndarray) -> np.ndarray:
+        cells = np.floor((points - self._origin) / self._cell_size)
+        columns = np.clip(cells[:, 0], 0, self._shape[1] - 1).astype(np.int64)
+        rows = np.clip(cells[:, 1], 0, self._shape[0] - 1).astype(np.int64)
+        return rows * self._shape[1] + columns
+
+    def _walk(self, points: np.ndarray, current: np.ndarray) -> np.ndarray:
+        sites = self._sites
+        px, py = points[:, 0], points[:, 1]
+        best = (sites[current, 0] - px) ** 2 + (sites[current, 1] - py) ** 2
+        active = np.arange(len(points))
+        while active.size:
+            candidates = self._neighbors[current[active]]
+            missing = candidates == self.NIL
+            distances = (sites[candidates, 0] - px[active, None]) ** 2 + (sites[candidates, 1] - py[active, None]) ** 2
+            distances[missing] = np.inf
+            closest = np.argmin(distances, axis=1)
+            closest_distances = distances[np.arange(len(active)), closest]
+            improved = closest_distances < best[active]
+            active, closest = active[improved], closest[improved]
+            current[active] = candidates[improved, closest]
+            best[active] = closest_distances[improved]
+        return current
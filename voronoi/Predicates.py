@@ -0,0 +1,76 @@
+from fractions import Fraction
+from typing import Optional, Tuple
+
+# Filtered predicates: the determinant is evaluated in floats together with a bound on its rounding error
+# (Shewchuk's first stage bounds for orient2d and incircle). Only when the bound does not certify the sign, the
+# determinant is evaluated again with exact rational arithmetic, which every float converts to.
+EPSILON = 2.0 ** -53
+ORIENTATION_BOUND = (3.0 + 16.0 * EPSILON) * EPSILON
+IN_CIRCLE_BOUND = (10.0 + 96.0 * EPSILON) * EPSILON
+
+
+def _sign(value) -> int:
+    return (value > 0) - (value < 0)
+
+
+# 1 if a, b, c turn counter-clockwise, -1 if clockwise, 0 if they are collinear
+def orientation(ax: float, ay: float, bx: float, by: float, cx: float, cy: float) -> int:
+    left = (ax - cx) * (by - cy)
+    right = (ay - cy) * (bx - cx)
+    det = left - right
+    bound = ORIENTATION_BOUND * (abs(left) + abs(right))
+    if det > bound:
+        return 1
+    if -det > bound:
+        return -1
+    return exact_orientation(ax, ay, bx, by, cx, cy)
+
+
+def exact_orientation(ax: float, ay: float, bx: float, by: float, cx: float, cy: float) -> int:
+    ax, ay, bx, by, cx, cy = map(Fraction, (ax, ay, bx, by, cx, cy))
+    return _sign((ax - cx) * (by - cy) - (ay - cy) * (bx - cx))
+
+
+# For a, b, c counter-clockwise: 1 if d is inside their circle, -1 if outside, 0 if the four are co-circular.
+# The sign is flipped for a, b, c clockwise.
+def in_circle(ax: float, ay: float, bx: float, by: float, cx: float, cy: float, dx: float, dy: float) -> int:
+    adx, ady = ax - dx, ay - dy
+    bdx, bdy = bx - dx, by - dy
+    cdx, cdy = cx - dx, cy - dy
+    bdxcdy, cdxbdy = bdx * cdy, cdx * bdy
+    cdxady, adxcdy = cdx * ady, adx * cdy
+    adxbdy, bdxady = adx * bdy, bdx * ady
+    alift = adx * adx + ady * ady
+    blift = bdx * bdx + bdy * bdy
+    clift = cdx * cdx + cdy * cdy
+    det = alift * (bdxcdy - cdxbdy) + blift * (cdxady - adxcdy) + clift * (adxbdy - bdxady)
+    permanent = (abs(bdxcdy) + abs(cdxbdy)) * alift + (abs(cdxady) + abs(adxcdy)) * blift \
+        + (abs(adxbdy) + abs(bdxady)) * clift
+    bound = IN_CIRCLE_BOUND * permanent
+    if det > bound:
+        return 1
+    if -det > bound:
+        return -1
+    return exact_in_circle(ax, ay, bx, by, cx, cy, dx, dy)
+
+
+def exact_in_circle(ax: float, ay: float, bx: float, by: float, cx: float, cy: float, dx: float, dy: float) -> int:
+    ax, ay, bx, by, cx, cy, dx, dy = map(Fraction, (ax, ay, bx, by, cx, cy, dx, dy))
+    adx, ady = ax - dx, ay - dy
+    bdx, bdy = bx - dx, by - dy
+    cdx, cdy = cx - dx, cy - dy
+    return _sign((adx * adx + ady * ady) * (bdx * cdy - cdx * bdy)
+                 + (bdx * bdx + bdy * bdy) * (cdx * ady - adx * cdy)
+                 + (cdx * cdx + cdy * cdy) * (adx * bdy - bdx * ady))
+
+
+# Center of the circle through a, b, c computed exactly and rounded once, None if they are collinear
+def exact_circumcenter(ax: float, ay: float, bx: float, by: float, cx: float, cy: float) \
+        -> Optional[Tuple[float, float]]:
+    ax, ay, bx, by, cx, cy = map(Fraction, (ax, ay, bx, by, cx, cy))
+    bx, by, cx, cy = bx - ax, by - ay, cx - ax, cy - ay
+    det = 2 * (bx * cy - by * cx)
+    if det == 0:
+        return None
+    b_lift, c_lift = bx * bx + by * by, cx * cx + cy * cy
+    return float(ax + (cy * b_lift - by * c_lift) / det), float(ay + (bx * c_lift - cx * b_lift) / det)
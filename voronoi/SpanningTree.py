@@ -0,0 +1,32 @@
+from typing import List, Optional
+
+import numpy as np
+
+from voronoi.DisjointSetUnion import DisjointSetUnion
+from voronoi.FortuneAlgorithm import FortuneAlgorithm
+from voronoi.Vector2 import Vector2
+
+
+# Euclidean minimum spanning tree: Kruskal over the O(n) Delaunay edges instead of all O(n^2) pairs.
+# Returns (n - 1, 2) site index pairs in order of increasing length (fewer for an empty input).
+def emst(points: List[Vector2], delaunay_edges: Optional[np.ndarray] = None) -> np.ndarray:
+    if len(points) < 2:
+        return np.empty((0, 2), dtype=np.int64)
+    if delaunay_edges is None:
+        algorithm = FortuneAlgorithm(points)
+        algorithm.construct()
+        delaunay_edges = algorithm.get_delaunay_edges()
+
+    coordinates = np.array([(p.x, p.y) for p in points], dtype=np.float64)
+    lengths = np.hypot(*(coordinates[delaunay_edges[:, 0]] - coordinates[delaunay_edges[:, 1]]).T)
+
+    dsu = DisjointSetUnion(len(points))
+    tree = list()
+    for start, end in delaunay_edges[np.argsort(lengths, kind='stable')].tolist():
+        if dsu.get(start) == dsu.get(end):
+            continue
+        dsu.union(start, end)
+        tree.append((start, end))
+        if len(tree) == len(points) - 1:
+            break
+    return np.array(tree, dtype=np.int64).reshape(-1, 2)
@@ -0,0 +1,263 @@
+import heapq
+import math
+import os
+import tempfile
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Union
+
+import numpy as np
+
+from voronoi.Box import Box
+from voronoi.EventScheduler import EventScheduler
+from voronoi.FortuneAlgorithm import FortuneAlgorithm
+from voronoi.Vector2 import Vector2
+from voronoi.VoronoiDiagram import VoronoiDiagram, Face, Event, EventType, Site, Arc, Vertex
+
+
+# A finished cell: site index (position in the sorted input), boundary polygon (k, 2) and, for every edge
+# polygon[j] -> polygon[j + 1], the site on the other side or -1 on the box.
+class Cell(NamedTuple):
+    site: int
+    polygon: np.ndarray
+    neighbors: np.ndarray
+
+
+# Site events read block by block from an (n, 2) array sorted by decreasing y then increasing x, e.g. an
+# np.memmap. A site out of that order raises ValueError when its block is read.
+class StreamEventScheduler(EventScheduler):
+    BLOCK_SIZE = 1 << 16
+
+    def __init__(self, points: np.ndarray, create_site: Callable[[int, float, float], Site]):
+        super().__init__([])
+        self._points = points
+        self._create_site = create_site
+        self._block: List[List[float]] = list()
+        self._block_start = 0
+        self._last = [-math.inf, math.inf]
+
+    def is_empty(self) -> bool:
+        self._discard_invalid()
+        return self._peek() is None and not self._circle_events
+
+    def pop(self) -> Event:
+        self._discard_invalid()
+        point = self._peek()
+        if point is not None and (not self._circle_events or point[1] >= -self._circle_events[0][0]):
+            index = self._block_start + self._cursor
+            self._cursor += 1
+            return Event(self._create_site(index, point[0], point[1]))
+        event = heapq.heappop(self._circle_events)[2]
+        event.index = self.INVALID
+        return event
+
+    def _peek(self) -> Optional[List[float]]:
+        if self._cursor == len(self._block):
+            start = self._block_start + len(self._block)
+            block = np.asarray(self._points[start:start + self.BLOCK_SIZE], dtype=np.float64)
+            if len(block):
+                dx = np.diff(np.concatenate(([self._last[0]], block[:, 0])))
+                dy = np.diff(np.concatenate(([self._last[1]], block[:, 1])))
+                unsorted = np.flatnonzero((dy > 0) | ((dy == 0) & (dx < 0)))
+                if len(unsorted):
+                    raise ValueError(f'site {start + int(unsorted[0])} is out of order: sites must be sorted by '
+                                     f'decreasing y, then increasing x')
+            if len(block):
+                self._last = block[-1].tolist()
+            self._block, self._block_start, self._cursor = block.tolist(), start, 0
+            if not self._block:
+                return None
+        return self._block[self._cursor]
+
+
+# Only the faces of the open cells are kept, by site index
+class StreamingVoronoiDiagram(VoronoiDiagram):
+    def __init__(self):
+        super().__init__([])
+        self._open_faces: Dict[int, Face] = dict()
+
+    def get_face(self, i: int) -> Face:
+        return self._open_faces[i]
+
+
+# Fortune's algorithm for inputs that do not fit in memory.
+#
+# Sites are read from an (n, 2) float64 array sorted by decreasing y then increasing x (a memory-mapped file, see
+# sort_sites_file). A cell is finished as soon as the last arc of its site leaves the beachline: every vertex of
+# the cell is then known. It is emitted right away, clipped to box, and its half-edges, vertices and site are
+# dropped, so memory follows the beachline instead of the number of sites. The cells still open when the sweep
+# ends are bounded with bound() and emitted last. The cells are the same as after construct(), bound() and
+# intersect(box) on the whole input.
+class StreamingFortuneAlgorithm(FortuneAlgorithm):
+    _diagram: StreamingVoronoiDiagram
+
+    def __init__(self, sites: Union[str, np.ndarray], box: Box, callback: Optional[Callable[[Cell], None]] = None):
+        super().__init__([])
+        if isinstance(sites, (str, os.PathLike)):
+            sites = np.memmap(sites, dtype=np.float64, mode='r')
+        self._points = sites.reshape(-1, 2)
+        self._box = box
+        self._callback = callback
+        self._arcs_count: Dict[int, int] = dict()
+        self._finished: List[Site] = list()
+        self._vertex_bounds = [math.inf, math.inf, -math.inf, -math.inf]
+
+    # Runs the whole sweep, passing the cells to the callback. Raises ValueError if the sites are not sorted, after
+    # the cells finished before the first site out of order.
+    def construct(self):
+        for cell in self.cells():
+            if self._callback is not None:
+                self._callback(cell)
+
+    def cells(self) -> Iterator[Cell]:
+        self._events = StreamEventScheduler(self._points, self._create_site)
+        while not self._events.is_empty():
+            event = self._events.pop()
+            self._beachline_y = event.y
+            if event.type == EventType.SITE:
+                self._handle_site_event(event)
+            else:
+                self._handle_circle_event(event)
+            while self._finished:
+                cell = self._finish_cell(self._finished.pop())
+                if cell is not None:
+                    yield cell
+            # The dual is not kept in streaming mode
+            self._delaunay_edges.clear()
+            self._delaunay_triangles.clear()
+
+        margin = 0.1 * max(self._box.right - self._box.left, self._box.top - self._box.bottom)
+        self.bound(Box(self._box.left - margin, self._box.bottom - margin,
+                       self._box.right + margin, self._box.top + margin))
+        for index in list(self._diagram._open_faces):
+            cell = self._finish_cell(self._diagram._open_faces[index].site)
+            if cell is not None:
+                yield cell
+
+    def _create_diagram(self, points: list) -> StreamingVoronoiDiagram:
+        return StreamingVoronoiDiagram()
+
+    def _create_site(self, index: int, x: float, y: float) -> Site:
+        site = Site(index, Vector2(x, y))
+        site.face = Face(site)
+        self._diagram._open_faces[index] = site.face
+        self._arcs_count[index] = 1
+        return site
+
+    def _break_arc(self, arc: Arc, site: Site):
+        self._arcs_count[arc.site.index] += 1
+        middle_arc = super()._break_arc(arc, site)
+        self._release_arc(arc)
+        return middle_arc
+
+    def _add_arc_on_sweep_line(self, arc: Arc, site: Site):
+        super()._add_arc_on_sweep_line(arc, site)
+        # The edge between them stays open to the top until bound(), neither cell can be finished before
+        self._arcs_count[arc.site.index] += 1
+        self._arcs_count[site.index] += 1
+
+    def _remove_arc(self, arc: Arc, vertex: Vertex):
+        super()._remove_arc(arc, vertex)
+        self._release_arc(arc)
+        bounds = self._vertex_bounds
+        bounds[0] = min(bounds[0], vertex.point.x)
+        bounds[1] = min(bounds[1], vertex.point.y)
+        bounds[2] = max(bounds[2], vertex.point.x)
+        bounds[3] = max(bounds[3], vertex.point.y)
+        self._arcs_count[arc.site.index] -= 1
+        if self._arcs_count[arc.site.index] == 0:
+            self._finished.append(arc.site)
+
+    # Arcs out of the beachline keep their old links, which would keep every arc and half-edge of the sweep alive
+    def _release_arc(self, arc: Arc):
+        nil = self._beachline._nil
+        arc.parent = arc.left = arc.right = arc.prev = arc.next = nil
+        arc.left_half_edge = arc.right_half_edge = arc.event = None
+
+    def _expand_box(self, box: Box):
+        # Vertices of finished cells are gone, their extent is tracked in _remove_arc
+        left, bottom, right, top = self._vertex_bounds
+        box.left = min(left, box.left)
+        box.bottom = min(bottom, box.bottom)
+        box.right = max(right, box.right)
+        box.top = max(top, box.top)
+
+    def _finish_cell(self, site: Site) -> Optional[Cell]:
+        diagram = self._diagram
+        del diagram._open_faces[site.index]
+        del self._arcs_count[site.index]
+        face = site.face
+        polygon, neighbors = list(), list()
+        half_edge = face.outer_component
+        while half_edge is not None:
+            polygon.append((half_edge.origin.point.x, half_edge.origin.point.y))
+            neighbors.append(half_edge.twin.incident_face.site.index if half_edge.twin is not None else -1)
+            next_half_edge = half_edge.next
+            # Drop the half-edge; an open twin keeps it only to know the site of this face
+            diagram._remove_half_edge(half_edge)
+            if half_edge.origin.list_node is not None:
+                diagram._remove_vertex(half_edge.origin)
+                half_edge.origin.list_node = None
+            half_edge.origin = half_edge.destination = half_edge.prev = half_edge.next = half_edge.twin = None
+            half_edge = next_half_edge if next_half_edge is not face.outer_component else None
+        face.outer_component = None
+
+        polygon, neighbors = self._clip_to_box(polygon, neighbors)
+        if len(polygon) < 3:
+            return None
+        return Cell(site.index, np.array(polygon, dtype=np.float64), np.array(neighbors, dtype=np.int64))
+
+    # Sutherland-Hodgman against the four sides of the box, edges created on the box get neighbor -1
+    def _clip_to_box(self, polygon: list, neighbors: list):
+        box = self._box
+        for axis, bound, sign in ((0, box.left, 1.0), (1, box.bottom, 1.0), (0, box.right, -1.0),
+                                  (1, box.top, -1.0)):
+            if not polygon:
+                break
+            clipped_polygon, clipped_neighbors = list(), list()
+            count = len(polygon)
+            for j in range(count):
+                start, end = polygon[j], polygon[(j + 1) % count]
+                start_value = sign * (start[axis] - bound)
+                end_value = sign * (end[axis] - bound)
+                if start_value >= 0.0:
+                    clipped_polygon.append(start)
+                    clipped_neighbors.append(neighbors[j])
+                if (start_value >= 0.0) != (end_value >= 0.0):
+                    t = start_value / (start_value - end_value)
+                    point = [start[0] + t * (end[0] - start[0]), start[1] + t * (end[1] - start[1])]
+                    point[axis] = bound
+                    clipped_polygon.append(tuple(point))
+                    clipped_neighbors.append(neighbors[j] if start_value < 0.0 else -1)
+            polygon, neighbors = clipped_polygon, clipped_neighbors
+        return polygon, neighbors
+
+
+# External sort of a raw float64 (x, y) file by decreasing y, then increasing x: sorted runs of chunk_size sites,
+# then a k-way merge.
+def sort_sites_file(source: str, destination: str, chunk_size: int = 1 << 22):
+    points = np.memmap(source, dtype=np.float64, mode='r').reshape(-1, 2)
+    directory = os.path.dirname(os.path.abspath(destination))
+    runs = list()
+    try:
+        for start in range(0, len(points), chunk_size):
+            chunk = np.asarray(points[start:start + chunk_size])
+            handle, path = tempfile.mkstemp(suffix='.run', dir=directory)
+            os.close(handle)
+            chunk[np.lexsort((chunk[:, 0], -chunk[:, 1]))].tofile(path)
+            runs.append(path)
+
+        def read_run(path):
+            run = np.memmap(path, dtype=np.float64, mode='r').reshape(-1, 2)
+            for block_start in range(0, len(run), StreamEventScheduler.BLOCK_SIZE):
+                yield from np.asarray(run[block_start:block_start + StreamEventScheduler.BLOCK_SIZE]).tolist()
+
+        with open(destination, 'wb') as output:
+            buffer = list()
+            for point in heapq.merge(*(read_run(path) for path in runs), key=lambda point: (-point[1], point[0])):
+                buffer.append(point)
+                if len(buffer) == StreamEventScheduler.BLOCK_SIZE:
+                    np.array(buffer, dtype=np.float64).tofile(output)
+                    buffer.clear()
+            np.array(buffer, dtype=np.float64).reshape(-1, 2).tofile(output)
+    finally:
+        for path in runs:
+            os.remove(path)
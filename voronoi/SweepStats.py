@@ -0,0 +1,53 @@
+from typing import Callable, Dict, Optional
+
+from voronoi.VoronoiDiagram import Event
+
+
+# Counters of an instrumented FortuneAlgorithm sweep, see FortuneAlgorithm(points, stats=SweepStats()).
+# callback(event, stats) is called after every processed event.
+class SweepStats:
+    # The beachline height is measured again when the beachline has grown by this factor since the last measure
+    HEIGHT_MEASURE_GROWTH = 1.1
+
+    def __init__(self, callback: Optional[Callable[[Event, 'SweepStats'], None]] = None):
+        self.callback = callback
+        self.site_events = 0
+        self.circle_events = 0
+        # Circle events removed from the queue by _delete_event before they were reached (false alarms)
+        self.invalidated_circle_events = 0
+        self.beachline_size = 0
+        self.max_beachline_size = 0
+        self.max_beachline_height = 0
+        self.locate_calls = 0
+        self.locate_iterations = 0
+        # Seconds per phase: construct, bound, intersect
+        self.timers: Dict[str, float] = dict()
+
+    def get_events(self) -> int:
+        return self.site_events + self.circle_events
+
+    def get_false_alarm_ratio(self) -> float:
+        queued = self.circle_events + self.invalidated_circle_events
+        return self.invalidated_circle_events / queued if queued else 0.0
+
+    def get_mean_locate_iterations(self) -> float:
+        return self.locate_iterations / self.locate_calls if self.locate_calls else 0.0
+
+    def add_time(self, phase: str, seconds: float):
+        self.timers[phase] = self.timers.get(phase, 0.0) + seconds
+
+    def as_dict(self) -> dict:
+        return {
+            'site_events': self.site_events,
+            'circle_events': self.circle_events,
+            'invalidated_circle_events': self.invalidated_circle_events,
+            'false_alarm_ratio': self.get_false_alarm_ratio(),
+            'max_beachline_size': self.max_beachline_size,
+            'max_beachline_height': self.max_beachline_height,
+            'locate_calls': self.locate_calls,
+            'locate_iterations': self.locate_iterations,
+            'timers': dict(self.timers)
+        }
+
+    def __repr__(self):
+        return f"SweepStats({', '.join(f'{key}={value}' for key, value in self.as_dict().items())})"
@@ -2,6 +2,8 @@ import math
 
 
 class Vector2:
+    __slots__ = ('x', 'y')
+
     def __init__(self, x=0.0, y=0.0):
         self.x = x
         self.y = y
@@ -34,7 +36,9 @@ class Vector2:
         return math.sqrt(self.x ** 2 + self.y ** 2)
 
     def distance_to(self, other):
-        return (self - other).norm()
+        dx = self.x - other.x
+        dy = self.y - other.y
+        return math.sqrt(dx ** 2 + dy ** 2)
 
     def det(self, other):
         return self.x * other.y - self.y * other.x
@@ -53,7 +57,7 @@ class Vector2:
         return Vector2(self.x * t, self.y * t)
 
     def __rmul__(self, t):
-        return self * t
+        return Vector2(self.x * t, self.y * t)
 
     def __repr__(self):
         return f"({self.x}, {self.y})"
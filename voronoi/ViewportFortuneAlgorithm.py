@@ -0,0 +1,169 @@
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from voronoi.Box import Box
+from voronoi.FortuneAlgorithm import FortuneAlgorithm
+from voronoi.Vector2 import Vector2
+from voronoi.VoronoiDiagram import VoronoiDiagram
+
+
+# Uniform grid of buckets over the sites, about two sites per bucket. Buckets are numbered row by row and the
+# sites are stored sorted by bucket, so the sites of a rectangle are one contiguous slice per row of buckets.
+class SiteGrid:
+    SITES_PER_BUCKET = 2.0
+
+    def __init__(self, points: np.ndarray):
+        self._points = points
+        count = len(points)
+        if count == 0:
+            self._origin = np.zeros(2)
+            self._bounds = (0.0, 0.0, 0.0, 0.0)
+        else:
+            self._origin = points.min(axis=0)
+            top_right = points.max(axis=0)
+            self._bounds = (float(self._origin[0]), float(self._origin[1]),
+                            float(top_right[0]), float(top_right[1]))
+        extent = np.maximum(np.array(self._bounds[2:]) - self._origin, 1e-12)
+        self._spacing = math.sqrt(extent[0] * extent[1] / max(count, 1))
+        bucket_size = self._spacing * math.sqrt(self.SITES_PER_BUCKET)
+        self._shape = np.maximum(np.ceil(extent / bucket_size).astype(np.int64), 1)
+        self._bucket_size = extent / self._shape
+
+        buckets = self._get_buckets(points)
+        self._order = np.argsort(buckets, kind='stable')
+        self._starts = np.searchsorted(buckets[self._order], np.arange(self._shape[0] * self._shape[1] + 1))
+
+    # (left, bottom, right, top) of the sites
+    def get_bounds(self) -> Tuple[float, float, float, float]:
+        return self._bounds
+
+    # Mean distance between neighbouring sites
+    def get_spacing(self) -> float:
+        return self._spacing
+
+    # Indices of the sites inside the closed rectangle, in increasing order
+    def query(self, left: float, bottom: float, right: float, top: float) -> np.ndarray:
+        if len(self._points) == 0 or left > right or bottom > top:
+            return np.empty(0, dtype=np.int64)
+        low = self._get_cell(left, bottom)
+        high = self._get_cell(right, top)
+        width = self._shape[0]
+        slices = [self._order[self._starts[row * width + low[0]]:self._starts[row * width + high[0] + 1]]
+                  for row in range(low[1], high[1] + 1)]
+        candidates = np.concatenate(slices)
+        points = self._points[candidates]
+        inside = (points[:, 0] >= left) & (points[:, 0] <= right) & (points[:, 1] >= bottom) & (points[:, 1] <= top)
+        return np.sort(candidates[inside])
+
+    def _get_cell(self, x: float, y: float) -> Tuple[int, int]:
+        left, bottom, right, top = self._bounds
+        column = int((min(max(x, left), right) - left) // self._bucket_size[0])
+        row = int((min(max(y, bottom), top) - bottom) // self._bucket_size[1])
+        return min(column, int(self._shape[0]) - 1), min(row, int(self._shape[1]) - 1)
+
+    def _get_buckets(self, points: np.ndarray) -> np.ndarray:
+        cells = np.floor((points - self._origin) / self._bucket_size).astype(np.int64)
+        cells = np.clip(cells, 0, self._shape - 1)
+        return cells[:, 1] * self._shape[0] + cells[:, 0]
+
+
+# The diagram of the sites whose cells reach a query box, clipped to it: the same cells as FortuneAlgorithm on all
+# the sites followed by bound() and intersect(box), for a cost that follows the number of cells in the box.
+#
+# Only the sites of a window around the box are swept. A clipped cell is final when the empty circle of each of
+# its vertices lies inside the window: a missing site would have to be closer to one of the vertices than the
+# site of the cell. As the final cells cover the box, no missing site has a cell in it either. When some cell is
+# not final, the window grows to hold all of its circles and the window is swept again.
+#
+# The sites of the diagram are the swept ones, get_site_indices() gives their indices in points. Cells of swept
+# sites outside the box are empty, like in the full diagram. The index over the sites is built once, so one
+# instance serves many boxes.
+class ViewportFortuneAlgorithm:
+    # First window: the box grown by this many mean distances between sites
+    INITIAL_MARGIN = 2.0
+
+    def __init__(self, points: List[Vector2]):
+        self._points = points
+        self._coordinates = np.array([(p.x, p.y) for p in points], dtype=np.float64).reshape(-1, 2)
+        self._grid = SiteGrid(self._coordinates)
+        self._diagram: Optional[VoronoiDiagram] = None
+        self._site_indices = np.empty(0, dtype=np.int64)
+
+    def get_diagram(self) -> Optional[VoronoiDiagram]:
+        return self._diagram
+
+    def get_site_indices(self) -> np.ndarray:
+        return self._site_indices
+
+    # Returns the result of intersect(box), False if no diagram could be built
+    def construct(self, box: Box) -> bool:
+        bounds = self._grid.get_bounds()
+        margin = self.INITIAL_MARGIN * self._grid.get_spacing()
+        window = [box.left - margin, box.bottom - margin, box.right + margin, box.top + margin]
+        while True:
+            complete = window[0] <= bounds[0] and window[1] <= bounds[1] and window[2] >= bounds[2] \
+                and window[3] >= bounds[3]
+            indices = self._grid.query(*window)
+            # Less than two sites leave the box inside a single unbounded cell
+            if len(indices) < 2 and not complete:
+                margin *= 2.0
+                window = [box.left - margin, box.bottom - margin, box.right + margin, box.top + margin]
+                continue
+
+            algorithm = FortuneAlgorithm([self._points[i] for i in indices.tolist()])
+            algorithm.construct()
+            # The window may be infinite, the sites are not
+            left, bottom = min(max(window[0], bounds[0]), box.left), min(max(window[1], bounds[1]), box.bottom)
+            right, top = max(min(window[2], bounds[2]), box.right), max(min(window[3], bounds[3]), box.top)
+            padding = 0.1 * max(right - left, top - bottom, self._grid.get_spacing())
+            algorithm.bound(Box(left - padding, bottom - padding, right + padding, top + padding))
+            diagram = algorithm.get_diagram()
+            result = diagram.intersect(Box(box.left, box.bottom, box.right, box.top))
+            if complete:
+                break
+            needed = self._get_needed_window(diagram, box, self._coordinates[indices])
+            if needed[0] >= window[0] and needed[1] >= window[1] and needed[2] <= window[2] \
+                    and needed[3] <= window[3]:
+                break
+            window = [min(window[0], needed[0]), min(window[1], needed[1]),
+                      max(window[2], needed[2]), max(window[3], needed[3])]
+
+        self._diagram = diagram
+        self._site_indices = indices
+        return result and len(indices) > 0
+
+    # Bounding box of the empty circles of all vertices of the clipped cells
+    @staticmethod
+    def _get_needed_window(diagram: VoronoiDiagram, box: Box, sites: np.ndarray) -> List[float]:
+        everything = [-math.inf, -math.inf, math.inf, math.inf]
+        needed = [math.inf, math.inf, -math.inf, -math.inf]
+        for site in diagram.get_sites():
+            if site.face.outer_component is None:
+                continue
+            half_edges = diagram._get_face_half_edges(site.face)
+            if half_edges is None:
+                # A broken cell cannot be certified, only the whole input can
+                return everything
+            for half_edge in half_edges:
+                vertex = half_edge.origin.point
+                radius = math.hypot(vertex.x - site.point.x, vertex.y - site.point.y)
+                needed[0] = min(needed[0], vertex.x - radius)
+                needed[1] = min(needed[1], vertex.y - radius)
+                needed[2] = max(needed[2], vertex.x + radius)
+                needed[3] = max(needed[3], vertex.y + radius)
+        if needed[0] <= needed[2]:
+            return needed
+
+        # No edge crosses the box, it lies inside one cell (intersect() leaves it empty): the corners have the same
+        # nearest site, and their empty circles certify it like the vertices of a cell
+        corners = np.array([(box.left, box.bottom), (box.right, box.bottom), (box.right, box.top),
+                            (box.left, box.top)])
+        distances = np.hypot(corners[:, 0, None] - sites[None, :, 0], corners[:, 1, None] - sites[None, :, 1])
+        nearest = distances.argmin(axis=1)
+        if np.any(nearest != nearest[0]):
+            return everything
+        radii = distances[np.arange(4), nearest]
+        return [float(np.min(corners[:, 0] - radii)), float(np.min(corners[:, 1] - radii)),
+                float(np.max(corners[:, 0] + radii)), float(np.max(corners[:, 1] + radii))]
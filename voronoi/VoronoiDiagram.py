@@ -1,12 +1,16 @@
 from typing import Optional, List
 
+import numpy as np
 from llist import dllist
-from Box import Box
-from Vector2 import Vector2
-from voronoi.Box import Intersection
+
+from voronoi.Box import Box
+from voronoi.CellArrays import CellArrays, build_cell_arrays
+from voronoi.Vector2 import Vector2
 
 
 class Site:
+    __slots__ = ('index', 'point', 'face')
+
     def __init__(self, index: int, point: Vector2, face: Optional['Face'] = None):
         self.index = index
         self.point = point
@@ -14,12 +18,16 @@ class Site:
 
 
 class Vertex:
+    __slots__ = ('point', 'list_node')
+
     def __init__(self, point: Vector2):
         self.point = point
         self.list_node = None
 
 
 class HalfEdge:
+    __slots__ = ('origin', 'destination', 'twin', 'incident_face', 'prev', 'next', 'list_node')
+
     def __init__(self):
         self.origin: Optional[Vertex] = None
         self.destination: Optional[Vertex] = None
@@ -42,6 +50,11 @@ class VoronoiDiagram:
         self._faces = list()
         self._vertices = dllist()
         self._half_edges = dllist()
+        # Cache of get_cell_arrays(), dropped by every change of the diagram
+        self._cell_arrays: Optional[CellArrays] = None
+        # Sites taken out by remove_site(), and the coordinates of all sites for the searches around a cell
+        self._removed_sites = set()
+        self._site_points = np.empty((0, 2), dtype=np.float64)
         for i in range(0, len(points)):
             self._sites.append(Site(
                 i, points[i], None
@@ -71,32 +84,81 @@ class VoronoiDiagram:
     def get_half_edges(self) -> 'dllist':
         return self._half_edges
 
+    def get_cell_arrays(self) -> CellArrays:
+        if self._cell_arrays is None:
+            half_edges = list(self._half_edges)
+            positions = {id(half_edge): i for i, half_edge in enumerate(half_edges)}
+            nan = float('nan')
+            faces, twin_faces, origins, next_ = list(), list(), list(), list()
+            for half_edge in half_edges:
+                faces.append(half_edge.incident_face.site.index)
+                twin_faces.append(half_edge.twin.incident_face.site.index if half_edge.twin is not None else -1)
+                origin = half_edge.origin
+                origins.append((origin.point.x, origin.point.y) if origin is not None else (nan, nan))
+                next_.append(positions.get(id(half_edge.next), -1))
+            outer_components = [positions.get(id(face.outer_component), -1) for face in self._faces]
+            self._cell_arrays = build_cell_arrays(
+                np.array([(site.point.x, site.point.y) for site in self._sites], dtype=np.float64).reshape(-1, 2),
+                np.array(faces, dtype=np.int64), np.array(twin_faces, dtype=np.int64),
+                np.array(origins, dtype=np.float64).reshape(-1, 2), np.array(next_, dtype=np.int64),
+                np.array(outer_components, dtype=np.int64))
+        return self._cell_arrays
+
+    def save(self, path: str):
+        # Flat binary layout of ArrayVoronoiDiagram, open it with ArrayVoronoiDiagram.load(path)
+        from voronoi.ArrayVoronoiDiagram import ArrayVoronoiDiagram
+        ArrayVoronoiDiagram.from_diagram(self).save(path)
+
     def intersect(self, box: Box) -> bool:
+        self._cell_arrays = None
         error = False
         processed_half_edges = set()
         vertices_to_remove = set()
 
+        # Inside flags and box intersections of all half-edges are computed at once with NumPy; the cycles of
+        # the faces lying inside the box are left as they are, only the other faces are relinked below
+        half_edges = list(self._half_edges)
+        segments = np.array([(half_edge.origin.point.x, half_edge.origin.point.y,
+                              half_edge.destination.point.x, half_edge.destination.point.y)
+                             for half_edge in half_edges], dtype=np.float64).reshape(-1, 4)
+        faces = np.fromiter((half_edge.incident_face.site.index for half_edge in half_edges), dtype=np.int64,
+                            count=len(half_edges))
+        origins_inside = box.contains_points(segments[:, :2])
+        destinations_inside = box.contains_points(segments[:, 2:])
+        crossing_faces = np.zeros(len(self._sites), dtype=bool)
+        crossing_faces[faces[~(origins_inside & destinations_inside)]] = True
+        selected = np.flatnonzero(crossing_faces[faces])
+        counts, sides, points = box.get_segments_intersections(segments[selected, :2], segments[selected, 2:])
+        positions = {id(half_edges[i]): position for position, i in enumerate(selected.tolist())}
+        origins_inside = origins_inside[selected].tolist()
+        destinations_inside = destinations_inside[selected].tolist()
+        crossing = np.flatnonzero(counts).tolist()
+        sides = dict(zip(crossing, sides[crossing].tolist()))
+        points = dict(zip(crossing, points[crossing].tolist()))
+        counts = counts.tolist()
+        crossing_faces = crossing_faces.tolist()
+
         for site in self._sites:
             half_edge: HalfEdge = site.face.outer_component
-            inside = box.contains(half_edge.origin.point)
+            if half_edge is None or not crossing_faces[site.index]:
+                continue
+            inside = origins_inside[positions[id(half_edge)]]
             outer_component_dirty = not inside
             incoming_half_edge = None  # First half edge coming in the box
             outgoing_half_edge = None  # Last half edge going out the box
             incoming_side = outgoing_side = Box.Side.LEFT
 
             while True:
-
-                intersections = [Intersection(), Intersection()]
-                intersections_count = box.get_intersections(
-                    half_edge.origin.point,
-                    half_edge.destination.point,
-                    intersections
-                )
-                next_inside = box.contains(half_edge.destination.point)
+                position = positions[id(half_edge)]
+                intersections_count = counts[position]
+                intersection_sides = sides.get(position)
+                intersection_points = points.get(position)
+                next_inside = destinations_inside[position]
                 next_half_edge = half_edge.next
 
                 if not inside and not next_inside:
-                    if intersections_count == 0:
+                    # Outside, or only through a corner of the box
+                    if intersections_count <= 1:
                         vertices_to_remove.add(half_edge.origin)
                         self._remove_half_edge(half_edge)
                     elif intersections_count == 2:
@@ -105,43 +167,51 @@ class VoronoiDiagram:
                             half_edge.origin = half_edge.twin.destination
                             half_edge.destination = half_edge.twin.origin
                         else:
-                            half_edge.origin = self._create_vertex(intersections[0].point)
-                            half_edge.destination = self._create_vertex(intersections[1].point)
+                            half_edge.origin = self._create_vertex(Vector2(*intersection_points[0]))
+                            half_edge.destination = self._create_vertex(Vector2(*intersection_points[1]))
                         if outgoing_half_edge is not None:
                             self._link(box, outgoing_half_edge, outgoing_side,
-                                       half_edge, intersections[0].side)
+                                       half_edge, Box.Side(intersection_sides[0]))
                         if incoming_half_edge is None:
                             incoming_half_edge = half_edge
-                            incoming_side = intersections[0].side
+                            incoming_side = Box.Side(intersection_sides[0])
                         outgoing_half_edge = half_edge
-                        outgoing_side = intersections[1].side
+                        outgoing_side = Box.Side(intersection_sides[1])
                         processed_half_edges.add(half_edge)
                     else:
                         error = True
                 elif inside and not next_inside:
+                    if intersections_count == 0:
+                        intersection_sides, intersection_points = box.get_endpoint_crossing(
+                            half_edge.origin.point, half_edge.destination.point)
+                        intersections_count = 1
                     if intersections_count == 1:
                         if half_edge.twin in processed_half_edges:
                             half_edge.destination = half_edge.twin.origin
                         else:
-                            half_edge.destination = self._create_vertex(intersections[0].point)
+                            half_edge.destination = self._create_vertex(Vector2(*intersection_points[0]))
                         outgoing_half_edge = half_edge
-                        outgoing_side = intersections[0].side
+                        outgoing_side = Box.Side(intersection_sides[0])
                         processed_half_edges.add(half_edge)
                     else:
                         error = True
                 elif not inside and next_inside:
+                    if intersections_count == 0:
+                        intersection_sides, intersection_points = box.get_endpoint_crossing(
+                            half_edge.destination.point, half_edge.origin.point)
+                        intersections_count = 1
                     if intersections_count == 1:
                         vertices_to_remove.add(half_edge.origin)
                         if half_edge.twin in processed_half_edges:
                             half_edge.origin = half_edge.twin.destination
                         else:
-                            half_edge.origin = self._create_vertex(intersections[0].point)
+                            half_edge.origin = self._create_vertex(Vector2(*intersection_points[0]))
                         if outgoing_half_edge is not None:
                             self._link(box, outgoing_half_edge, outgoing_side,
-                                       half_edge, intersections[0].side)
+                                       half_edge, Box.Side(intersection_sides[0]))
                         if incoming_half_edge is None:
                             incoming_half_edge = half_edge
-                            incoming_side = intersections[0].side
+                            incoming_side = Box.Side(intersection_sides[0])
                         processed_half_edges.add(half_edge)
                     else:
                         error = True
@@ -163,10 +233,476 @@ class VoronoiDiagram:
 
         return not error
 
+    def insert_site(self, point: Vector2, hint: int = 0) -> Optional[Site]:
+        # Works on bounded diagrams (after bound() or intersect()). The containing cell is found by walking
+        # from the site hint, then only the cells the new cell cuts into are relinked. Returns None and keeps
+        # the diagram unchanged if the point lies outside the diagram or on an existing site.
+        face = self._find_face(point, hint)
+        if face is None or (face.site.point.x == point.x and face.site.point.y == point.y):
+            return None
+        polygon = self._get_polygon(face)
+        scale = max(max(abs(x), abs(y)) for x, y, _ in polygon + [(point.x, point.y, None)]) + 1.0
+        tolerance = 1e-9 * scale
+
+        # 1. Cells the new cell cuts into: those with a vertex not clearly closer to their own site, found through
+        # the twin half-edges from the containing cell. Cells of sites out of the diagram take no part: every
+        # point of the diagram is in a cell of a site with a non-empty cell, and only that site can lose it.
+        affected = [face]
+        polygons = {id(face): polygon}
+        for cell in affected:
+            for half_edge in self._get_face_half_edges(cell):
+                if half_edge.twin is None or id(half_edge.twin.incident_face) in polygons:
+                    continue
+                neighbor = half_edge.twin.incident_face
+                polygons[id(neighbor)] = self._get_polygon(neighbor)
+                if polygons[id(neighbor)] is None:
+                    return None
+                if any(self._get_bisector_distance(x, y, neighbor.site.point, point) <= tolerance
+                       for x, y, _ in polygons[id(neighbor)]):
+                    affected.append(neighbor)
+
+        # 2. Every cell keeps the part closer to its site, the new cell is made of the rest
+        site = Site(len(self._sites), point)
+        site.face = Face(site)
+        cells = [(site.face, list())]
+        for cell in affected:
+            polygon = polygons[id(cell)]
+            cells.append((cell, [self._clip_polygon(polygon, cell.site.point, point, tolerance)]))
+            cells[0][1].append(self._clip_polygon(polygon, point, cell.site.point, tolerance))
+        if not self._relink(cells, tolerance):
+            return None
+        self._sites.append(site)
+        self._faces.append(site.face)
+        return site
+
+    def remove_site(self, i: int) -> bool:
+        # Works on bounded diagrams. The removed cell is split between the sites that take it over by clipping it
+        # with their bisectors: its neighbours, and on the border of the diagram the near sites whose cells were
+        # clipped away by intersect(). The site keeps its index, its face is left empty. Returns False and keeps
+        # the diagram unchanged if the cell is not closed or cannot be split between those sites.
+        site = self._sites[i]
+        if i in self._removed_sites:
+            return False
+        polygon = self._get_polygon(site.face)
+        if polygon is None:
+            return False
+        scale = max(max(abs(x), abs(y)) for x, y, _ in polygon) + 1.0
+        tolerance = 1e-9 * scale
+        neighbors = list()
+        for half_edge in self._get_face_half_edges(site.face):
+            if half_edge.twin is not None and half_edge.twin.incident_face is not site.face \
+                    and half_edge.twin.incident_face not in neighbors:
+                neighbors.append(half_edge.twin.incident_face)
+        candidates = neighbors + self._get_hidden_faces(site, polygon, neighbors)
+
+        # 1. Split the cell: every candidate gets the part closer to it than to the others
+        cells = [(site.face, list())]
+        for candidate in candidates:
+            piece = polygon
+            for other in candidates:
+                if other is not candidate:
+                    piece = self._clip_polygon(piece, candidate.site.point, other.site.point, tolerance)
+            if candidate in neighbors:
+                cells.append((candidate, [self._get_polygon(candidate), piece]))
+            elif len(piece) >= 3 and abs(self._get_area(piece)) > tolerance * scale:
+                # A site with a cell elsewhere that meets this one only out of the diagram cannot grow into it
+                if candidate.outer_component is not None:
+                    return False
+                cells.append((candidate, [piece]))
+        if any(polygons[0] is None for _, polygons in cells[1:]):
+            return False
+
+        # 2. Relink the cells, the removed one is left empty
+        if not self._relink(cells, tolerance):
+            return False
+        self._removed_sites.add(i)
+        return True
+
+    def _find_nearest_site(self, point: Vector2, hint: int) -> Optional[Site]:
+        site = self._sites[hint] if 0 <= hint < len(self._sites) else None
+        if site is None or site.face.outer_component is None:
+            site = next((s for s in self._sites if s.face.outer_component is not None), None)
+        while site is not None:
+            best = site
+            best_distance = self._squared_distance(site.point, point)
+            for half_edge in self._get_face_half_edges(site.face) or []:
+                if half_edge.twin is not None:
+                    neighbor = half_edge.twin.incident_face.site
+                    distance = self._squared_distance(neighbor.point, point)
+                    if distance < best_distance:
+                        best, best_distance = neighbor, distance
+            if best is site:
+                return site
+            site = best
+        return None
+
+    def _find_face(self, point: Vector2, hint: int) -> Optional[Face]:
+        # Cell containing the point, None if it is out of the diagram. The greedy walk towards the nearest site
+        # can stop early on a clipped diagram, so it goes on along the segment from the centre of the cell to
+        # the point, through the edge the segment leaves each cell by.
+        site = self._find_nearest_site(point, hint)
+        face = site.face if site is not None else None
+        visited = set()
+        while face is not None and id(face) not in visited:
+            visited.add(id(face))
+            half_edges = self._get_face_half_edges(face)
+            if half_edges is None:
+                return None
+            if self._face_contains(face, point):
+                return face
+            centre_x = sum(h.origin.point.x for h in half_edges) / len(half_edges)
+            centre_y = sum(h.origin.point.y for h in half_edges) / len(half_edges)
+            exit_half_edge, exit_t = None, float('inf')
+            for half_edge in half_edges:
+                origin, destination = half_edge.origin.point, half_edge.destination.point
+                dx, dy = destination.x - origin.x, destination.y - origin.y
+                centre_side = dx * (centre_y - origin.y) - dy * (centre_x - origin.x)
+                point_side = dx * (point.y - origin.y) - dy * (point.x - origin.x)
+                if centre_side * point_side < 0.0 and centre_side / (centre_side - point_side) < exit_t:
+                    exit_half_edge, exit_t = half_edge, centre_side / (centre_side - point_side)
+            if exit_half_edge is None or exit_half_edge.twin is None:
+                return None
+            face = exit_half_edge.twin.incident_face
+        return None
+
+    def _face_contains(self, face: Face, point: Vector2) -> bool:
+        half_edges = self._get_face_half_edges(face)
+        if half_edges is None:
+            return False
+        signs = set()
+        for half_edge in half_edges:
+            origin, destination = half_edge.origin.point, half_edge.destination.point
+            dx, dy = destination.x - origin.x, destination.y - origin.y
+            # Direction of degenerate (almost zero-length) edges is meaningless
+            if abs(dx) + abs(dy) <= 1e-9 * (abs(origin.x) + abs(origin.y) + 1.0):
+                continue
+            cross = dx * (point.y - origin.y) - dy * (point.x - origin.x)
+            if cross != 0.0:
+                signs.add(cross > 0.0)
+        return len(signs) <= 1
+
+    def _get_face_half_edges(self, face: Face) -> Optional[List[HalfEdge]]:
+        # Half-edges of a closed cell boundary, None if the boundary is open or unbounded
+        start = face.outer_component
+        if start is None:
+            return None
+        result = list()
+        half_edge = start
+        while True:
+            if half_edge is None or half_edge.origin is None or half_edge.destination is None:
+                return None
+            result.append(half_edge)
+            half_edge = half_edge.next
+            if half_edge is start:
+                return result
+
+    def _get_polygon(self, face: Face) -> Optional[list]:
+        # (x, y, vertex) of the vertices of a closed cell, as _clip_polygon() takes them
+        half_edges = self._get_face_half_edges(face)
+        if half_edges is None:
+            return None
+        return [(h.origin.point.x, h.origin.point.y, h.origin) for h in half_edges]
+
+    def _get_hidden_faces(self, site: Site, polygon: list, neighbors: List[Face]) -> List[Face]:
+        # Empty faces of the sites that may take a part of the cell of site once it is removed. Only a cell on
+        # the border of the diagram has any: there a Delaunay neighbour may have lost its cell to intersect(). One
+        # that kept a cell elsewhere cannot grow into this one, the union would not be convex. A point of the cell
+        # is never farther from its new site than from a neighbour, which bounds the distance of those sites.
+        if all(half_edge.twin is not None for half_edge in self._get_face_half_edges(site.face)):
+            return list()
+        points = self._get_site_points()
+        centre = np.array([sum(x for x, _, _ in polygon), sum(y for _, y, _ in polygon)]) / len(polygon)
+        radius = max(np.hypot(x - centre[0], y - centre[1]) for x, y, _ in polygon)
+        limit = np.inf
+        if neighbors:
+            limit = 2.0 * radius + min(np.hypot(f.site.point.x - centre[0], f.site.point.y - centre[1])
+                                       for f in neighbors)
+        near = np.flatnonzero(np.hypot(points[:, 0] - centre[0], points[:, 1] - centre[1]) <= limit * (1.0 + 1e-9))
+        excluded = {id(site.face)} | {id(face) for face in neighbors}
+        return [self._faces[j] for j in near.tolist()
+                if self._faces[j].outer_component is None and j not in self._removed_sites
+                and id(self._faces[j]) not in excluded]
+
+    def _get_site_points(self) -> np.ndarray:
+        # (n, 2) coordinates of the sites, extended when sites are inserted
+        if len(self._site_points) < len(self._sites):
+            added = np.array([(site.point.x, site.point.y) for site in self._sites[len(self._site_points):]],
+                             dtype=np.float64).reshape(-1, 2)
+            self._site_points = np.concatenate((self._site_points, added))
+        return self._site_points
+
+    def _relink(self, cells: list, tolerance: float) -> bool:
+        # Rebuilds the boundaries of the faces of cells, a list of (face, polygons whose union is its new cell),
+        # polygons as _clip_polygon() gives them. Points are matched to the old vertices of the faces and to each
+        # other within tolerance, old vertices at the same point are merged, and the edges two polygons of a face
+        # share cancel out. Everything is checked before the first change: returns False and leaves the diagram
+        # as it is if the new boundaries do not fit together.
+        faces = {id(face) for face, _ in cells}
+
+        # 1. Old boundaries, their vertices grouped by point, and the half-edges of every face around them
+        old_half_edges = list()
+        for face, _ in cells:
+            if face.outer_component is not None:
+                half_edges = self._get_face_half_edges(face)
+                if half_edges is None:
+                    return False
+                old_half_edges.extend(half_edges)
+        old_vertices = dict()
+        representatives = dict()
+        for half_edge in old_half_edges:
+            vertex = half_edge.origin
+            if id(vertex) not in old_vertices:
+                old_vertices[id(vertex)] = vertex
+                representatives[id(vertex)] = next(
+                    (v for v in representatives.values() if abs(v.point.x - vertex.point.x) <= tolerance
+                     and abs(v.point.y - vertex.point.y) <= tolerance), vertex)
+        around = dict()
+        for half_edge in old_half_edges:
+            for outgoing in self._get_outgoing_half_edges(half_edge):
+                if outgoing.prev is None:
+                    return False
+                around[id(outgoing)] = outgoing
+                around[id(outgoing.prev)] = outgoing.prev
+
+        def representative(vertex: Vertex) -> Vertex:
+            return representatives.get(id(vertex), vertex)
+
+        # 2. New boundaries, as cycles of keys: representatives of old vertices and indices of new points
+        merged = list({id(v): v for v in representatives.values()}.values())
+        new_points = list()
+
+        def get_key(x: float, y: float, vertex: Optional[Vertex]):
+            if vertex is not None and id(vertex) in representatives:
+                return representatives[id(vertex)]
+            for v in merged:
+                if abs(v.point.x - x) <= tolerance and abs(v.point.y - y) <= tolerance:
+                    return v
+            for j, (px, py) in enumerate(new_points):
+                if abs(px - x) <= tolerance and abs(py - y) <= tolerance:
+                    return j
+            new_points.append((x, y))
+            return len(new_points) - 1
+
+        def get_point(key) -> tuple:
+            return new_points[key] if isinstance(key, int) else (key.point.x, key.point.y)
+
+        cycles = list()
+        old_area = sum(abs(self._get_area(self._get_polygon(face))) for face, _ in cells
+                       if face.outer_component is not None)
+        new_area = 0.0
+        for face, polygons in cells:
+            edges = dict()
+            for polygon in polygons:
+                keys = [get_key(x, y, vertex) for x, y, vertex in polygon]
+                for u, v in zip(keys, keys[1:] + keys[:1]):
+                    if u == v:
+                        continue
+                    if edges.get((v, u), 0) > 0:
+                        edges[(v, u)] -= 1
+                    else:
+                        edges[(u, v)] = edges.get((u, v), 0) + 1
+            following = dict()
+            for (u, v), count in edges.items():
+                if count > 1 or (count == 1 and u in following):
+                    return False
+                if count == 1:
+                    following[u] = v
+            cycle = list()
+            if following:
+                cycle.append(next(iter(following)))
+                while following.get(cycle[-1]) != cycle[0]:
+                    if cycle[-1] not in following or len(cycle) > len(following):
+                        return False
+                    cycle.append(following[cycle[-1]])
+                if len(cycle) != len(following) or len(cycle) < 3:
+                    return False
+                new_area += abs(self._get_area([get_point(key) for key in cycle]))
+            cycles.append(cycle)
+        if abs(new_area - old_area) > tolerance * (old_area + tolerance):
+            return False
+
+        # 3. Twins: between new boundaries, with the half-edges of the other faces that were twins of old ones,
+        # or none on the border of the diagram
+        new_edges = set()
+        for cycle in cycles:
+            for edge in zip(cycle, cycle[1:] + cycle[:1]):
+                if edge in new_edges:
+                    return False
+                new_edges.add(edge)
+        outer_twins = dict()
+        collapsed = list()
+        for half_edge in around.values():
+            if id(half_edge.incident_face) in faces:
+                continue
+            origin, destination = representative(half_edge.origin), representative(half_edge.destination)
+            if origin is destination:
+                collapsed.append(half_edge)
+            elif half_edge.twin is not None and id(half_edge.twin.incident_face) in faces:
+                if (destination, origin) not in new_edges:
+                    return False
+                outer_twins[(destination, origin)] = half_edge
+        borders = [(h.origin.point, h.destination.point) for h in old_half_edges if h.twin is None]
+        for u, v in new_edges:
+            if (v, u) not in new_edges and (u, v) not in outer_twins and not any(
+                    self._is_on_segment(get_point(u), a, b, tolerance)
+                    and self._is_on_segment(get_point(v), a, b, tolerance) for a, b in borders):
+                return False
+
+        # 4. Apply: merge the old vertices, drop the edges collapsed by it and the old boundaries, link the new ones
+        created_vertices = [self._create_vertex(Vector2(x, y)) for x, y in new_points]
+
+        def get_vertex(key) -> Vertex:
+            return created_vertices[key] if isinstance(key, int) else key
+
+        for half_edge in around.values():
+            half_edge.origin = representative(half_edge.origin)
+            half_edge.destination = representative(half_edge.destination)
+        for half_edge in collapsed:
+            half_edge.prev.next = half_edge.next
+            half_edge.next.prev = half_edge.prev
+            if half_edge.incident_face.outer_component is half_edge:
+                half_edge.incident_face.outer_component = half_edge.next
+            self._remove_half_edge(half_edge)
+        for half_edge in old_half_edges:
+            self._remove_half_edge(half_edge)
+        created = dict()
+        for (face, _), cycle in zip(cells, cycles):
+            face.outer_component = None
+            half_edges = list()
+            for u, v in zip(cycle, cycle[1:] + cycle[:1]):
+                half_edges.append(self._create_half_edge(face))
+                half_edges[-1].origin, half_edges[-1].destination = get_vertex(u), get_vertex(v)
+                created[(u, v)] = half_edges[-1]
+            for previous, current in zip(half_edges, half_edges[1:] + half_edges[:1]):
+                previous.next = current
+                current.prev = previous
+        for (u, v), half_edge in created.items():
+            half_edge.twin = created.get((v, u))
+            if half_edge.twin is None and (u, v) in outer_twins:
+                half_edge.twin = outer_twins[(u, v)]
+                half_edge.twin.twin = half_edge
+
+        # Old vertices no half-edge uses any more, then the ones left in the middle of an edge
+        used = {id(get_vertex(key)) for cycle in cycles for key in cycle}
+        used.update(id(h.origin) for h in around.values()
+                    if id(h.incident_face) not in faces and h.origin is not h.destination)
+        for vertex in old_vertices.values():
+            if id(vertex) not in used:
+                self._remove_vertex(vertex)
+        self._dissolve_vertices([face for face, _ in cells], used)
+        return True
+
+    @staticmethod
+    def _get_outgoing_half_edges(half_edge: HalfEdge) -> List[HalfEdge]:
+        # Half-edges of every face leaving the origin of half_edge, turning around it through the twins both
+        # ways until the border of the diagram
+        result = [half_edge]
+        visited = {id(half_edge)}
+        current = half_edge
+        while current.prev is not None and current.prev.twin is not None and id(current.prev.twin) not in visited:
+            current = current.prev.twin
+            visited.add(id(current))
+            result.append(current)
+        current = half_edge
+        while current.twin is not None and current.twin.next is not None and id(current.twin.next) not in visited:
+            current = current.twin.next
+            visited.add(id(current))
+            result.append(current)
+        return result
+
+    @staticmethod
+    def _is_on_segment(point: tuple, a: Vector2, b: Vector2, tolerance: float) -> bool:
+        dx, dy = b.x - a.x, b.y - a.y
+        length = (dx * dx + dy * dy) ** 0.5
+        if length <= tolerance:
+            return abs(point[0] - a.x) <= tolerance and abs(point[1] - a.y) <= tolerance
+        along = ((point[0] - a.x) * dx + (point[1] - a.y) * dy) / length
+        across = ((point[1] - a.y) * dx - (point[0] - a.x) * dy) / length
+        return -tolerance <= along <= length + tolerance and abs(across) <= tolerance
+
+    @staticmethod
+    def _get_area(polygon: list) -> float:
+        # Signed area of the polygon of (x, y, ...) points
+        return 0.5 * sum(p[0] * q[1] - q[0] * p[1] for p, q in zip(polygon, polygon[1:] + polygon[:1]))
+
+    def _dissolve_vertices(self, faces: List[Face], vertices: set):
+        # Removes the given vertices where they join two parts of the same edge, skipping the ones already gone
+        dissolved = True
+        while dissolved and vertices:
+            dissolved = False
+            for face in faces:
+                for half_edge in self._get_face_half_edges(face) or []:
+                    vertex = half_edge.destination
+                    if id(vertex) in vertices and vertex.list_node is not None and self._dissolve_vertex(half_edge):
+                        vertices.discard(id(vertex))
+                        dissolved = True
+                        break
+
+    def _dissolve_vertex(self, incoming: HalfEdge) -> bool:
+        outgoing = incoming.next
+        vertex = incoming.destination
+        if incoming.twin is None and outgoing.twin is None:
+            origin, destination = incoming.origin.point, outgoing.destination.point
+            cross = (vertex.point.x - origin.x) * (destination.y - origin.y) \
+                - (vertex.point.y - origin.y) * (destination.x - origin.x)
+            length = self._squared_distance(origin, destination)
+            if cross * cross > 1e-18 * length * length:
+                return False
+        elif incoming.twin is None or outgoing.twin is None or incoming.twin.prev is not outgoing.twin:
+            return False
+
+        incoming.destination = outgoing.destination
+        incoming.next = outgoing.next
+        outgoing.next.prev = incoming
+        if incoming.incident_face.outer_component is outgoing:
+            incoming.incident_face.outer_component = incoming
+        self._remove_half_edge(outgoing)
+        if incoming.twin is not None:
+            kept, removed = outgoing.twin, incoming.twin
+            kept.destination = removed.destination
+            kept.next = removed.next
+            removed.next.prev = kept
+            if kept.incident_face.outer_component is removed:
+                kept.incident_face.outer_component = kept
+            kept.twin = incoming
+            incoming.twin = kept
+            self._remove_half_edge(removed)
+        self._remove_vertex(vertex)
+        return True
+
+    @staticmethod
+    def _clip_polygon(polygon: list, site: Vector2, other: Vector2, tolerance: float) -> list:
+        # Keeps the part of the polygon that is closer to site than to other, points within tolerance of their
+        # bisector are kept as they are
+        result = list()
+        for j in range(len(polygon)):
+            x1, y1, vertex1 = polygon[j]
+            x2, y2, _ = polygon[(j + 1) % len(polygon)]
+            value1 = VoronoiDiagram._get_bisector_distance(x1, y1, site, other)
+            value2 = VoronoiDiagram._get_bisector_distance(x2, y2, site, other)
+            inside1, inside2 = value1 >= -tolerance, value2 >= -tolerance
+            if inside1:
+                result.append((x1, y1, vertex1))
+            if inside1 != inside2 and abs(value1) > tolerance and abs(value2) > tolerance:
+                t = value1 / (value1 - value2)
+                result.append((x1 + (x2 - x1) * t, y1 + (y2 - y1) * t, None))
+        return result
+
+    @staticmethod
+    def _get_bisector_distance(x: float, y: float, site: Vector2, other: Vector2) -> float:
+        # Signed distance of (x, y) from the bisector of site and other, positive on the side of site
+        dx, dy = other.x - site.x, other.y - site.y
+        return ((x - (site.x + other.x) / 2.0) * -dx + (y - (site.y + other.y) / 2.0) * -dy) / np.hypot(dx, dy)
+
+    @staticmethod
+    def _squared_distance(a: Vector2, b: Vector2) -> float:
+        return (a.x - b.x) ** 2 + (a.y - b.y) ** 2
+
     def _create_vertex(self, point: Vector2) -> Vertex:
-        self._vertices.append(Vertex(point))
-        self._vertices.last.value.list_node = self._vertices.last
-        return self._vertices.last.value
+        self._cell_arrays = None
+        vertex = Vertex(point)
+        vertex.list_node = self._vertices.append(vertex)
+        return vertex
 
     def _create_corner(self, box: Box, side: Box.Side) -> Optional[Vertex]:
         match side:
@@ -182,12 +718,13 @@ class VoronoiDiagram:
                 return None
 
     def _create_half_edge(self, face: Face) -> HalfEdge:
-        self._half_edges.append(HalfEdge())
-        self._half_edges.last.value.incident_face = face
-        self._half_edges.last.value.list_node = self._half_edges.last
+        self._cell_arrays = None
+        half_edge = HalfEdge()
+        half_edge.incident_face = face
+        half_edge.list_node = self._half_edges.append(half_edge)
         if face.outer_component is None:
-            face.outer_component = self._half_edges.last.value
-        return self._half_edges.last.value
+            face.outer_component = half_edge
+        return half_edge
 
     def _link(self, box: Box, start: HalfEdge, start_side: Box.Side, end: HalfEdge, end_side: Box.Side):
         half_edge = start
@@ -207,35 +744,38 @@ class VoronoiDiagram:
         half_edge.next.destination = end.origin
 
     def _remove_vertex(self, vertex: Vertex):
+        self._cell_arrays = None
         self._vertices.remove(vertex.list_node)
+        vertex.list_node = None
 
     def _remove_half_edge(self, half_edge: HalfEdge):
+        self._cell_arrays = None
         self._half_edges.remove(half_edge.list_node)
 
 
-from enum import Enum, auto, IntEnum
+from enum import IntEnum
 from typing import Optional
 
 
 class Arc:
-    class Color(Enum):
-        RED = auto()
-        BLACK = auto()
+    __slots__ = ('parent', 'left', 'right', 'site', 'left_half_edge', 'right_half_edge', 'event', 'prev', 'next',
+                 'red')
 
-    def __init__(self):
-        self.parent: Optional['Arc'] = None
-        self.left: Optional['Arc'] = None
-        self.right: Optional['Arc'] = None
+    def __init__(self, site: Optional[Site] = None, nil: Optional['Arc'] = None):
+        self.parent: Optional['Arc'] = nil
+        self.left: Optional['Arc'] = nil
+        self.right: Optional['Arc'] = nil
 
-        self.site: Optional[Site] = None
+        self.site: Optional[Site] = site
         self.left_half_edge: Optional[HalfEdge] = None
         self.right_half_edge: Optional[HalfEdge] = None
         self.event: Optional['Event'] = None
 
-        self.prev: Optional['Arc'] = None
-        self.next: Optional['Arc'] = None
+        self.prev: Optional['Arc'] = nil
+        self.next: Optional['Arc'] = nil
 
-        self.color: Arc.Color = Arc.Color.RED
+        # Red-black tree color: True is red, False is black
+        self.red: bool = True
 
     def __repr__(self):
         return f"Arc(site_index={self.site.index if self.site else 'None'})"
@@ -247,6 +787,8 @@ class EventType(IntEnum):
 
 
 class Event:
+    __slots__ = ('type', 'y', 'site', 'point', 'arc', 'index')
+
     def __init__(self, site_or_y, point: Optional[Vector2] = None, arc: Optional[Arc] = None):
         if isinstance(site_or_y, Site):
             self.type = EventType.SITE
@@ -263,8 +805,14 @@ class Event:
 
         self.index = -1
 
+    # Greater events are handled first: higher y, then at equal y sites before circle events and sites by
+    # increasing x
     def __lt__(self, other: 'Event') -> bool:
-        return self.y < other.y
+        if self.y != other.y:
+            return self.y < other.y
+        if self.type != other.type:
+            return self.type == EventType.CIRCLE
+        return self.type == EventType.SITE and self.site.point.x > other.site.point.x
 
     def __repr__(self):
         if self.type == EventType.SITE:
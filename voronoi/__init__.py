@@ -0,0 +1,44 @@
+# Voronoi diagrams with Fortune's algorithm. `import voronoi` is cheap: the modules (and NumPy and llist with them)
+# are imported on first use, either explicitly
+#   from voronoi.FortuneAlgorithm import FortuneAlgorithm
+# or as attributes of the package
+#   import voronoi
+#   algorithm = voronoi.FortuneAlgorithm.FortuneAlgorithm(points)
+# Every module holds the class of the same name, so the package exposes the modules and not the classes.
+# `python -m voronoi` runs the batch command line, see __main__.py.
+import importlib
+
+__all__ = [
+    'ArrayDisjointSetUnion',
+    'ArrayFortuneAlgorithm',
+    'ArrayVoronoiDiagram',
+    'BeachLine',
+    'Box',
+    'CellArrays',
+    'DiagramCache',
+    'DisjointSetUnion',
+    'EventScheduler',
+    'FortuneAlgorithm',
+    'Lloyd',
+    'ParallelFortuneAlgorithm',
+    'PointLocator',
+    'Predicates',
+    'PriorityQueue',
+    'SpanningTree',
+    'StreamingFortuneAlgorithm',
+    'SweepStats',
+    'Vector2',
+    'ViewportFortuneAlgorithm',
+    'VoronoiDiagram',
+]
+
+
+def __getattr__(name: str):
+    if name in __all__:
+        # import_module() also sets the module as an attribute of the package, later lookups do not get here
+        return importlib.import_module(f'{__name__}.{name}')
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from typing import Optional, Tuple
+
+import numpy as np
+
+from voronoi.ArrayFortuneAlgorithm import ArrayFortuneAlgorithm
+from voronoi.Box import Box
+from voronoi.DiagramCache import DiagramCache
+from voronoi.Vector2 import Vector2
+
+# Site files: .npy arrays, raw float64 (x, y) pairs like the ones of StreamingFortuneAlgorithm, or text with two
+# columns separated by whitespace or commas
+TEXT_EXTENSIONS = ('.txt', '.csv', '.xy')
+EXTENSIONS = ('.npy', '.bin') + TEXT_EXTENSIONS
+
+
+def load_sites(path: str) -> Optional[np.ndarray]:
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.npy':
+        points = np.load(path)
+    elif extension == '.bin':
+        points = np.fromfile(path, dtype=np.float64)
+    elif extension in TEXT_EXTENSIONS:
+        with open(path) as file:
+            points = np.loadtxt((line.replace(',', ' ') for line in file), dtype=np.float64, ndmin=2)
+    else:
+        return None
+    if points.size % 2 != 0 or (points.ndim == 2 and points.shape[1] != 2):
+        return None
+    return np.asarray(points, dtype=np.float64).reshape(-1, 2)
+
+
+# One site file: diagram bounded by its box (the box of the sites if None) written to output, summary returned
+def process_file(task: Tuple) -> dict:
+    path, output, command, box, cache = task
+    summary = {'file': os.path.basename(path)}
+    try:
+        start = time.perf_counter()
+        points = load_sites(path)
+        if points is None or len(points) == 0:
+            summary['error'] = 'not an (n, 2) array of sites'
+            return summary
+        summary['sites'] = len(points)
+        summary['load_time'] = time.perf_counter() - start
+
+        if box is None:
+            left, bottom = points.min(axis=0).tolist()
+            right, top = points.max(axis=0).tolist()
+        else:
+            left, bottom, right, top = box
+        # bound() first needs a box containing every site, intersect() then cuts the cells to the requested one
+        margin = 0.05 * max(right - left, top - bottom, 1e-9)
+        outer = (min(left, float(points[:, 0].min())) - margin, min(bottom, float(points[:, 1].min())) - margin,
+                 max(right, float(points[:, 0].max())) + margin, max(top, float(points[:, 1].max())) + margin)
+
+        start = time.perf_counter()
+        if cache is not None:
+            cache = DiagramCache(*cache)
+            diagram = cache.construct(points, Box(*outer), Box(left, bottom, right, top), array=True)
+            summary['cached'] = cache.get_hits() > 0
+            if cache.get_failures() > 0:
+                summary['warning'] = 'some cells could not be bounded or clipped'
+        else:
+            algorithm = ArrayFortuneAlgorithm([Vector2(x, y) for x, y in points.tolist()])
+            algorithm.construct()
+            bounded = algorithm.bound(Box(*outer))
+            diagram = algorithm.get_diagram()
+            intersected = diagram.intersect(Box(left, bottom, right, top))
+            if not (bounded and intersected):
+                summary['warning'] = 'some cells could not be bounded or clipped'
+        summary['construct_time'] = time.perf_counter() - start
+
+        # Statistics of the non-empty cells
+        cells = diagram.get_cell_arrays()
+        closed = cells.vertex_counts > 0
+        count = max(int(np.count_nonzero(closed)), 1)
+        summary.update({
+            'vertices': diagram.get_vertices_count(),
+            'half_edges': diagram.get_half_edges_count(),
+            'cells': int(np.count_nonzero(closed)),
+            'total_area': float(cells.areas[closed].sum()),
+            'mean_area': float(cells.areas[closed].sum()) / count,
+            'mean_perimeter': float(cells.perimeters[closed].sum()) / count,
+            'mean_neighbors': float(np.diff(cells.indptr)[closed].sum()) / count,
+            'mean_vertices': float(cells.vertex_counts[closed].sum()) / count,
+        })
+
+        stem = os.path.splitext(os.path.basename(path))[0]
+        if command == 'diagrams':
+            diagram.save(os.path.join(output, stem + '.voronoi'))
+        else:
+            np.savez(os.path.join(output, stem + '.npz'), **cells._asdict())
+    except Exception as error:
+        summary['error'] = f'{type(error).__name__}: {error}'
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m voronoi',
+                                     description='Voronoi diagrams of every site file of a directory')
+    parser.add_argument('command', choices=('diagrams', 'stats'),
+                        help='diagrams: <name>.voronoi files, open them with ArrayVoronoiDiagram.load(); '
+                             'stats: <name>.npz files with the arrays of get_cell_arrays()')
+    parser.add_argument('input', help=f"directory of site files ({', '.join(EXTENSIONS)})")
+    parser.add_argument('output', help='directory of the results, also gets summary.json')
+    parser.add_argument('--box', nargs=4, type=float, metavar=('LEFT', 'BOTTOM', 'RIGHT', 'TOP'),
+                        help='cells are clipped to this box, the box of the sites of each file by default')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='worker processes')
+    parser.add_argument('--cache', help='directory of a DiagramCache shared by the runs, diagrams already built '
+                                        'for the same sites and box are read from it')
+    parser.add_argument('--cache-size', type=int, default=1 << 30, help='size limit of the cache in bytes')
+    args = parser.parse_args()
+
+    paths = sorted(os.path.join(args.input, name) for name in os.listdir(args.input)
+                   if os.path.splitext(name)[1].lower() in EXTENSIONS)
+    os.makedirs(args.output, exist_ok=True)
+    cache = (args.cache, args.cache_size) if args.cache else None
+    tasks = [(path, args.output, args.command, tuple(args.box) if args.box else None, cache) for path in paths]
+
+    start = time.perf_counter()
+    summaries = list()
+    # Biggest files first, so that a large file does not start last and leave the other workers idle
+    tasks.sort(key=lambda task: os.path.getsize(task[0]), reverse=True)
+    workers = min(args.workers, len(tasks))
+    with ProcessPoolExecutor(workers) if workers > 1 else nullcontext() as executor:
+        for summary in (executor.map if executor is not None else map)(process_file, tasks):
+            summaries.append(summary)
+            print(_format_summary(summary), file=sys.stderr)
+    summaries.sort(key=lambda summary: summary['file'])
+
+    with open(os.path.join(args.output, 'summary.json'), 'w') as file:
+        json.dump({'command': args.command, 'time': time.perf_counter() - start, 'files': summaries}, file,
+                  indent=2)
+    failed = sum('error' in summary for summary in summaries)
+    print(f'{len(summaries) - failed} file(s) done, {failed} failed in {time.perf_counter() - start:.2f}s',
+          file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+def _format_summary(summary: dict) -> str:
+    if 'error' in summary:
+        return f"{summary['file']}: error: {summary['error']}"
+    cached = ' (cached)' if summary.get('cached') else ''
+    return f"{summary['file']}: {summary['sites']} sites, {summary['cells']} cells in " \
+           f"{summary['construct_time']:.3f}s{cached}"
+
+
+if __name__ == '__main__':
+    main()